@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Batch Process OpenWebUI Documentation Versions
+
+This script runs the preparation and schema generation pipeline for many
+documentation revisions at once:
+1. Reads each documentation source (a local file or a git revision of a local docs checkout)
+2. Extracts DEFAULT_*_TEMPLATE variables and splits the documentation into sections
+3. Generates the OpenAPI schema for each revision
+4. Writes every revision to its own output directory and prints a timing summary
+
+Revisions are processed in parallel with a process pool.
+
+Usage:
+  python batch_process_versions.py \
+    --file v0.5.20=docs/env-configuration.md \
+    --git-repo ../open-webui-docs --rev v0.6.0 --rev v0.6.5 \
+    --relationships relationship_mappings.json \
+    --classifications final_leger_openwebui_var_classifications.json \
+    --output-root versions
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import download_and_prepare_docs as prepare
+import unified_schema_generator as generator
+from doc_sources import DEFAULT_DOC_PATH, safe_label
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Pipeline stages reported in the timing summary
+STAGES = ["read", "extract", "split", "save", "schema"]
+
+def parse_file_source(spec: str) -> Dict:
+    """
+    Parse a local file source given as LABEL=PATH or PATH.
+    
+    Args:
+        spec: The source specification
+    
+    Returns:
+        A job description for the source
+    """
+    if "=" in spec:
+        label, path = spec.split("=", 1)
+    else:
+        path = spec
+        label = os.path.splitext(os.path.basename(path))[0]
+    return {"label": label, "kind": "file", "path": path}
+
+def read_source(job: Dict) -> str:
+    """
+    Read the documentation content for a job.
+    
+    Args:
+        job: The job description
+    
+    Returns:
+        The documentation content
+    """
+    if job["kind"] == "file":
+        with open(job["path"], 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    # Read the blob straight from the repository without touching the working tree
+    result = subprocess.run(
+        ["git", "-C", job["repo"], "show", f"{job['rev']}:{job['doc_path']}"],
+        check=True, capture_output=True
+    )
+    return result.stdout.decode('utf-8')
+
+def process_version(job: Dict) -> Dict:
+    """
+    Run extract, split and schema generation for one documentation version.
+    
+    This runs in a worker process, so it only takes and returns plain data.
+    
+    Args:
+        job: The job description, including the output directory and the
+             relationship and classification inputs
+    
+    Returns:
+        A dictionary with the label, output directory and per-stage timings
+    """
+    timings = {}
+    output_dir = job["output_dir"]
+    
+    start = time.perf_counter()
+    content = read_source(job)
+    timings["read"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    updated_content, templates = prepare.extract_templates(content)
+    timings["extract"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    sections = prepare.split_into_sections(updated_content)
+    timings["split"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    prepare.save_templates(templates, output_dir)
+    prepare.save_sections(sections, output_dir)
+    prepare.save_full_content(updated_content, output_dir)
+    timings["save"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    generator.generate_schema(
+        markdown_path=os.path.join(output_dir, "env-configuration-processed.md"),
+        templates_path=os.path.join(output_dir, "default_templates.json"),
+        relationships_path=job["relationships"],
+        classifications_path=job["classifications"],
+        output_path=os.path.join(output_dir, "openwebui-config-schema.json"),
+        append_new_vars=job["append_new_vars"],
+        new_classifications_path=os.path.join(output_dir, "classifications_with_new_vars.json")
+    )
+    timings["schema"] = time.perf_counter() - start
+    
+    return {
+        "label": job["label"],
+        "output_dir": output_dir,
+        "templates": len(templates),
+        "sections": len(sections),
+        "timings": timings
+    }
+
+def run_batch(jobs: List[Dict], workers: Optional[int] = None) -> List[Dict]:
+    """
+    Process all jobs in a process pool.
+    
+    Args:
+        jobs: The job descriptions
+        workers: Number of worker processes (defaults to the CPU count)
+    
+    Returns:
+        The results of the successful jobs, in input order
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_version, job): job["label"] for job in jobs}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                results[label] = future.result()
+                logger.info(f"Finished version {label}")
+            except Exception as e:
+                logger.error(f"Error processing version {label}: {e}")
+    
+    return [results[job["label"]] for job in jobs if job["label"] in results]
+
+def print_timing_summary(results: List[Dict], wall_time: float) -> None:
+    """
+    Print a per-version, per-stage timing table.
+    
+    Args:
+        results: The results returned by run_batch
+        wall_time: Total wall time of the batch in seconds
+    """
+    width = max([len("Version")] + [len(r["label"]) for r in results])
+    header = f"{'Version':<{width}}  " + "  ".join(f"{stage:>8}" for stage in STAGES) + f"  {'total':>8}"
+    print(f"\nTiming summary (seconds):")
+    print(header)
+    print("-" * len(header))
+    
+    busy_time = 0.0
+    for result in results:
+        timings = result["timings"]
+        total = sum(timings.values())
+        busy_time += total
+        row = "  ".join(f"{timings.get(stage, 0.0):8.3f}" for stage in STAGES)
+        print(f"{result['label']:<{width}}  {row}  {total:8.3f}")
+    
+    print("-" * len(header))
+    print(f"Processed {len(results)} versions in {wall_time:.3f}s wall time "
+          f"({busy_time:.3f}s of worker time)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Prepare documentation and generate schemas for many OpenWebUI versions')
+    parser.add_argument('--file', '-f', action='append', default=[],
+                        help='Local documentation file, as LABEL=PATH or PATH (repeatable)')
+    parser.add_argument('--git-repo', '-g',
+                        help='Local checkout of the OpenWebUI docs repository')
+    parser.add_argument('--rev', action='append', default=[],
+                        help='Git revision to process from --git-repo (repeatable)')
+    parser.add_argument('--doc-path', default=DEFAULT_DOC_PATH,
+                        help=f'Path of the documentation inside the repository (default: {DEFAULT_DOC_PATH})')
+    parser.add_argument('--relationships', '-r', default='relationship_mappings.json',
+                        help='Path to the relationship mappings JSON file')
+    parser.add_argument('--classifications', '-c', default='final_leger_openwebui_var_classifications.json',
+                        help='Path to the manual classifications JSON file')
+    parser.add_argument('--output-root', '-o', default='versions',
+                        help='Directory receiving one output directory per version (default: versions)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--no-append', action='store_true',
+                        help='Do not write classification templates for new variables')
+    args = parser.parse_args()
+    
+    if args.rev and not args.git_repo:
+        parser.error("--rev requires --git-repo")
+    
+    jobs = [parse_file_source(spec) for spec in args.file]
+    for rev in args.rev:
+        jobs.append({"label": rev, "kind": "git", "repo": args.git_repo,
+                     "rev": rev, "doc_path": args.doc_path})
+    
+    if not jobs:
+        parser.error("No documentation sources given; use --file and/or --rev")
+    
+    # Give every job its own output directory and shared pipeline inputs
+    # Labels such as "v1/x" and "v1-x" share a directory name, so compare those
+    seen = {}
+    for job in jobs:
+        directory = safe_label(job["label"])
+        if directory in seen:
+            if seen[directory] == job["label"]:
+                parser.error(f"Duplicate version label: {job['label']}")
+            parser.error(f"Version labels {seen[directory]} and {job['label']} would share "
+                         f"the output directory {directory}")
+        seen[directory] = job["label"]
+        job["output_dir"] = os.path.join(args.output_root, directory)
+        job["relationships"] = os.path.abspath(args.relationships)
+        job["classifications"] = os.path.abspath(args.classifications)
+        job["append_new_vars"] = not args.no_append
+    
+    try:
+        logger.info(f"Processing {len(jobs)} versions")
+        start = time.perf_counter()
+        results = run_batch(jobs, args.workers)
+        wall_time = time.perf_counter() - start
+        
+        print_timing_summary(results, wall_time)
+        
+        failed = len(jobs) - len(results)
+        if failed:
+            print(f"\n{failed} versions failed, see the log for details")
+        print(f"\nOutputs saved under {args.output_root}")
+        if failed:
+            sys.exit(1)
+    
+    except Exception as e:
+        logger.error(f"Error processing versions: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
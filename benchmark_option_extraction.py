@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark Option Extraction
+
+This script measures the per-variable cost of extracting enum options:
+1. Parses a documentation file into variable records
+2. Times the previous multi-pattern options extractor on every variable section
+3. Times the current single-scan extractor on the same sections
+4. Reports the cost per variable, the speedup and any differences in the results
+
+Usage:
+  python benchmark_option_extraction.py --input prepared_docs/env-configuration-processed.md
+"""
+
+import re
+import time
+import argparse
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import unified_schema_generator as generator
+
+logger = logging.getLogger(__name__)
+
+def legacy_extract_options(section: str, var_name: Optional[str] = None) -> tuple:
+    """
+    Extract options the way the generator did before the single-scan extractor.
+    
+    The four option patterns are built as strings and each is run over the
+    options text with its own re.finditer call. Special cases that return
+    fixed values are omitted, since they do not exercise the patterns.
+    
+    Args:
+        section: The section text containing options
+        var_name: Optional variable name
+    
+    Returns:
+        A tuple containing (enum_values, options_description)
+    """
+    options_match = re.search(generator.OPTIONS_PATTERN, section, re.DOTALL)
+    if not options_match:
+        return None, None
+    
+    options_text = options_match.group(1).strip()
+    enum_values = []
+    options_description = "Options:\n"
+    
+    pattern1 = r"\s*[-*]\s+`([^`]*)`\s*-\s*(.*?)(?=\n\s*[-*]|\n\n|\n-|$)"
+    pattern2 = r"\s*[-*]\s+Empty string\s*[-\(]?\s*(.*?)(?=\n\s*[-*]|\n\n|\n-|$)"
+    pattern3 = r"\s*[-*]\s+['\"](.*?)['\"]\s*-\s*(.*?)(?=\n\s*[-*]|\n\n|\n-|$)"
+    pattern4 = r"\s*[-*]\s+`([^`]+)`\s*(?=\n|$)"
+    
+    for pattern in [pattern1, pattern2, pattern3, pattern4]:
+        for match in re.finditer(pattern, options_text, re.DOTALL):
+            if pattern == pattern1:
+                enum_value, enum_description = match.group(1), match.group(2).strip()
+            elif pattern == pattern2:
+                enum_value, enum_description = "", match.group(1).strip()
+            elif pattern == pattern3:
+                enum_value, enum_description = match.group(1), match.group(2).strip()
+            else:
+                enum_value, enum_description = match.group(1), ""
+            
+            if enum_value not in enum_values:
+                enum_values.append(enum_value)
+                if enum_value == "":
+                    options_description += f"  - Empty string - {enum_description}\n"
+                elif enum_description:
+                    options_description += f"  - `{enum_value}` - {enum_description}\n"
+                else:
+                    options_description += f"  - `{enum_value}`\n"
+    
+    return (enum_values, options_description) if enum_values else (None, None)
+
+def current_extract_options(section: str, var_name: Optional[str] = None) -> tuple:
+    """
+    Extract options with the generator's current single-scan extractor.
+    
+    Args:
+        section: The section text containing options
+        var_name: Optional variable name
+    
+    Returns:
+        A tuple containing (enum_values, options_description)
+    """
+    return generator.extract_options_from_section(section)
+
+def time_extractor(extractor: Callable, sections: List[Tuple[str, str]], repeat: int) -> float:
+    """
+    Time an extractor over all sections.
+    
+    Args:
+        extractor: The options extractor to time
+        sections: List of (variable name, section text) tuples
+        repeat: Number of passes over the sections
+    
+    Returns:
+        The best time of a single pass in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for var_name, section in sections:
+            extractor(section, var_name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def compare_results(sections: List[Tuple[str, str]]) -> List[str]:
+    """
+    Compare the results of the previous and current extractors.
+    
+    Args:
+        sections: List of (variable name, section text) tuples
+    
+    Returns:
+        Names of the variables whose results differ
+    """
+    return [
+        var_name for var_name, section in sections
+        if legacy_extract_options(section, var_name) != current_extract_options(section, var_name)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-variable option extraction')
+    parser.add_argument('--input', '-i', default='prepared_docs/env-configuration-processed.md',
+                        help='Path to the input Markdown file')
+    parser.add_argument('--repeat', '-n', type=int, default=20,
+                        help='Number of timed passes; the best pass is reported (default: 20)')
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    variable_info: Dict[str, Dict] = generator.parse_markdown(args.input)
+    sections = [(var_name, str(record["section"])) for var_name, record in variable_info.items()]
+    
+    legacy_time = time_extractor(legacy_extract_options, sections, args.repeat)
+    current_time = time_extractor(current_extract_options, sections, args.repeat)
+    differences = compare_results(sections)
+    
+    count = len(sections)
+    print(f"\nOption extraction over {count} variables (best of {args.repeat} passes):")
+    print(f"- Previous extractor: {legacy_time / count * 1e6:8.2f} us/variable")
+    print(f"- Current extractor:  {current_time / count * 1e6:8.2f} us/variable")
+    print(f"- Speedup: {legacy_time / current_time:.2f}x")
+    if differences:
+        print(f"\n{len(differences)} variables extract differently:")
+        for var_name in differences:
+            print(f"  - {var_name}")
+    else:
+        print(f"- Results are identical for all variables")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Schema Pipeline
+
+This script measures how the schema pipeline scales with the size of its inputs:
+1. Generates synthetic env-configuration.md style documents with matching
+   relationship mapping files and a classification file
+2. Runs parse_markdown, extract_variable_details, apply_relationships,
+   compare_with_classifications and merge_mappings on them
+3. Reports per-stage wall time and peak traced memory at each scale
+
+Scales are multiples of the base variable count (about 400, like the upstream document).
+
+Usage:
+  python benchmark_pipeline.py --scales 1 10 100 --report benchmark_report.json
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import logging
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import unified_schema_generator as generator
+import merge_relationship_mappings as merger
+
+logger = logging.getLogger(__name__)
+
+# Number of variables in the upstream documentation, used as the 1x scale
+BASE_VARIABLES = 400
+
+# Variables per ### subsection and subsections per ## section
+VARIABLES_PER_SUBSECTION = 10
+SUBSECTIONS_PER_SECTION = 4
+
+FILLER_WORDS = ("the", "configuration", "value", "server", "model", "request", "user",
+                "enables", "sets", "default", "when", "is", "for", "and", "provider")
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """
+    Build a filler sentence.
+    
+    Args:
+        rng: Random number generator
+        words: Number of words
+    
+    Returns:
+        A sentence ending with a period
+    """
+    text = " ".join(rng.choice(FILLER_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+def generate_synthetic_inputs(variables: int, options: int, section_lines: int,
+                              fanout: int, duplicate_rate: float = 0.2,
+                              seed: int = 0) -> Tuple[str, List[Dict], Dict]:
+    """
+    Generate a synthetic documentation file with matching mappings and classifications.
+    
+    Every (fanout + 1)th variable is a selector: string selectors get enum options
+    whose provider fields are the following fanout variables, boolean selectors
+    enable them. Selectors are written to the mapping file of their ## section,
+    and a share of them is repeated in the next file to exercise duplicate merging.
+    
+    Args:
+        variables: Number of variables to generate
+        options: Number of options per string variable
+        section_lines: Number of filler lines after each variable's fields
+        fanout: Number of dependent variables per selector
+        duplicate_rate: Fraction of selectors repeated in a second mapping file
+        seed: Random seed, so runs are reproducible
+    
+    Returns:
+        A tuple of (markdown, mapping_documents, classifications)
+    """
+    rng = random.Random(seed)
+    lines = ["# Environment Variable Configuration", ""]
+    names = [f"SYNTH_VAR_{i:06d}" for i in range(variables)]
+    section_size = VARIABLES_PER_SUBSECTION * SUBSECTIONS_PER_SECTION
+    mappings: List[Dict] = []
+    classifications = {"variable_classifications": {}}
+    
+    for i, name in enumerate(names):
+        if i % section_size == 0:
+            lines += [f"## Section {i // section_size}", ""]
+            mappings.append({"provider_mappings": {}, "boolean_selectors": {}})
+        if i % VARIABLES_PER_SUBSECTION == 0:
+            lines += [f"### Subsection {i // VARIABLES_PER_SUBSECTION}", ""]
+        
+        is_selector = i % (fanout + 1) == 0
+        is_boolean = is_selector and (i // (fanout + 1)) % 3 == 2
+        var_type = "bool" if is_boolean else rng.choice(("str", "str", "int", "float"))
+        default = {"bool": "False", "int": str(rng.randint(0, 1000)),
+                   "float": f"{rng.random():.2f}", "str": f"value_{i}"}[var_type]
+        
+        lines += [f"#### `{name}`", "", f"- Type: `{var_type}`", f"- Default: `{default}`",
+                  f"- Description: {_sentence(rng, 12)}"]
+        option_values = [f"option_{i}_{j}" for j in range(options)] if var_type == "str" else []
+        if option_values:
+            lines.append("- Options:")
+            lines += [f"  - `{value}` - {_sentence(rng, 6)}" for value in option_values]
+        if rng.random() < 0.5:
+            lines.append("- Persistence: This environment variable is a `PersistentConfig` variable.")
+        lines.append("")
+        lines += [_sentence(rng, 10) for _ in range(section_lines)]
+        lines.append("")
+        
+        if is_selector:
+            dependents = names[i + 1:i + 1 + fanout]
+            mapping = mappings[-1]
+            if is_boolean:
+                entry = {"provider_fields": dependents, "value": True}
+                mapping["boolean_selectors"][name] = entry
+            elif option_values:
+                provider_fields = {value: [] for value in option_values}
+                for k, dependent in enumerate(dependents):
+                    provider_fields[option_values[k % len(option_values)]].append(dependent)
+                entry = {"enum_values": option_values, "provider_fields": provider_fields}
+                mapping["provider_mappings"][name] = entry
+        
+        # Leave about 5% of the variables unclassified
+        if rng.random() >= 0.05:
+            classifications["variable_classifications"][name] = {
+                "visibility": rng.choice(("exposed", "hidden")),
+                "default_handling": rng.choice(("preloaded", "user_provided")),
+                "default_value": default,
+                "rationale": _sentence(rng, 8)
+            }
+    
+    # Repeat a share of the selectors in the following mapping file
+    for index in range(len(mappings) - 1):
+        for kind in ("provider_mappings", "boolean_selectors"):
+            for selector, entry in list(mappings[index][kind].items()):
+                if rng.random() < duplicate_rate:
+                    mappings[index + 1][kind][selector] = json.loads(json.dumps(entry))
+    
+    return "\n".join(lines), mappings, classifications
+
+def write_synthetic_inputs(output_dir: str, markdown: str, mappings: List[Dict],
+                           classifications: Dict) -> Dict[str, Any]:
+    """
+    Write synthetic inputs to disk in the layout the pipeline expects.
+    
+    Args:
+        output_dir: Directory to write to
+        markdown: The synthetic documentation
+        mappings: The synthetic relationship mapping documents
+        classifications: The synthetic classifications
+    
+    Returns:
+        A dictionary with the paths of the written files
+    """
+    mappings_dir = os.path.join(output_dir, "mappings")
+    os.makedirs(mappings_dir, exist_ok=True)
+    
+    markdown_path = os.path.join(output_dir, "env-configuration.md")
+    with open(markdown_path, 'w', encoding='utf-8') as f:
+        f.write(markdown)
+    
+    mapping_files = []
+    for index, mapping in enumerate(mappings, start=1):
+        path = os.path.join(mappings_dir, f"section{index}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(mapping, f, indent=2)
+        mapping_files.append(path)
+    
+    classifications_path = os.path.join(output_dir, "classifications.json")
+    with open(classifications_path, 'w', encoding='utf-8') as f:
+        json.dump(classifications, f, indent=2)
+    
+    return {"markdown": markdown_path, "mapping_files": mapping_files,
+            "classifications": classifications_path}
+
+def measure(func: Callable, *args, trace_memory: bool = True) -> Tuple[Any, float, int]:
+    """
+    Run a stage once for wall time and, optionally, once more under tracemalloc.
+    
+    Timing and memory tracing are separate runs because tracing slows Python
+    allocations down considerably. The stages are idempotent, so running them
+    twice on the same inputs is safe.
+    
+    Args:
+        func: The stage to run
+        *args: Arguments for the stage
+        trace_memory: Whether to measure peak traced memory
+    
+    Returns:
+        A tuple of (result, seconds, peak_bytes)
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    
+    peak = 0
+    if trace_memory:
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    
+    return result, seconds, peak
+
+def _extract_all(variable_info: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Run extract_variable_details and create_schema_property for every variable.
+    
+    Args:
+        variable_info: The parsed variable records
+    
+    Returns:
+        The schema properties
+    """
+    properties = {}
+    for var_name, record in variable_info.items():
+        details = generator.extract_variable_details(record, var_name)
+        details["category"] = record["category"]
+        details["order"] = record["order"]
+        properties[var_name] = generator.create_schema_property(details)
+    return properties
+
+def run_benchmark(paths: Dict[str, Any], trace_memory: bool = True) -> Dict[str, Dict]:
+    """
+    Run every benchmarked stage on one set of inputs.
+    
+    Args:
+        paths: Paths returned by write_synthetic_inputs
+        trace_memory: Whether to measure peak traced memory
+    
+    Returns:
+        A dictionary mapping stage names to their seconds and peak bytes
+    """
+    stages = {}
+    
+    def record(stage: str, func: Callable, *args) -> Any:
+        result, seconds, peak = measure(func, *args, trace_memory=trace_memory)
+        stages[stage] = {"seconds": seconds, "peak_bytes": peak}
+        return result
+    
+    merged = record("merge_mappings", merger.merge_mappings, paths["mapping_files"])
+    variable_info = record("parse_markdown", generator.parse_markdown, paths["markdown"])
+    properties = record("extract_variable_details", _extract_all, variable_info)
+    classifications = generator.load_json_file(paths["classifications"])
+    schema = record("apply_relationships", generator.apply_relationships, properties, merged)
+    record("compare_with_classifications", generator.compare_with_classifications, schema, classifications)
+    
+    return stages
+
+def print_report(report: List[Dict]) -> None:
+    """
+    Print the per-scale, per-stage results as a table.
+    
+    Args:
+        report: The benchmark results for each scale
+    """
+    for entry in report:
+        print(f"\nScale {entry['scale']}x: {entry['variables']} variables, "
+              f"{entry['mapping_files']} mapping files, {entry['document_bytes'] / 1e6:.1f} MB document")
+        print(f"  {'Stage':<30} {'seconds':>10} {'peak MiB':>10}")
+        for stage, result in entry["stages"].items():
+            print(f"  {stage:<30} {result['seconds']:10.3f} {result['peak_bytes'] / 2**20:10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the schema pipeline on synthetic documentation')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help='Multiples of the base variable count to run (default: 1 10 100)')
+    parser.add_argument('--base-variables', type=int, default=BASE_VARIABLES,
+                        help=f'Variable count at scale 1 (default: {BASE_VARIABLES})')
+    parser.add_argument('--options', type=int, default=4,
+                        help='Options per string variable (default: 4)')
+    parser.add_argument('--section-lines', type=int, default=4,
+                        help='Filler lines per variable section (default: 4)')
+    parser.add_argument('--fanout', type=int, default=5,
+                        help='Dependent variables per selector (default: 5)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.2,
+                        help='Fraction of selectors repeated in a second mapping file (default: 0.2)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the synthetic inputs (default: 0)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc runs and only report wall time')
+    parser.add_argument('--keep-inputs',
+                        help='Directory to keep the generated inputs in (default: a temporary directory)')
+    parser.add_argument('--report',
+                        help='Path to write the results as JSON')
+    args = parser.parse_args()
+    
+    # The pipeline logs per variable; keep the benchmark output readable
+    logging.getLogger().setLevel(logging.ERROR)
+    
+    report = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for scale in args.scales:
+            variables = args.base_variables * scale
+            output_dir = os.path.join(args.keep_inputs or temp_dir, f"scale_{scale}x")
+            markdown, mappings, classifications = generate_synthetic_inputs(
+                variables, args.options, args.section_lines, args.fanout,
+                args.duplicate_rate, args.seed)
+            paths = write_synthetic_inputs(output_dir, markdown, mappings, classifications)
+            
+            print(f"Running scale {scale}x ({variables} variables)...", flush=True)
+            stages = run_benchmark(paths, trace_memory=not args.no_memory)
+            report.append({
+                "scale": scale,
+                "variables": variables,
+                "mapping_files": len(mappings),
+                "document_bytes": len(markdown.encode('utf-8')),
+                "stages": stages
+            })
+    
+    print_report(report)
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved benchmark report to {args.report}")
+
+if __name__ == "__main__":
+    main()
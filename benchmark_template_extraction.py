@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark Template Extraction
+
+This script measures template extraction on documents with many templates:
+1. Builds a synthetic document with thousands of DEFAULT_*_TEMPLATE definitions between
+   ordinary variable sections, or reads an existing documentation file
+2. Times the previous extractor, which removed each template with repeated string slicing
+3. Times the current single-pass extractor on the same document
+4. Reports both timings, the speedup and whether the results agree
+
+With --styles all, the synthetic templates also use indented fences, language labels,
+longer fences and nested code blocks. The previous extractor does not understand those,
+so results are only compared for the plain style.
+
+Usage:
+  python benchmark_template_extraction.py --templates 5000
+  python benchmark_template_extraction.py --templates 5000 --styles all
+  python benchmark_template_extraction.py --input aggregated-docs.md
+"""
+
+import re
+import time
+import random
+import argparse
+import logging
+from typing import Callable, Dict, List, Tuple
+
+import download_and_prepare_docs as prepare
+
+logger = logging.getLogger(__name__)
+
+# Template layouts used by the synthetic document
+STYLES = ["plain", "language", "indented", "long_fence", "nested"]
+
+def legacy_extract_templates(content: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Extract templates the way the preparation script did before the single-pass extractor.
+    
+    Args:
+        content: The content of the documentation
+    
+    Returns:
+        A tuple of (updated_content, templates_dict)
+    """
+    template_pattern = r"`(DEFAULT_[A-Z0-9_]+_TEMPLATE)`:\s*```\s*\n([\s\S]*?)\n```"
+    template_matches = list(re.finditer(template_pattern, content))
+    
+    templates = {}
+    for match in template_matches:
+        templates[match.group(1)] = match.group(2).strip()
+    
+    updated_content = content
+    for match in reversed(template_matches):
+        start, end = match.span()
+        updated_content = updated_content[:start] + updated_content[end:]
+    
+    return updated_content, templates
+
+def current_extract_templates(content: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Extract templates with the preparation script's current extractor.
+    
+    Args:
+        content: The content of the documentation
+    
+    Returns:
+        A tuple of (updated_content, templates_dict)
+    """
+    return prepare.extract_templates(content)
+
+def render_template(var_name: str, style: str, lines: List[str]) -> str:
+    """
+    Render one template definition in a given layout.
+    
+    Args:
+        var_name: The template variable name
+        style: One of STYLES
+        lines: The template lines
+    
+    Returns:
+        The Markdown for the definition
+    """
+    body = "\n".join(lines)
+    if style == "language":
+        return f"`{var_name}`:\n\n```markdown\n{body}\n```\n"
+    if style == "indented":
+        indented = "\n".join(f"  {line}" if line else "" for line in lines)
+        return f"- `{var_name}`:\n\n  ```\n{indented}\n  ```\n"
+    if style == "long_fence":
+        return f"`{var_name}`:\n\n````text\n{body}\n```\nnot a closing fence\n````\n"
+    if style == "nested":
+        return f"`{var_name}`:\n\n```\n{body}\n```json\n{{\"example\": true}}\n```\n{lines[0]}\n```\n"
+    return f"`{var_name}`:\n\n```\n{body}\n```\n"
+
+def build_document(count: int, styles: List[str], seed: int = 0) -> str:
+    """
+    Build a synthetic documentation file with many template definitions.
+    
+    Args:
+        count: Number of templates
+        styles: Template layouts to cycle through
+        seed: Random seed for the template lengths
+    
+    Returns:
+        The document content
+    """
+    rng = random.Random(seed)
+    parts = ["# Environment Variable Configuration\n\n## Prompt Catalog\n\n"]
+    for i in range(count):
+        var_name = f"DEFAULT_PROMPT_{i}_TEMPLATE"
+        lines = [f"### Task {i}:", "Generate a concise summary of the conversation."]
+        lines += [f"- Guideline {j}: keep the response under {rng.randint(10, 200)} words." for j in range(rng.randint(2, 12))]
+        lines += ["", "### Output:", "JSON format: { \"summary\": \"...\" }"]
+        parts.append(f"#### `PROMPT_{i}_TEMPLATE`\n\n- Type: `str`\n"
+                     f"- Default: The value of `{var_name}` environment variable.\n\n")
+        parts.append(render_template(var_name, styles[i % len(styles)], lines))
+        parts.append("\n")
+    return "".join(parts)
+
+def time_extractor(extractor: Callable, content: str, repeat: int) -> float:
+    """
+    Time an extractor over a document.
+    
+    Args:
+        extractor: The template extractor to time
+        content: The document content
+        repeat: Number of timed passes
+    
+    Returns:
+        The best time of a single pass in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark template extraction on large documents')
+    parser.add_argument('--input', '-i',
+                        help='Documentation file to benchmark instead of a synthetic document')
+    parser.add_argument('--templates', '-t', type=int, default=5000,
+                        help='Number of templates in the synthetic document (default: 5000)')
+    parser.add_argument('--styles', choices=['plain', 'all'], default='plain',
+                        help='Template layouts in the synthetic document (default: plain)')
+    parser.add_argument('--repeat', '-n', type=int, default=3,
+                        help='Number of timed passes; the best pass is reported (default: 3)')
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            content = f.read()
+    else:
+        content = build_document(args.templates, STYLES if args.styles == 'all' else ["plain"])
+    
+    legacy_time = time_extractor(legacy_extract_templates, content, args.repeat)
+    current_time = time_extractor(current_extract_templates, content, args.repeat)
+    _, templates, stats = prepare.extract_templates_with_stats(content)
+    
+    print(f"\nTemplate extraction over {len(content)} chars (best of {args.repeat} passes):")
+    print(f"- {stats['templates']} templates, {stats['template_chars']} template chars, "
+          f"{stats['removed_chars']} chars removed")
+    print(f"- Fence languages: {', '.join(f'{language} ({count})' for language, count in stats['languages'].items()) or 'none'}")
+    print(f"- Previous extractor: {legacy_time * 1000:10.2f} ms")
+    print(f"- Current extractor:  {current_time * 1000:10.2f} ms")
+    print(f"- Speedup: {legacy_time / current_time:.1f}x")
+    if args.input or args.styles == 'plain':
+        if legacy_extract_templates(content) == current_extract_templates(content):
+            print(f"- Results are identical")
+        else:
+            print(f"- Results differ between the extractors")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Compact Schema Artifact
+
+An indexed binary form of the generated schema for consumers that only look up a few
+variables at startup:
+1. A small JSON header holds the schema skeleton and the offset and length of every property
+2. Each property is stored as compact JSON and decoded only when it is accessed
+3. Long strings (default templates, long descriptions) and large schema extensions such as
+   x-dependency-index are stored as separate blobs and decoded on demand
+
+Layout: MAGIC, header length (uint32, little endian), header JSON, data section. All
+offsets in the header are relative to the start of the data section.
+
+The reader maps the file with mmap, so opening it costs one small header parse no matter
+how large the schema is.
+"""
+
+import os
+import json
+import mmap
+import struct
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from output_writer import write_bytes_if_changed
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OWUISCH1"
+PREFIX = struct.Struct("<8sI")
+
+# Property strings at least this long (in characters) are stored as blobs
+BLOB_THRESHOLD = 256
+
+# Key used to reference a blob from a property
+BLOB_REF = "$blob"
+
+def _compact_json(value: Any) -> bytes:
+    """
+    Serialize a value as compact UTF-8 JSON.
+    
+    Args:
+        value: The value to serialize
+    
+    Returns:
+        The encoded JSON
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _split_schema(schema: Dict) -> tuple:
+    """
+    Split a schema into its skeleton, its properties and its large extensions.
+    
+    Args:
+        schema: A full schema or a properties-only schema
+    
+    Returns:
+        A tuple of (skeleton, properties, extensions); the skeleton is None for
+        a properties-only schema
+    """
+    config = schema.get("components", {}).get("schemas", {}).get("OpenWebUIConfig")
+    if config is None:
+        return None, schema, {}
+    
+    extensions = {key: value for key, value in config.items()
+                  if key.startswith("x-") and isinstance(value, (dict, list))}
+    config_skeleton = {key: ({} if key == "properties" else value)
+                       for key, value in config.items() if key not in extensions}
+    skeleton = dict(schema)
+    skeleton["components"] = dict(schema["components"])
+    skeleton["components"]["schemas"] = dict(schema["components"]["schemas"])
+    skeleton["components"]["schemas"]["OpenWebUIConfig"] = config_skeleton
+    return skeleton, config["properties"], extensions
+
+def encode_compact_schema(schema: Dict, blob_threshold: int = BLOB_THRESHOLD) -> bytes:
+    """
+    Encode a schema in the compact indexed layout.
+    
+    Identical blobs are stored once.
+    
+    Args:
+        schema: A full schema or a properties-only schema
+        blob_threshold: Minimum length of a property string stored as a blob
+    
+    Returns:
+        The encoded artifact
+    """
+    skeleton, properties, extensions = _split_schema(schema)
+    chunks: List[bytes] = []
+    offset = 0
+    
+    def append(data: bytes) -> List[int]:
+        nonlocal offset
+        chunks.append(data)
+        span = [offset, len(data)]
+        offset += len(data)
+        return span
+    
+    blobs: List[List[int]] = []
+    blob_ids: Dict[str, int] = {}
+    property_index = {}
+    for var_name, prop in properties.items():
+        record = {}
+        for key, value in prop.items():
+            if isinstance(value, str) and len(value) >= blob_threshold:
+                blob_id = blob_ids.get(value)
+                if blob_id is None:
+                    blob_id = blob_ids[value] = len(blobs)
+                    blobs.append(append(value.encode("utf-8")))
+                value = {BLOB_REF: blob_id}
+            record[key] = value
+        property_index[var_name] = append(_compact_json(record))
+    
+    extension_index = {key: append(_compact_json(value)) for key, value in extensions.items()}
+    
+    header = _compact_json({
+        "schema": skeleton,
+        "properties": property_index,
+        "extensions": extension_index,
+        "blobs": blobs
+    })
+    return b"".join([PREFIX.pack(MAGIC, len(header)), header] + chunks)
+
+def write_compact_schema(schema: Dict, output_path: str) -> bool:
+    """
+    Write a schema in the compact indexed layout.
+    
+    The file is only rewritten, atomically, when its content changes.
+    
+    Args:
+        schema: A full schema or a properties-only schema
+        output_path: Path to the compact artifact
+    
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    try:
+        written = write_bytes_if_changed(output_path, encode_compact_schema(schema))
+        if written:
+            logger.info(f"Saved compact schema to {output_path}")
+        else:
+            logger.info(f"Compact schema in {output_path} is unchanged")
+        return written
+    except Exception as e:
+        logger.error(f"Error saving compact schema to {output_path}: {e}")
+        raise
+
+class CompactSchema:
+    """
+    Lazy reader for the compact schema artifact.
+    
+    Only the header is parsed when the file is opened; properties, blobs and
+    extensions are decoded from the memory map the first time they are accessed.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open a compact schema artifact.
+        
+        Args:
+            path: Path to the artifact
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, header_length = PREFIX.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a compact schema artifact")
+            header_end = PREFIX.size + header_length
+            header = json.loads(self._map[PREFIX.size:header_end])
+        except Exception as e:
+            logger.error(f"Error opening compact schema {path}: {e}")
+            self._file.close()
+            raise
+        
+        self._data_start = header_end
+        self.skeleton: Optional[Dict] = header["schema"]
+        self._properties: Dict[str, List[int]] = header["properties"]
+        self._extensions: Dict[str, List[int]] = header["extensions"]
+        self._blobs: List[List[int]] = header["blobs"]
+        self._cache: Dict[str, Dict] = {}
+    
+    def close(self) -> None:
+        """
+        Close the memory map and the file.
+        """
+        self._map.close()
+        self._file.close()
+    
+    def __enter__(self) -> "CompactSchema":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def __contains__(self, var_name: str) -> bool:
+        return var_name in self._properties
+    
+    def __len__(self) -> int:
+        return len(self._properties)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._properties)
+    
+    def __getitem__(self, var_name: str) -> Dict:
+        return self.property(var_name)
+    
+    def _read(self, span: List[int]) -> bytes:
+        """
+        Read a span of the data section.
+        
+        Args:
+            span: The [offset, length] of the data
+        
+        Returns:
+            The raw bytes
+        """
+        start = self._data_start + span[0]
+        return self._map[start:start + span[1]]
+    
+    def blob(self, blob_id: int) -> str:
+        """
+        Decode a blob.
+        
+        Args:
+            blob_id: The blob number
+        
+        Returns:
+            The blob text
+        """
+        return self._read(self._blobs[blob_id]).decode("utf-8")
+    
+    def property(self, var_name: str, resolve_blobs: bool = True) -> Dict:
+        """
+        Decode one property.
+        
+        Args:
+            var_name: The variable name
+            resolve_blobs: Whether to replace blob references with their text;
+                when False, long strings are left as {"$blob": id} references
+        
+        Returns:
+            The schema property
+        """
+        if resolve_blobs and var_name in self._cache:
+            return self._cache[var_name]
+        prop = json.loads(self._read(self._properties[var_name]))
+        if resolve_blobs:
+            for key, value in prop.items():
+                if isinstance(value, dict) and len(value) == 1 and BLOB_REF in value:
+                    prop[key] = self.blob(value[BLOB_REF])
+            self._cache[var_name] = prop
+        return prop
+    
+    def extension(self, name: str) -> Any:
+        """
+        Decode a schema extension such as x-dependency-index.
+        
+        Args:
+            name: The extension name
+        
+        Returns:
+            The extension value, or None if the schema has no such extension
+        """
+        span = self._extensions.get(name)
+        return json.loads(self._read(span)) if span else None
+    
+    def to_schema(self) -> Dict:
+        """
+        Decode the whole schema.
+        
+        Returns:
+            The schema, equal to the one the artifact was written from
+        """
+        properties = {var_name: self.property(var_name) for var_name in self._properties}
+        if self.skeleton is None:
+            return properties
+        schema = json.loads(json.dumps(self.skeleton))
+        config = schema["components"]["schemas"]["OpenWebUIConfig"]
+        config["properties"] = properties
+        for name in self._extensions:
+            config[name] = self.extension(name)
+        return schema
+
+def compact_path_for(output_path: str) -> str:
+    """
+    Get the default compact artifact path for a JSON schema path.
+    
+    Args:
+        output_path: Path to the JSON schema
+    
+    Returns:
+        The path with its extension replaced by .idx
+    """
+    return f"{os.path.splitext(output_path)[0]}.idx"
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+OpenWebUI Config Renderer
+
+This script renders deployment configurations for many tenants from the generated schema:
+1. Compiles the schema once into a render plan: value checks, formatted defaults, the
+   x-depends-on gates of every variable and the set of x-sensitive variables
+2. Applies an optional base document (operator settings) and then each tenant's overrides
+3. Emits preloaded defaults and the overrides, leaving out variables whose x-depends-on
+   selectors are inactive
+4. Writes each tenant as .env files, a docker-compose service block, or a Kubernetes
+   ConfigMap and Secret, routing x-sensitive variables to the secret side
+
+Tenants are read and rendered one at a time, so any number of tenants can be streamed
+from a JSON Lines file to per-tenant files or to stdout.
+
+Variables with x-default-handling "preloaded" are written with their schema default;
+"unset" variables are only written when a document sets them. x-visibility "hidden"
+variables can be set by the base document but not by tenants.
+
+Usage:
+  python config_renderer.py --schema openwebui-config-schema.json --jsonl tenants.jsonl --format k8s --output-dir rendered
+  python config_renderer.py --base operator.env tenant-a.env tenant-b.json --format env --output-dir rendered
+  python config_renderer.py --jsonl tenants.jsonl --format k8s --stdout | kubectl apply -f -
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+from functools import lru_cache
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from config_validator import ConfigValidator, parse_env_file, read_jsonl_configs
+from output_writer import write_text_if_changed
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Output formats and the files written for each tenant
+FORMATS = {
+    "env": ["{tenant}.env", "{tenant}.secrets.env"],
+    "compose": ["{tenant}.compose.yaml", "{tenant}.secrets.env"],
+    "k8s": ["{tenant}.yaml"]
+}
+
+# Service name used in docker-compose output
+DEFAULT_SERVICE = "open-webui"
+
+# Values that can be written unquoted in .env files
+PLAIN_ENV_VALUE_RE = re.compile(r"^[A-Za-z0-9_./:@,+-]*$")
+
+# ${NAME} references to other variables in schema defaults
+INTERPOLATION_RE = re.compile(r"\$\{([A-Z][A-Z0-9_]*)\}")
+
+# Prose that older schema generators left in defaults: "Empty string (' '), since ..."
+# means an empty value, "The value of `...`" means there is no literal default
+EMPTY_DEFAULT_RE = re.compile(r"^empty string\b", re.IGNORECASE)
+COMPUTED_DEFAULT_RE = re.compile(r"^the value of\b", re.IGNORECASE)
+
+# Characters not allowed in Kubernetes object names
+K8S_NAME_RE = re.compile(r"[^a-z0-9-]+")
+
+# Longest tenant part of an object name (253 characters, less the "-secrets" suffix)
+# and longest label value
+K8S_NAME_LIMIT = 245
+K8S_LABEL_LIMIT = 63
+
+def literal_defaults(defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop or normalize schema defaults that are documentation prose.
+    
+    Args:
+        defaults: The coerced schema defaults
+    
+    Returns:
+        The defaults that are literal values
+    """
+    literal = {}
+    for name, value in defaults.items():
+        if isinstance(value, str):
+            if EMPTY_DEFAULT_RE.match(value):
+                value = ""
+            elif COMPUTED_DEFAULT_RE.match(value):
+                continue
+        literal[name] = value
+    return literal
+
+def format_value(value: Any) -> str:
+    """
+    Format a typed value as an environment string.
+    
+    Args:
+        value: The value
+    
+    Returns:
+        The environment string; booleans are lowercase and arrays and
+        objects are compact JSON
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+@lru_cache(maxsize=65536)
+def env_line(name: str, text: str) -> str:
+    """
+    Format one .env line, quoting the value when needed.
+    
+    Lines are cached, since most tenants share most of their values.
+    
+    Args:
+        name: The variable name
+        text: The environment string
+    
+    Returns:
+        The NAME=value line
+    """
+    if text and PLAIN_ENV_VALUE_RE.match(text):
+        return f"{name}={text}"
+    return f"{name}={json.dumps(text, ensure_ascii=False)}"
+
+@lru_cache(maxsize=65536)
+def yaml_line(name: str, text: str, indent: int) -> str:
+    """
+    Format one YAML mapping entry with a string value.
+    
+    Values are written as JSON strings, which are valid double-quoted YAML
+    scalars, so no YAML library is needed. Lines are cached like env lines.
+    
+    Args:
+        name: The variable name
+        text: The environment string
+        indent: Number of spaces before the key
+    
+    Returns:
+        The YAML line
+    """
+    return f"{' ' * indent}{name}: {json.dumps(text, ensure_ascii=False)}"
+
+def yaml_mapping(values: List[Tuple[str, str]], indent: int) -> List[str]:
+    """
+    Format string values as a YAML mapping.
+    
+    Args:
+        values: (name, environment string) pairs
+        indent: Number of spaces before each key
+    
+    Returns:
+        The YAML lines
+    """
+    return [yaml_line(name, text, indent) for name, text in values]
+
+def file_stem(tenant: str) -> str:
+    """
+    Turn a tenant name into a safe file name stem.
+    
+    Args:
+        tenant: The tenant name
+    
+    Returns:
+        The name with unsafe characters replaced
+    """
+    return re.sub(r'[^\w.-]+', '-', tenant).strip('-') or "tenant"
+
+def k8s_name(tenant: str, limit: int = K8S_NAME_LIMIT) -> str:
+    """
+    Turn a tenant name into a valid Kubernetes object name prefix.
+    
+    Names longer than the limit are truncated and end with a short hash of the
+    full tenant name, so tenants that share a long prefix keep distinct names.
+    
+    Args:
+        tenant: The tenant name
+        limit: Maximum length of the result
+    
+    Returns:
+        A lowercase DNS-1123 name
+    """
+    name = K8S_NAME_RE.sub("-", tenant.lower()).strip("-") or "tenant"
+    if len(name) <= limit:
+        return name
+    digest = hashlib.sha256(tenant.encode('utf-8')).hexdigest()[:8]
+    return f"{name[:limit - len(digest) - 1].rstrip('-')}-{digest}"
+
+def claim_names(claimed: Dict[str, str], tenant: str, output_format: str) -> Optional[str]:
+    """
+    Reserve the file stem and Kubernetes name of a tenant.
+    
+    A tenant listed twice, or different tenant names that map to the same file
+    stem or object name (for example "Acme Corp" and "acme-corp"), would
+    silently replace the earlier tenant's output.
+    
+    Args:
+        claimed: Names already reserved, mapped to the tenant that holds them;
+            updated in place
+        tenant: The tenant name
+        output_format: One of FORMATS
+    
+    Returns:
+        A message naming the conflicting tenant, or None if the names were free
+    """
+    names = [("file name", file_stem(tenant))]
+    if output_format == "k8s":
+        names.append(("Kubernetes name", k8s_name(tenant)))
+    for kind, name in names:
+        holder = claimed.get(f"{kind}:{name}")
+        if holder is not None:
+            return f"{kind} {name} is already used by tenant {holder}"
+    for kind, name in names:
+        claimed[f"{kind}:{name}"] = tenant
+    return None
+
+class RenderPlan:
+    """
+    Render plan compiled once from a schema and reused for every tenant.
+    """
+    
+    def __init__(self, validator: ConfigValidator, properties: Dict[str, Dict],
+                 base: Optional[Dict[str, Any]] = None):
+        """
+        Compile the render plan.
+        
+        Args:
+            validator: The validator compiled from the same schema
+            properties: The schema properties
+            base: Optional base document applied before every tenant's overrides
+        """
+        self.validator = validator
+        self.hidden = frozenset(name for name, prop in properties.items()
+                                if prop.get("x-visibility") == "hidden")
+        # (name, sensitive, gate) for every variable, in schema order
+        self.order = tuple(
+            (name, name in validator.sensitive, validator.gates.get(name))
+            for name in properties
+        )
+        
+        # Preloaded defaults, then the base document, checked and formatted once
+        self.defaults = literal_defaults(validator.defaults)
+        values: Dict[str, Any] = {
+            name: self.defaults[name] for name, prop in properties.items()
+            if prop.get("x-default-handling") == "preloaded" and name in self.defaults
+        }
+        self.base_errors: List[Dict] = []
+        if base:
+            base_values, self.base_errors, _ = self.check(base, allow_hidden=True)
+            values.update(base_values)
+        self.base_values = values
+        self.base_text = {name: format_value(value) for name, value in values.items()}
+        # Defaults that reference other variables are resolved per tenant
+        self.interpolated = frozenset(
+            name for name, text in self.base_text.items()
+            if name not in (base or {}) and INTERPOLATION_RE.search(text)
+        )
+        
+        logger.info(f"Compiled render plan for {len(self.order)} variables "
+                    f"({len(self.base_values)} preloaded or base values, {len(self.hidden)} hidden)")
+    
+    def check(self, overrides: Dict[str, Any], allow_hidden: bool = False) -> Tuple[Dict[str, Any], List[Dict], List[Dict]]:
+        """
+        Check and coerce override values.
+        
+        An empty override means "not set" and is ignored.
+        
+        Args:
+            overrides: Variable names mapped to environment strings or typed values
+            allow_hidden: Whether hidden variables may be set
+        
+        Returns:
+            A tuple of (coerced values, errors, warnings)
+        """
+        checks = self.validator.checks
+        values = {}
+        errors = []
+        warnings = []
+        for name, raw in overrides.items():
+            check = checks.get(name)
+            if check is None:
+                issue = {"variable": name, "message": "unknown variable"}
+                (errors if self.validator.strict else warnings).append(issue)
+                continue
+            if not allow_hidden and name in self.hidden:
+                warnings.append({"variable": name, "message": "hidden variable, tenant value ignored"})
+                continue
+            if raw is None or raw == "":
+                continue
+            try:
+                values[name] = check(raw)
+            except ValueError as e:
+                errors.append({"variable": name, "value": self.validator.mask(name, raw), "message": str(e)})
+        return values, errors, warnings
+    
+    def interpolate(self, text: str, effective: Dict[str, Any]) -> Optional[str]:
+        """
+        Replace ${NAME} references in a default with the values they refer to.
+        
+        Args:
+            text: The default with references
+            effective: The tenant's effective values
+        
+        Returns:
+            The resolved text, or None if a referenced variable has no value
+        """
+        missing = False
+        
+        def replace(match) -> str:
+            nonlocal missing
+            name = match.group(1)
+            if name in effective:
+                return format_value(effective[name])
+            if name in self.defaults:
+                return format_value(self.defaults[name])
+            missing = True
+            return match.group(0)
+        
+        resolved = INTERPOLATION_RE.sub(replace, text)
+        return None if missing else resolved
+    
+    def render(self, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resolve the variables of one tenant.
+        
+        Defaults that reference other variables, such as
+        ${OPENAI_API_BASE_URL}, are resolved against the tenant's values and
+        left out when a referenced variable has no value.
+        
+        Args:
+            overrides: The tenant's overrides
+        
+        Returns:
+            A dictionary with "config" and "secrets" lists of (name, environment
+            string) pairs in schema order, the number of "inactive" variables
+            left out, and lists of "errors" and "warnings"
+        """
+        values, errors, warnings = self.check(overrides)
+        effective = dict(self.base_values)
+        effective.update(values)
+        defaults = self.defaults
+        base_text = self.base_text
+        interpolated = self.interpolated
+        
+        config = []
+        secrets = []
+        inactive = 0
+        for name, sensitive, gate in self.order:
+            if name not in effective:
+                continue
+            if gate is not None:
+                # Selectors that are not written fall back to the application default
+                if not all(effective.get(selector, defaults.get(selector)) in accepted
+                           for selector, accepted in gate):
+                    inactive += 1
+                    continue
+            if name in values:
+                text = format_value(values[name])
+            elif name in interpolated:
+                text = self.interpolate(base_text[name], effective)
+                if text is None:
+                    continue
+            else:
+                text = base_text[name]
+            (secrets if sensitive else config).append((name, text))
+        
+        return {"config": config, "secrets": secrets, "inactive": inactive,
+                "errors": errors, "warnings": warnings}
+
+def load_plan(schema_path: str, strict: bool = False, base: Optional[Dict[str, Any]] = None) -> RenderPlan:
+    """
+    Load a schema file and compile it into a render plan.
+    
+    Args:
+        schema_path: Path to the schema JSON file
+        strict: Whether unknown variables are errors
+        base: Optional base document applied before every tenant's overrides
+    
+    Returns:
+        The compiled render plan
+    """
+    try:
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading schema {schema_path}: {e}")
+        raise
+    config_schema = schema.get("components", {}).get("schemas", {}).get("OpenWebUIConfig")
+    properties = config_schema["properties"] if config_schema else schema
+    return RenderPlan(ConfigValidator(schema, strict), properties, base)
+
+def render_env(rendered: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render a tenant as a .env file and a secrets .env file.
+    
+    Args:
+        rendered: The result of RenderPlan.render
+    
+    Returns:
+        A tuple of (config env text, secrets env text)
+    """
+    config = "".join(env_line(name, text) + "\n" for name, text in rendered["config"])
+    secrets = "".join(env_line(name, text) + "\n" for name, text in rendered["secrets"])
+    return config, secrets
+
+def render_compose(tenant: str, rendered: Dict[str, Any], service: str = DEFAULT_SERVICE) -> Tuple[str, str]:
+    """
+    Render a tenant as a docker-compose service block and a secrets .env file.
+    
+    The service reads its secrets from the env file instead of inlining them
+    in the compose file.
+    
+    Args:
+        tenant: The tenant name
+        rendered: The result of RenderPlan.render
+        service: The compose service name
+    
+    Returns:
+        A tuple of (compose YAML, secrets env text)
+    """
+    lines = ["services:", f"  {service}:"]
+    if rendered["secrets"]:
+        lines += ["    env_file:", f"      - {json.dumps(f'{file_stem(tenant)}.secrets.env')}"]
+    lines.append("    environment:" if rendered["config"] else "    environment: {}")
+    lines += yaml_mapping(rendered["config"], 6)
+    _, secrets = render_env(rendered)
+    return "\n".join(lines) + "\n", secrets
+
+def render_k8s(tenant: str, rendered: Dict[str, Any], namespace: Optional[str] = None) -> str:
+    """
+    Render a tenant as a Kubernetes ConfigMap and Secret.
+    
+    Args:
+        tenant: The tenant name
+        rendered: The result of RenderPlan.render
+        namespace: Optional namespace for both objects
+    
+    Returns:
+        The manifests as a multi-document YAML string
+    """
+    name = k8s_name(tenant)
+    metadata = [f"  namespace: {json.dumps(namespace)}"] if namespace else []
+    labels = ["  labels:", f"    app.kubernetes.io/name: open-webui",
+              f"    app.kubernetes.io/instance: {json.dumps(k8s_name(tenant, K8S_LABEL_LIMIT))}"]
+    
+    config_map = ["apiVersion: v1", "kind: ConfigMap", "metadata:",
+                  f"  name: {name}-config"] + metadata + labels
+    config_map.append("data:" if rendered["config"] else "data: {}")
+    config_map += yaml_mapping(rendered["config"], 2)
+    
+    secret = ["apiVersion: v1", "kind: Secret", "metadata:",
+              f"  name: {name}-secrets"] + metadata + labels + ["type: Opaque"]
+    secret.append("stringData:" if rendered["secrets"] else "stringData: {}")
+    secret += yaml_mapping(rendered["secrets"], 2)
+    
+    return "\n".join(config_map) + "\n---\n" + "\n".join(secret) + "\n"
+
+def render_tenant(plan: RenderPlan, tenant: str, overrides: Dict[str, Any], output_format: str,
+                  service: str = DEFAULT_SERVICE, namespace: Optional[str] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Render one tenant in an output format.
+    
+    Args:
+        plan: The compiled render plan
+        tenant: The tenant name
+        overrides: The tenant's overrides
+        output_format: One of FORMATS
+        service: The compose service name
+        namespace: Optional Kubernetes namespace
+    
+    Returns:
+        A tuple of (render result, output texts in the order of FORMATS[output_format])
+    """
+    rendered = plan.render(overrides)
+    if output_format == "env":
+        texts = list(render_env(rendered))
+    elif output_format == "compose":
+        texts = list(render_compose(tenant, rendered, service))
+    else:
+        texts = [render_k8s(tenant, rendered, namespace)]
+    return rendered, texts
+
+def load_document(file_path: str) -> Dict[str, Any]:
+    """
+    Load an override document from an env file or a JSON object file.
+    
+    Args:
+        file_path: Path to the document
+    
+    Returns:
+        Variable names mapped to values
+    """
+    if not file_path.endswith(".json"):
+        return parse_env_file(file_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error reading override document {file_path}: {e}")
+        raise
+
+def tenant_name(file_path: str) -> str:
+    """
+    Get the tenant name of an override file.
+    
+    Args:
+        file_path: Path to the file
+    
+    Returns:
+        The file name without directories and extension
+    """
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def iter_tenants(files: List[str], jsonl: Optional[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Read tenant override documents one at a time.
+    
+    Args:
+        files: Per-tenant env or JSON files
+        jsonl: Optional JSON Lines file of {"name": ..., "config": {...}} records
+    
+    Yields:
+        (tenant name, overrides) pairs
+    """
+    for file_path in files:
+        yield tenant_name(file_path), load_document(file_path)
+    if jsonl:
+        yield from read_jsonl_configs(jsonl)
+
+def write_tenant(output_dir: str, tenant: str, output_format: str, texts: List[str]) -> int:
+    """
+    Write a tenant's outputs to its files, skipping empty secrets files.
+    
+    Args:
+        output_dir: Directory receiving the files
+        tenant: The tenant name
+        output_format: One of FORMATS
+        texts: The output texts from render_tenant
+    
+    Returns:
+        The number of files that changed
+    """
+    changed = 0
+    for pattern, text in zip(FORMATS[output_format], texts):
+        path = os.path.join(output_dir, pattern.format(tenant=file_stem(tenant)))
+        if not text and pattern.endswith(".secrets.env") and not os.path.exists(path):
+            continue
+        if write_text_if_changed(path, text):
+            changed += 1
+    return changed
+
+def stream_tenant(stream: IO[str], tenant: str, output_format: str, texts: List[str], first: bool) -> None:
+    """
+    Write a tenant's outputs to a stream.
+    
+    Kubernetes manifests are separated by document markers; env and compose
+    outputs are preceded by a comment naming the tenant and the file.
+    
+    Args:
+        stream: The output stream
+        tenant: The tenant name
+        output_format: One of FORMATS
+        texts: The output texts from render_tenant
+        first: Whether this is the first tenant written to the stream
+    """
+    if output_format == "k8s":
+        stream.write(("" if first else "---\n") + texts[0])
+        return
+    for pattern, text in zip(FORMATS[output_format], texts):
+        if text:
+            stream.write(f"# {pattern.format(tenant=tenant)}\n{text}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Render OpenWebUI deployment configurations for many tenants')
+    parser.add_argument('tenant_files', nargs='*',
+                        help='Per-tenant override files (.env, or .json objects); the file name is the tenant name')
+    parser.add_argument('--schema', '-s', default='openwebui-config-schema.json',
+                        help='Path to the schema JSON file')
+    parser.add_argument('--jsonl',
+                        help='JSON Lines file of {"name": ..., "config": {...}} tenants ("-" for stdin)')
+    parser.add_argument('--base',
+                        help='Override document applied to every tenant before its own overrides; may set hidden variables')
+    parser.add_argument('--format', '-f', choices=sorted(FORMATS), default='env',
+                        help='Output format (default: env)')
+    parser.add_argument('--output-dir', '-o', default='rendered',
+                        help='Directory receiving the per-tenant files (default: rendered)')
+    parser.add_argument('--stdout', action='store_true',
+                        help='Stream every tenant to stdout instead of writing files')
+    parser.add_argument('--namespace',
+                        help='Kubernetes namespace for the manifests')
+    parser.add_argument('--service', default=DEFAULT_SERVICE,
+                        help=f'docker-compose service name (default: {DEFAULT_SERVICE})')
+    parser.add_argument('--strict', action='store_true',
+                        help='Treat unknown variables as errors')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='Only print the summary')
+    args = parser.parse_args()
+    
+    if not args.tenant_files and not args.jsonl:
+        parser.error("give tenant files or --jsonl")
+    
+    try:
+        plan = load_plan(args.schema, args.strict, load_document(args.base) if args.base else None)
+        if plan.base_errors:
+            for issue in plan.base_errors:
+                logger.error(f"Base document: {issue['variable']}: {issue['message']}")
+            sys.exit(1)
+        
+        # Progress and issues go to stderr so stdout can carry the manifests
+        report = sys.stderr if args.stdout else sys.stdout
+        total = 0
+        failed = 0
+        changed = 0
+        claimed: Dict[str, str] = {}
+        start = time.perf_counter()
+        for tenant, overrides in iter_tenants(args.tenant_files, args.jsonl):
+            total += 1
+            conflict = claim_names(claimed, tenant, args.format)
+            if conflict:
+                if not args.quiet:
+                    print(f"\n{tenant}: FAILED\n  error: {conflict}", file=report)
+                failed += 1
+                continue
+            rendered, texts = render_tenant(plan, tenant, overrides, args.format, args.service, args.namespace)
+            if not args.quiet and (rendered["errors"] or rendered["warnings"]):
+                print(f"\n{tenant}: {'FAILED' if rendered['errors'] else 'rendered'}", file=report)
+                for issue in rendered["errors"]:
+                    print(f"  error: {issue['variable']}: {issue['message']}", file=report)
+                for issue in rendered["warnings"]:
+                    print(f"  warning: {issue['variable']}: {issue['message']}", file=report)
+            if rendered["errors"]:
+                failed += 1
+                continue
+            if args.stdout:
+                stream_tenant(sys.stdout, tenant, args.format, texts, first=total - failed == 1)
+            else:
+                changed += write_tenant(args.output_dir, tenant, args.format, texts)
+        elapsed = time.perf_counter() - start
+        
+        # Print summary
+        print(f"\nRendering complete!", file=report)
+        print(f"- Rendered {total - failed} of {total} tenants as {args.format} in {elapsed:.3f}s"
+              f" ({total / elapsed if elapsed else 0:.0f} per second)", file=report)
+        if not args.stdout:
+            print(f"- {changed} files changed in {args.output_dir}", file=report)
+        if failed:
+            print(f"- {failed} tenants failed and were not written", file=report)
+            sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error rendering configurations: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
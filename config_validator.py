@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+OpenWebUI Config Validator
+
+This script validates OpenWebUI environment configurations against the generated schema:
+1. Compiles the schema once into one check closure per variable
+2. Coerces environment strings to the variable's schema type
+3. Checks enum values
+4. Reports variables that are set while their x-depends-on selectors are inactive
+5. Masks x-sensitive values in the results and reports
+
+Configurations can be .env files or, for bulk validation, a JSON Lines file with one
+configuration object per line. An empty value means "use the default" and is not checked.
+
+Usage:
+  python config_validator.py --schema openwebui-config-schema.json tenant-a.env tenant-b.env
+  python config_validator.py --schema openwebui-config-schema.json --jsonl tenants.jsonl --report validation.json
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# KEY=VALUE lines of an env file, with an optional "export" prefix
+ENV_LINE_RE = re.compile(r"^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$")
+
+# Boolean spellings accepted in environment values
+TRUE_VALUES = frozenset({"true", "1", "yes", "on"})
+FALSE_VALUES = frozenset({"false", "0", "no", "off"})
+
+# Replacement for x-sensitive values in results
+MASK = "********"
+
+def _coerce_string(value: Any) -> str:
+    """
+    Accept a string value as is.
+    """
+    if not isinstance(value, str):
+        raise ValueError("expected a string")
+    return value
+
+def _coerce_boolean(value: Any) -> bool:
+    """
+    Coerce true/false style values to a boolean.
+    """
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).strip().lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError("expected a boolean (true/false)")
+
+def _coerce_integer(value: Any) -> int:
+    """
+    Coerce a value to an integer.
+    """
+    if isinstance(value, bool):
+        raise ValueError("expected an integer")
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError("expected an integer") from None
+
+def _coerce_number(value: Any) -> float:
+    """
+    Coerce a value to a number.
+    """
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        raise ValueError("expected a number") from None
+
+def _coerce_array(value: Any) -> list:
+    """
+    Coerce a JSON array or a comma separated list to a list.
+    """
+    if isinstance(value, list):
+        return value
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            raise ValueError("expected a JSON array") from None
+        if not isinstance(parsed, list):
+            raise ValueError("expected a JSON array")
+        return parsed
+    # Plain lists are comma separated, like RAG_ALLOWED_FILE_EXTENSIONS
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+def _coerce_object(value: Any) -> dict:
+    """
+    Coerce a JSON object to a dictionary.
+    """
+    if isinstance(value, dict):
+        return value
+    try:
+        parsed = json.loads(str(value))
+    except ValueError:
+        raise ValueError("expected a JSON object") from None
+    if not isinstance(parsed, dict):
+        raise ValueError("expected a JSON object")
+    return parsed
+
+# Coercion for each JSON Schema type; each raises ValueError with a short message
+COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "string": _coerce_string,
+    "boolean": _coerce_boolean,
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "array": _coerce_array,
+    "object": _coerce_object
+}
+
+def compile_check(prop: Dict) -> Callable[[Any], Any]:
+    """
+    Compile a schema property into a check closure.
+    
+    Args:
+        prop: The schema property
+    
+    Returns:
+        A function that returns the coerced value or raises ValueError
+    """
+    coerce = COERCERS.get(prop.get("type"), _coerce_string)
+    enum = prop.get("enum")
+    if not enum:
+        return coerce
+    
+    allowed = frozenset(enum)
+    allowed_text = ", ".join(str(value) for value in enum)
+    
+    def check(value: Any) -> Any:
+        value = coerce(value)
+        if value not in allowed:
+            raise ValueError(f"must be one of: {allowed_text}")
+        return value
+    
+    return check
+
+def _accepted_values(condition: Any) -> Tuple:
+    """
+    Normalize an x-depends-on or dependency-index condition to a tuple of values.
+    
+    Args:
+        condition: A single selector value or a list of values
+    
+    Returns:
+        The accepted values
+    """
+    return tuple(condition) if isinstance(condition, list) else (condition,)
+
+class ConfigValidator:
+    """
+    Validator compiled once from a schema and reused for every configuration.
+    """
+    
+    def __init__(self, schema: Dict, strict: bool = False):
+        """
+        Compile the schema.
+        
+        Args:
+            schema: A full schema or a properties-only schema
+            strict: Whether unknown variables and variables set while their
+                selectors are inactive are errors instead of warnings
+        """
+        config_schema = schema.get("components", {}).get("schemas", {}).get("OpenWebUIConfig")
+        properties = config_schema["properties"] if config_schema else schema
+        dependency_index = (config_schema or {}).get("x-dependency-index", {})
+        transitive = dependency_index.get("conditions", {})
+        
+        self.strict = strict
+        self.checks: Dict[str, Callable[[Any], Any]] = {}
+        self.sensitive = frozenset(name for name, prop in properties.items() if prop.get("x-sensitive"))
+        self.defaults: Dict[str, Any] = {}
+        # variable -> ((selector, accepted values), ...)
+        self.gates: Dict[str, Tuple[Tuple[str, Tuple], ...]] = {}
+        
+        for var_name, prop in properties.items():
+            check = compile_check(prop)
+            self.checks[var_name] = check
+            if prop.get("default") is not None:
+                try:
+                    self.defaults[var_name] = COERCERS.get(prop.get("type"), _coerce_string)(prop["default"])
+                except ValueError:
+                    # Some documented defaults are prose; treat them as unset
+                    pass
+            
+            # Prefer the transitive conditions from the dependency index
+            conditions = transitive.get(var_name, prop.get("x-depends-on"))
+            if conditions:
+                self.gates[var_name] = tuple(
+                    (selector, _accepted_values(values)) for selector, values in conditions.items()
+                )
+        
+        logger.info(f"Compiled {len(self.checks)} variable checks ({len(self.gates)} gated, {len(self.sensitive)} sensitive)")
+    
+    def mask(self, var_name: str, value: Any) -> Any:
+        """
+        Mask a value if its variable is sensitive.
+        
+        Args:
+            var_name: The variable name
+            value: The value
+        
+        Returns:
+            The value, or a mask for sensitive variables
+        """
+        return MASK if var_name in self.sensitive else value
+    
+    def validate(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate one configuration.
+        
+        Args:
+            config: Variable names mapped to environment strings or typed values
+        
+        Returns:
+            A dictionary with "valid", the coerced (and masked) "values", and
+            lists of "errors" and "warnings"
+        """
+        checks = self.checks
+        values = {}
+        errors = []
+        warnings = []
+        
+        for var_name, raw in config.items():
+            check = checks.get(var_name)
+            if check is None:
+                issue = {"variable": var_name, "message": "unknown variable"}
+                (errors if self.strict else warnings).append(issue)
+                continue
+            if raw is None or raw == "":
+                continue
+            try:
+                values[var_name] = check(raw)
+            except ValueError as e:
+                errors.append({"variable": var_name, "value": self.mask(var_name, raw), "message": str(e)})
+        
+        # Gate dependent variables on their selectors' effective values
+        gates = self.gates
+        defaults = self.defaults
+        for var_name in values:
+            gate = gates.get(var_name)
+            if gate is None:
+                continue
+            for selector, accepted in gate:
+                current = values.get(selector, defaults.get(selector))
+                if current not in accepted:
+                    issue = {
+                        "variable": var_name,
+                        "message": f"set but inactive: requires {selector} in {list(accepted)}, "
+                                   f"which is {self.mask(selector, current)!r}"
+                    }
+                    (errors if self.strict else warnings).append(issue)
+                    break
+        
+        if self.sensitive:
+            for var_name in self.sensitive.intersection(values):
+                values[var_name] = MASK
+        
+        return {"valid": not errors, "values": values, "errors": errors, "warnings": warnings}
+    
+    def validate_many(self, configs: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Validate configurations in bulk.
+        
+        Args:
+            configs: (name, configuration) pairs
+        
+        Yields:
+            (name, result) pairs
+        """
+        validate = self.validate
+        for name, config in configs:
+            yield name, validate(config)
+
+def load_validator(schema_path: str, strict: bool = False) -> ConfigValidator:
+    """
+    Load a schema file and compile it into a validator.
+    
+    Args:
+        schema_path: Path to the schema JSON file
+        strict: Whether to report unknown and inactive variables as errors
+    
+    Returns:
+        The compiled validator
+    """
+    try:
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading schema {schema_path}: {e}")
+        raise
+    return ConfigValidator(schema, strict)
+
+def parse_env_text(text: str) -> Dict[str, str]:
+    """
+    Parse the contents of an env file.
+    
+    Blank lines and comments are skipped, and matching single or double
+    quotes around a value are removed.
+    
+    Args:
+        text: The env file contents
+    
+    Returns:
+        A dictionary of variable names to values
+    """
+    config = {}
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = ENV_LINE_RE.match(line)
+        if not match:
+            continue
+        name, value = match.groups()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        config[name] = value
+    return config
+
+def parse_env_file(file_path: str) -> Dict[str, str]:
+    """
+    Parse an env file.
+    
+    Args:
+        file_path: Path to the env file
+    
+    Returns:
+        A dictionary of variable names to values
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return parse_env_text(f.read())
+    except Exception as e:
+        logger.error(f"Error reading env file {file_path}: {e}")
+        raise
+
+def read_jsonl_configs(file_path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Read configurations from a JSON Lines file.
+    
+    Each line is either a configuration object or {"name": ..., "config": {...}}.
+    Use "-" to read from stdin.
+    
+    Args:
+        file_path: Path to the JSON Lines file
+    
+    Yields:
+        (name, configuration) pairs
+    """
+    f = sys.stdin if file_path == "-" else open(file_path, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record.get("config"), dict):
+                yield str(record.get("name", f"{file_path}:{line_number}")), record["config"]
+            else:
+                yield f"{file_path}:{line_number}", record
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate OpenWebUI configurations against the generated schema')
+    parser.add_argument('env_files', nargs='*',
+                        help='Env files to validate')
+    parser.add_argument('--schema', '-s', default='openwebui-config-schema.json',
+                        help='Path to the schema JSON file')
+    parser.add_argument('--jsonl',
+                        help='JSON Lines file with one configuration per line ("-" for stdin)')
+    parser.add_argument('--strict', action='store_true',
+                        help='Treat unknown variables and variables set while inactive as errors')
+    parser.add_argument('--report',
+                        help='Path to write the validation results as JSON')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='Only print the summary')
+    args = parser.parse_args()
+    
+    if not args.env_files and not args.jsonl:
+        parser.error("give env files or --jsonl")
+    
+    try:
+        validator = load_validator(args.schema, args.strict)
+        
+        def configs() -> Iterator[Tuple[str, Dict[str, Any]]]:
+            for file_path in args.env_files:
+                yield file_path, parse_env_file(file_path)
+            if args.jsonl:
+                yield from read_jsonl_configs(args.jsonl)
+        
+        results: List[Dict[str, Any]] = []
+        total = 0
+        invalid = 0
+        start = time.perf_counter()
+        for name, result in validator.validate_many(configs()):
+            total += 1
+            if not result["valid"]:
+                invalid += 1
+            if args.report:
+                results.append({"name": name, **result})
+            if not args.quiet and (result["errors"] or result["warnings"]):
+                print(f"\n{name}: {'valid' if result['valid'] else 'INVALID'}")
+                for issue in result["errors"]:
+                    print(f"  error: {issue['variable']}: {issue['message']}")
+                for issue in result["warnings"]:
+                    print(f"  warning: {issue['variable']}: {issue['message']}")
+        elapsed = time.perf_counter() - start
+        
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            logger.info(f"Saved validation results to {args.report}")
+        
+        # Print summary
+        print(f"\nValidation complete!")
+        print(f"- Validated {total} configurations in {elapsed:.3f}s"
+              f" ({total / elapsed if elapsed else 0:.0f} per second)")
+        print(f"- {total - invalid} valid, {invalid} invalid")
+        
+        if invalid:
+            sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error validating configurations: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
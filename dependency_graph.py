@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Relationship Dependency Graph
+
+This module builds a directed graph from the relationship mappings, with an edge from
+each selector variable to every field it controls, and precomputes:
+1. Dependency cycles (strongly connected components)
+2. A topological order of the variables, with the members of a cycle kept together
+3. The transitive closure of each field's conditions and of each selector's dependents
+
+The results are emitted as a compact index (x-dependency-index) in the schema, so a
+consumer can decide whether a field is active by checking its precomputed conditions
+instead of walking x-provider-fields recursively:
+
+  active(field) = all(config[selector] in values
+                      for selector, values in index["conditions"][field].items())
+"""
+
+import heapq
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class DependencyGraph:
+    """
+    Selector to field dependencies with their accepted selector values.
+    
+    A field that depends on several selectors is active only when every one of
+    them is satisfied; a selector is satisfied when it has any of the values
+    the field accepts. Variables are kept in the order they were first seen,
+    which is used to break ties, so all results are deterministic.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty graph.
+        """
+        # field -> {selector: [accepted values]}
+        self.conditions: Dict[str, Dict[str, List[Any]]] = {}
+        # selector -> [direct dependents]
+        self.dependents: Dict[str, List[str]] = {}
+        # variable -> position in first-seen order
+        self.positions: Dict[str, int] = {}
+        self._components: Optional[List[List[str]]] = None
+        self._closure: Optional[Dict[str, Dict[str, List[Any]]]] = None
+    
+    def _add_node(self, var_name: str) -> None:
+        """
+        Add a variable to the first-seen order.
+        
+        Args:
+            var_name: The variable name
+        """
+        if var_name not in self.positions:
+            self.positions[var_name] = len(self.positions)
+    
+    def add_dependency(self, field: str, selector: str, value: Any) -> None:
+        """
+        Record that a field is active when a selector has a given value.
+        
+        Args:
+            field: The dependent field
+            selector: The selector variable
+            value: A selector value that activates the field
+        """
+        self._add_node(selector)
+        self._add_node(field)
+        values = self.conditions.setdefault(field, {}).setdefault(selector, [])
+        if value not in values:
+            values.append(value)
+        dependents = self.dependents.setdefault(selector, [])
+        if field not in dependents:
+            dependents.append(field)
+        self._components = None
+        self._closure = None
+    
+    @property
+    def nodes(self) -> List[str]:
+        """
+        All variables in the graph, in first-seen order.
+        """
+        return list(self.positions)
+    
+    def strongly_connected_components(self) -> List[List[str]]:
+        """
+        Find the strongly connected components with Tarjan's algorithm.
+        
+        The traversal is iterative, so long dependency chains cannot hit the
+        recursion limit.
+        
+        Returns:
+            The components, each listed in first-seen order
+        """
+        if self._components is not None:
+            return self._components
+        
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components = []
+        
+        for root in self.positions:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.dependents.get(root, [])))]
+            
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.dependents.get(child, []))))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    # All children visited: close the node
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component, key=self.positions.__getitem__))
+        
+        self._components = components
+        return components
+    
+    def cycles(self) -> List[List[str]]:
+        """
+        Find the dependency cycles.
+        
+        Returns:
+            The variables of each cycle, including fields that depend on themselves
+        """
+        return [
+            component for component in self.strongly_connected_components()
+            if len(component) > 1 or component[0] in self.conditions.get(component[0], {})
+        ]
+    
+    def _condensation_order(self) -> List[List[str]]:
+        """
+        Order the strongly connected components topologically.
+        
+        Returns:
+            The components, selectors before the fields they control
+        """
+        components = self.strongly_connected_components()
+        component_of = {member: i for i, component in enumerate(components) for member in component}
+        successors: List[Set[int]] = [set() for _ in components]
+        indegree = [0] * len(components)
+        for selector, fields in self.dependents.items():
+            for field in fields:
+                source, target = component_of[selector], component_of[field]
+                if source != target and target not in successors[source]:
+                    successors[source].add(target)
+                    indegree[target] += 1
+        
+        # Kahn's algorithm, breaking ties by first-seen position
+        ready = [(self.positions[component[0]], i) for i, component in enumerate(components) if not indegree[i]]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            _, i = heapq.heappop(ready)
+            ordered.append(components[i])
+            for j in successors[i]:
+                indegree[j] -= 1
+                if not indegree[j]:
+                    heapq.heappush(ready, (self.positions[components[j][0]], j))
+        return ordered
+    
+    def topological_order(self) -> List[str]:
+        """
+        Order the variables so every selector comes before the fields it controls.
+        
+        Returns:
+            The variables in topological order; members of a cycle are adjacent
+        """
+        return [member for component in self._condensation_order() for member in component]
+    
+    def transitive_conditions(self) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Compute every condition a field needs, including those of its selectors.
+        
+        Every path to a selector must be satisfied, so when a field reaches the
+        same selector by more than one path only the values all of them accept
+        are kept. An empty list means no value does, and the field is unreachable.
+        
+        Returns:
+            A dictionary mapping each field to {selector: [accepted values]}
+        """
+        if self._closure is not None:
+            return self._closure
+        
+        closure: Dict[str, Dict[str, List[Any]]] = {}
+        for component in self._condensation_order():
+            combined: Dict[str, List[Any]] = {}
+            members = set(component)
+            for member in component:
+                for selector, values in self.conditions.get(member, {}).items():
+                    _merge_values(combined, selector, values)
+                    if selector not in members:
+                        for inherited, inherited_values in closure.get(selector, {}).items():
+                            _merge_values(combined, inherited, inherited_values)
+            for member in component:
+                if member in self.conditions:
+                    closure[member] = {s: v for s, v in combined.items() if s != member or len(component) == 1}
+        self._closure = {field: closure[field] for field in self.positions if field in closure}
+        return self._closure
+    
+    def unreachable(self) -> List[str]:
+        """
+        Find the fields whose conditions no configuration can satisfy.
+        
+        Returns:
+            The fields with a selector that accepts no value, in first-seen order
+        """
+        return [field for field, conditions in self.transitive_conditions().items()
+                if any(not values for values in conditions.values())]
+    
+    def transitive_dependents(self) -> Dict[str, List[str]]:
+        """
+        Compute every field a selector controls, directly or through other selectors.
+        
+        Returns:
+            A dictionary mapping each selector to its dependents in topological order
+        """
+        order = self._condensation_order()
+        rank = {member: i for i, component in enumerate(order) for member in component}
+        reachable: Dict[str, Set[str]] = {}
+        for component in reversed(order):
+            combined: Set[str] = set()
+            for member in component:
+                for field in self.dependents.get(member, []):
+                    combined.add(field)
+                    combined |= reachable.get(field, set())
+            for member in component:
+                reachable[member] = combined
+        return {
+            selector: sorted(reachable[selector], key=lambda var: (rank[var], self.positions[var]))
+            for selector in self.positions if selector in self.dependents
+        }
+    
+    def to_index(self) -> Dict[str, Any]:
+        """
+        Build the compact x-dependency-index for the schema.
+        
+        Returns:
+            A dictionary with the topological order, the transitive conditions of
+            each field, the transitive dependents of each selector, and any cycles
+            and unreachable fields
+        """
+        index = {
+            "order": self.topological_order(),
+            "conditions": self.transitive_conditions(),
+            "dependents": self.transitive_dependents()
+        }
+        cycles = self.cycles()
+        if cycles:
+            index["cycles"] = cycles
+        unreachable = self.unreachable()
+        if unreachable:
+            index["unreachable"] = unreachable
+        return index
+
+def _merge_values(conditions: Dict[str, List[Any]], selector: str, values: Iterable[Any]) -> None:
+    """
+    Add the values one path accepts for a selector.
+    
+    The first path sets the accepted values; later paths narrow them to the
+    values both accept, keeping the first-seen order.
+    
+    Args:
+        conditions: The {selector: [accepted values]} dictionary to update
+        selector: The selector variable
+        values: Values the path accepts
+    """
+    values = list(values)
+    if selector not in conditions:
+        conditions[selector] = [value for i, value in enumerate(values) if value not in values[:i]]
+    else:
+        conditions[selector] = [value for value in conditions[selector] if value in values]
+
+def build_dependency_graph(relationships: Dict, variables: Optional[Set[str]] = None) -> DependencyGraph:
+    """
+    Build the dependency graph from relationship mappings.
+    
+    Provider mappings add an edge from the selector to each provider field,
+    activated by the provider's selector value; boolean selectors add an edge
+    activated by their value (True unless given).
+    
+    Args:
+        relationships: The relationship mappings
+        variables: Optional set of schema variables; relationships involving
+            other variables are ignored, like apply_relationships does
+    
+    Returns:
+        The dependency graph
+    """
+    graph = DependencyGraph()
+    
+    def known(var_name: str) -> bool:
+        return variables is None or var_name in variables
+    
+    for selector_var, mapping in relationships.get("provider_mappings", {}).items():
+        if not known(selector_var):
+            continue
+        for provider, fields in mapping.get("provider_fields", {}).items():
+            for field in fields:
+                if known(field):
+                    graph.add_dependency(field, selector_var, provider)
+    
+    for selector_var, mapping in relationships.get("boolean_selectors", {}).items():
+        if not known(selector_var):
+            continue
+        for field in mapping.get("provider_fields", []):
+            if known(field):
+                graph.add_dependency(field, selector_var, mapping.get("value", True))
+    
+    for cycle in graph.cycles():
+        logger.warning(f"Dependency cycle between {', '.join(cycle)}")
+    for field in graph.unreachable():
+        logger.warning(f"No selector values satisfy every condition of {field}")
+    
+    return graph
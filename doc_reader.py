@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Documentation Reader
+
+Memory-mapped access to large documentation files for the pipeline scripts:
+1. The file is mapped read-only instead of being read into a string, so the operating
+   system pages in only what is scanned and shares the pages between processes
+2. Line start offsets are indexed in one scan when they are first needed, so offsets
+   convert to line numbers with a binary search
+3. Sections are exposed as views over the mapping and only decoded when their text is
+   actually used
+4. Lines can be streamed without materializing the whole document
+
+Offsets are byte offsets into the UTF-8 encoded file.
+"""
+
+import mmap
+import bisect
+import logging
+from array import array
+from typing import Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+class MappedDocument:
+    """
+    A read-only memory-mapped documentation file.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Map a documentation file.
+        
+        The mapping stays valid after the file is closed, and it is released
+        when the document and every view of it are garbage collected.
+        
+        Args:
+            path: Path to the file
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.buffer: Union[mmap.mmap, bytes] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                self.buffer = b""
+        self._line_offsets: Optional[array] = None
+    
+    def __len__(self) -> int:
+        return len(self.buffer)
+    
+    @property
+    def line_offsets(self) -> array:
+        """
+        Byte offsets of the start of every line, indexed on first use.
+        """
+        if self._line_offsets is None:
+            offsets = array('q', [0])
+            find = self.buffer.find
+            position = find(b"\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = find(b"\n", position + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+    
+    def line_number(self, offset: int) -> int:
+        """
+        Convert a byte offset to a zero-based line number.
+        
+        Args:
+            offset: Byte offset into the document
+        
+        Returns:
+            The number of the line containing the offset
+        """
+        return bisect.bisect_right(self.line_offsets, offset) - 1
+    
+    def view(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """
+        Get a zero-copy view of a byte range.
+        
+        Args:
+            start: Start offset
+            end: End offset (defaults to the end of the document)
+        
+        Returns:
+            A memoryview over the mapping
+        """
+        return memoryview(self.buffer)[start:end]
+    
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Decode a byte range.
+        
+        Args:
+            start: Start offset
+            end: End offset (defaults to the end of the document)
+        
+        Returns:
+            The decoded text
+        """
+        return str(self.view(start, end), 'utf-8')
+    
+    def iter_lines(self) -> Iterator[memoryview]:
+        """
+        Stream the lines of the document without their line endings.
+        
+        Yields:
+            A zero-copy view of each line
+        """
+        view = memoryview(self.buffer)
+        find = self.buffer.find
+        start = 0
+        while start < len(view):
+            end = find(b"\n", start)
+            if end == -1:
+                end = len(view)
+            yield view[start:end]
+            start = end + 1
+
+class SectionView:
+    """
+    A lazily decoded section of a str or bytes-like document.
+    
+    The view only keeps a reference to the shared document, so sections do not
+    copy it; str() produces the section text.
+    """
+    
+    __slots__ = ("source", "start", "end")
+    
+    def __init__(self, source: Union[str, bytes, mmap.mmap], start: int, end: int):
+        """
+        Create a view of a document range.
+        
+        Args:
+            source: The document, as text or as UTF-8 bytes
+            start: Start offset
+            end: End offset
+        """
+        self.source = source
+        self.start = start
+        self.end = end
+    
+    def __str__(self) -> str:
+        if isinstance(self.source, str):
+            return self.source[self.start:self.end]
+        return str(memoryview(self.source)[self.start:self.end], 'utf-8')
+    
+    def __len__(self) -> int:
+        return self.end - self.start
+    
+    def __repr__(self) -> str:
+        return f"SectionView({self.start}, {self.end})"
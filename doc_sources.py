@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Documentation Sources
+
+Readers for the environment configuration document that do not need the network:
+1. A local file, or stdin
+2. A tar archive of the docs repository (such as a GitHub release tarball), read without
+   extracting it
+3. A blob read straight from a local git repository at any ref, without a checkout
+
+A GitRepository keeps one `git cat-file --batch` process open, so reading the document at
+many refs costs one process start instead of one per ref.
+
+Usage:
+  with GitRepository("../open-webui-docs") as repo:
+      for ref in ("v0.6.0", "v0.6.5"):
+          content = repo.read_text(ref, DEFAULT_DOC_PATH)
+"""
+
+import re
+import sys
+import logging
+import subprocess
+from typing import Optional
+
+from instrumentation import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+# Path of the environment configuration document inside the docs repository
+DEFAULT_DOC_PATH = "docs/getting-started/env-configuration.md"
+
+def safe_label(label: str) -> str:
+    """
+    Turn a version label into a safe directory name.
+    
+    Args:
+        label: The version label (for example a git ref)
+    
+    Returns:
+        The label with unsafe characters replaced
+    """
+    return re.sub(r'[^\w.-]+', '-', label).strip('-') or "version"
+
+def read_local(path: str) -> str:
+    """
+    Read the documentation from a local file, or from stdin when path is "-".
+    
+    Args:
+        path: Path to the document, or "-"
+    
+    Returns:
+        The documentation content
+    """
+    try:
+        if path == "-":
+            data = sys.stdin.buffer.read()
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+    except Exception as e:
+        logger.error(f"Error reading documentation from {'stdin' if path == '-' else path}: {e}")
+        raise
+    record_bytes_read(len(data))
+    return data.decode('utf-8')
+
+def read_tarball(archive: str, doc_path: str = DEFAULT_DOC_PATH) -> str:
+    """
+    Read the documentation from a tar archive without extracting it.
+    
+    The member is matched by doc_path, with or without the top-level directory
+    that repository tarballs add (for example "open-webui-docs-main/").
+    
+    Args:
+        archive: Path to the archive (any compression tarfile supports)
+        doc_path: Path of the document inside the repository
+    
+    Returns:
+        The documentation content
+    """
+    # tarfile pulls in the compression modules, so it is only imported here
+    import tarfile
+    
+    doc_path = doc_path.strip("/")
+    try:
+        with tarfile.open(archive, "r:*") as tar:
+            for member in tar:
+                name = member.name[2:] if member.name.startswith("./") else member.name
+                if member.isfile() and (name == doc_path or name.endswith(f"/{doc_path}")):
+                    data = tar.extractfile(member).read()
+                    record_bytes_read(len(data))
+                    logger.info(f"Read {member.name} from {archive}")
+                    return data.decode('utf-8')
+    except Exception as e:
+        logger.error(f"Error reading documentation from {archive}: {e}")
+        raise
+    raise FileNotFoundError(f"{doc_path} not found in {archive}")
+
+class GitRepository:
+    """
+    A local git repository read through one long-running `git cat-file --batch` process.
+    
+    Objects are read from the object database directly, so any ref can be read
+    without a checkout and the working tree is never touched. The process is
+    started on the first read and reused until close().
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the repository handle.
+        
+        Args:
+            path: Path to the repository (a working copy or a bare mirror)
+        """
+        self.path = path
+        self._process: Optional[subprocess.Popen] = None
+    
+    def __enter__(self) -> "GitRepository":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _start(self) -> subprocess.Popen:
+        """
+        Start the cat-file process.
+        
+        Returns:
+            The running process
+        """
+        self._process = subprocess.Popen(
+            ["git", "-C", self.path, "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        return self._process
+    
+    def read_blob(self, ref: str, path: str) -> bytes:
+        """
+        Read a file at a ref.
+        
+        Args:
+            ref: Any git revision (branch, tag or commit)
+            path: Path of the file inside the repository
+        
+        Returns:
+            The file content
+        """
+        spec = f"{ref}:{path.strip('/')}"
+        if "\n" in spec:
+            raise ValueError(f"Invalid revision or path: {spec!r}")
+        
+        process = self._process or self._start()
+        try:
+            process.stdin.write(spec.encode('utf-8') + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline()
+        except BrokenPipeError:
+            header = b""
+        if not header:
+            error = process.stderr.read().decode('utf-8', 'replace').strip()
+            self.close()
+            raise RuntimeError(f"git cat-file failed in {self.path}: {error or 'no output'}")
+        
+        # "<spec> missing" or "<spec> ambiguous"; the spec itself may contain spaces
+        if header.rstrip().endswith((b" missing", b" ambiguous")):
+            reason = header.rstrip().rsplit(b" ", 1)[1].decode('ascii')
+            raise FileNotFoundError(f"{spec} not found in {self.path} ({reason})")
+        _, object_type, size = header.split()
+        size = int(size)
+        data = process.stdout.read(size)
+        process.stdout.read(1)  # Newline after the object
+        if object_type != b"blob":
+            raise IsADirectoryError(f"{spec} is a {object_type.decode('ascii')}, not a file")
+        
+        record_bytes_read(len(data))
+        return data
+    
+    def read_text(self, ref: str, path: str = DEFAULT_DOC_PATH) -> str:
+        """
+        Read a UTF-8 text file at a ref.
+        
+        Args:
+            ref: Any git revision (branch, tag or commit)
+            path: Path of the file inside the repository
+        
+        Returns:
+            The file content
+        """
+        return self.read_blob(ref, path).decode('utf-8')
+    
+    def close(self) -> None:
+        """
+        Stop the cat-file process.
+        """
+        process, self._process = self._process, None
+        if process is None:
+            return
+        for stream in (process.stdin, process.stdout, process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        process.wait()
@@ -3,23 +3,30 @@
 Download and Prepare OpenWebUI Documentation
 
 This script:
-1. Downloads the latest OpenWebUI environment configuration documentation
+1. Downloads the latest OpenWebUI environment configuration documentation, or reads it
+   from a local file, stdin, a tarball or a local git repository at one or more refs
 2. Extracts DEFAULT_*_TEMPLATE variables to a separate JSON file
 3. Splits the documentation into sections based on ## headers
 4. Saves each section as a separate Markdown file
 
 Usage:
   python download_and_prepare_docs.py --output-dir prepared_docs
+  python download_and_prepare_docs.py --file env-configuration.md
+  python download_and_prepare_docs.py --git-repo ../docs --ref v0.6.0 --ref v0.6.5 --output-dir versions
 """
 
 import re
 import os
 import json
-import requests
+import hashlib
 import argparse
 import logging
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from output_writer import file_hash, write_text_if_changed, write_json_if_changed, remove_stale_files
+from instrumentation import stage, record_bytes_read, add_profile_arguments, profiling
+from doc_sources import DEFAULT_DOC_PATH, GitRepository, read_local, read_tarball, safe_label
 
 # Set up logging
 logging.basicConfig(
@@ -31,49 +38,362 @@ logger = logging.getLogger(__name__)
 # URL of the OpenWebUI environment configuration documentation
 DOCS_URL = "https://raw.githubusercontent.com/open-webui/docs/refs/heads/main/docs/getting-started/env-configuration.md"
 
-def download_documentation() -> str:
+# Timeout in seconds for documentation downloads
+DEFAULT_TIMEOUT = 30
+
+# Directory holding downloaded documents and their HTTP validators
+DEFAULT_CACHE_DIR = ".fetch_cache"
+
+def download_documentation(url: str = DOCS_URL, timeout: float = DEFAULT_TIMEOUT) -> str:
     """
     Download the latest OpenWebUI documentation.
     
+    Args:
+        url: URL of the documentation to download
+        timeout: Timeout in seconds for the HTTP request
+    
     Returns:
         The content of the environment configuration documentation
     """
+    # requests is only imported when a download actually happens
+    import requests
+    
     try:
-        response = requests.get(DOCS_URL)
+        response = requests.get(url, timeout=timeout)
         response.raise_for_status()  # Raise an exception for HTTP errors
+        record_bytes_read(len(response.content))
         return response.text
     except Exception as e:
         logger.error(f"Error downloading documentation: {e}")
         raise
 
-def extract_templates(content: str) -> Tuple[str, Dict[str, str]]:
+def _content_hash(content: str) -> str:
     """
-    Extract DEFAULT_*_TEMPLATE variables and their content from the documentation.
+    Hash document content for change detection.
+    
+    Args:
+        content: The document content
+    
+    Returns:
+        A hex digest of the content
+    """
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def _fetch_cache_paths(url: str, cache_dir: str) -> Tuple[str, str]:
+    """
+    Get the metadata and body paths of the fetch cache entry for a URL.
+    
+    Args:
+        url: URL of the documentation
+        cache_dir: Directory holding the fetch cache
+    
+    Returns:
+        A tuple of (metadata_path, body_path)
+    """
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}.json"), os.path.join(cache_dir, f"{key}.md")
+
+def load_fetch_cache(url: str, cache_dir: str) -> Tuple[Dict, Optional[str]]:
+    """
+    Load the cached metadata and body for a URL.
+    
+    Args:
+        url: URL of the documentation
+        cache_dir: Directory holding the fetch cache
+    
+    Returns:
+        A tuple of (metadata, body), with empty metadata and no body if the
+        URL has not been cached yet
+    """
+    meta_path, body_path = _fetch_cache_paths(url, cache_dir)
+    if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+        return {}, None
+    
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'r', encoding='utf-8') as f:
+            record_bytes_read(os.fstat(f.fileno()).st_size)
+            body = f.read()
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable fetch cache for {url}: {e}")
+        return {}, None
+    
+    # Discard entries whose body no longer matches the recorded hash
+    if meta.get("url") != url or meta.get("sha256") != _content_hash(body):
+        logger.warning(f"Ignoring inconsistent fetch cache for {url}")
+        return {}, None
+    
+    return meta, body
+
+def save_fetch_cache(meta: Dict, body: str, cache_dir: str) -> None:
+    """
+    Save the metadata and body of a fetched document to the cache.
+    
+    Args:
+        meta: Metadata including the URL, validators and body hash
+        body: The fetched document
+        cache_dir: Directory holding the fetch cache
+    """
+    meta_path, body_path = _fetch_cache_paths(meta["url"], cache_dir)
+    
+    try:
+        write_text_if_changed(body_path, body)
+        write_json_if_changed(meta_path, meta)
+    except Exception as e:
+        logger.error(f"Error saving fetch cache to {cache_dir}: {e}")
+        raise
+
+def fetch_documentation(url: str, cache_dir: str,
+                        timeout: float = DEFAULT_TIMEOUT) -> Tuple[str, Dict]:
+    """
+    Fetch the documentation with a conditional request backed by an on-disk cache.
+    
+    The stored ETag and Last-Modified validators are sent as If-None-Match and
+    If-Modified-Since. A 304 response is served from the cached body.
+    
+    Args:
+        url: URL of the documentation to fetch
+        cache_dir: Directory holding the fetch cache
+        timeout: Timeout in seconds for the HTTP request
+    
+    Returns:
+        A tuple of (content, metadata); metadata["changed"] is False when the
+        server answered 304 or the body hash matches the cached one
+    """
+    meta, cached_body = load_fetch_cache(url, cache_dir)
+    
+    headers = {}
+    if cached_body is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    
+    import requests
+    
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached_body is not None:
+            logger.info(f"Documentation not modified since last fetch ({url})")
+            return cached_body, dict(meta, changed=False)
+        response.raise_for_status()  # Raise an exception for HTTP errors
+    except Exception as e:
+        logger.error(f"Error downloading documentation: {e}")
+        raise
+    
+    record_bytes_read(len(response.content))
+    content = response.text
+    digest = _content_hash(content)
+    changed = digest != meta.get("sha256")
+    if not changed:
+        logger.info(f"Downloaded documentation is identical to the cached copy ({url})")
+    
+    new_meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "sha256": digest,
+        # Output directories already prepared from this body
+        "prepared": meta.get("prepared", {}) if not changed else {}
+    }
+    save_fetch_cache(new_meta, content, cache_dir)
+    
+    return content, dict(new_meta, changed=changed)
+
+def _module_version() -> str:
+    """
+    Fingerprint this module, so prepared outputs are redone when the extraction changes.
+    
+    Returns:
+        A hex digest of the module source
+    """
+    return file_hash(os.path.abspath(__file__))
+
+def mark_prepared(meta: Dict, output_dir: str, cache_dir: str, files: List[str]) -> None:
+    """
+    Record that an output directory was prepared from the cached document.
+    
+    The document hash, the module fingerprint and the hash of every output
+    file are recorded, so a later run can tell whether the outputs still match.
+    
+    Args:
+        meta: Metadata returned by fetch_documentation
+        output_dir: Directory the prepared files were written to
+        cache_dir: Directory holding the fetch cache
+        files: Paths of the prepared files
+    """
+    cached_meta, body = load_fetch_cache(meta["url"], cache_dir)
+    if body is None:
+        return
+    cached_meta.setdefault("prepared", {})[os.path.abspath(output_dir)] = {
+        "sha256": cached_meta["sha256"],
+        "version": _module_version(),
+        "files": {os.path.abspath(path): file_hash(path) for path in files}
+    }
+    save_fetch_cache(cached_meta, body, cache_dir)
+
+def is_prepared(meta: Dict, output_dir: str) -> bool:
+    """
+    Check whether an output directory is already up to date with a fetched document.
+    
+    Args:
+        meta: Metadata returned by fetch_documentation
+        output_dir: Directory the prepared files are written to
+    
+    Returns:
+        True if the document is unchanged, was prepared into output_dir by
+        this version of the module, and every prepared file is unmodified
+    """
+    prepared = meta.get("prepared", {}).get(os.path.abspath(output_dir))
+    if meta.get("changed", True) or not isinstance(prepared, dict):
+        return False
+    if prepared.get("sha256") != meta.get("sha256") or prepared.get("version") != _module_version():
+        return False
+    return all(os.path.isfile(path) and file_hash(path) == digest
+               for path, digest in prepared.get("files", {}).items())
+
+# Template definition: the variable name, a colon and the opening code fence line
+TEMPLATE_MARKER = re.compile(
+    r"`(DEFAULT_[A-Z0-9_]+_TEMPLATE)`:[ \t]*\n?"
+    r"(?:[ \t]*\n)*([ \t]*)(`{3,})[ \t]*([^`\s]*)[^\n`]*\n"
+)
+
+# Start of a template definition, used to keep nested blocks from running into the next one
+TEMPLATE_NAME = re.compile(r"`DEFAULT_[A-Z0-9_]+_TEMPLATE`:")
+
+# A code fence line inside a template: indentation, backticks and an optional language
+FENCE_LINE = re.compile(r"^([ \t]*)(`{3,})[ \t]*([^`\s]*)[^\n`]*$", re.MULTILINE)
+
+def find_template_spans(content: str) -> Tuple[List[Dict], List[str]]:
+    """
+    Find DEFAULT_*_TEMPLATE definitions and the spans they cover, in one pass.
+    
+    A template is the code block that follows its `NAME`: marker. The block may
+    be indented (e.g. inside a list item), fenced with three or more backticks
+    and labelled with any language. It ends at the first bare fence line with
+    at least as many backticks, except that code blocks opened inside it with a
+    language label are matched first, so templates can contain examples in
+    their own code blocks.
     
     Args:
         content: The content of the documentation
+    
+    Returns:
+        A tuple of (spans, unterminated); each span is a dictionary with the
+        name, start, end, content and language of a template, and unterminated
+        lists the templates whose code block is never closed
+    """
+    spans = []
+    unterminated = []
+    position = 0
+    while True:
+        marker = TEMPLATE_MARKER.search(content, position)
+        if marker is None:
+            break
+        var_name, indent, fence, language = marker.groups()
+        body_start = marker.end()
+        
+        # Walk the fence lines of the block, tracking nested code blocks
+        depth = 0
+        closing = None
+        first_bare = None
+        for line in FENCE_LINE.finditer(content, body_start):
+            if line.group(3):
+                depth += 1
+                continue
+            if first_bare is None and len(line.group(2)) >= len(fence):
+                first_bare = line
+            if depth:
+                depth -= 1
+            elif len(line.group(2)) >= len(fence):
+                closing = line
+                break
+        
+        # A nested block left open must not swallow the templates that follow
+        if first_bare is not None and (closing is None or
+                                       TEMPLATE_NAME.search(content, body_start, closing.start())):
+            closing = first_bare
         
+        if closing is None:
+            unterminated.append(var_name)
+            position = body_start
+            continue
+        
+        # Drop the indentation of the opening fence from every line
+        body = content[body_start:max(body_start, closing.start() - 1)]
+        if indent:
+            body = re.sub(rf"^[ \t]{{0,{len(indent)}}}", "", body, flags=re.MULTILINE)
+        spans.append({
+            "name": var_name,
+            "start": marker.start(),
+            "end": closing.end(2),
+            "content": body.strip(),
+            "language": language
+        })
+        position = closing.end()
+    
+    return spans, unterminated
+
+def extract_templates_with_stats(content: str) -> Tuple[str, Dict[str, str], Dict]:
+    """
+    Extract templates and report statistics about the extraction.
+    
+    The stripped document is built in a single join of the text between the
+    template spans. When a template is defined more than once, the last
+    definition wins.
+    
+    Args:
+        content: The content of the documentation
+    
     Returns:
-        A tuple of (updated_content, templates_dict)
+        A tuple of (updated_content, templates_dict, stats)
     """
-    # Find all template definitions
-    template_pattern = r"`(DEFAULT_[A-Z0-9_]+_TEMPLATE)`:\s*```\s*\n([\s\S]*?)\n```"
-    template_matches = list(re.finditer(template_pattern, content))
+    spans, unterminated = find_template_spans(content)
     
-    # Extract templates
     templates = {}
-    for match in template_matches:
-        var_name = match.group(1)
-        template_content = match.group(2).strip()
-        templates[var_name] = template_content
-        logger.info(f"Extracted template for {var_name} ({len(template_content)} chars)")
-    
-    # Remove template definitions from the content
-    updated_content = content
-    for match in reversed(template_matches):  # Process in reverse to preserve positions
-        start, end = match.span()
-        updated_content = updated_content[:start] + updated_content[end:]
+    languages: Dict[str, int] = {}
+    duplicates = []
+    pieces = []
+    last_end = 0
+    for span in spans:
+        if span["name"] in templates:
+            duplicates.append(span["name"])
+        templates[span["name"]] = span["content"]
+        language = span["language"] or "plain"
+        languages[language] = languages.get(language, 0) + 1
+        pieces.append(content[last_end:span["start"]])
+        last_end = span["end"]
+        logger.debug(f"Extracted template for {span['name']} ({len(span['content'])} chars)")
+    pieces.append(content[last_end:])
+    updated_content = "".join(pieces)
+    
+    for var_name in unterminated:
+        logger.warning(f"Template {var_name} has no closing code fence and was left in place")
+    
+    stats = {
+        "definitions": len(spans),
+        "templates": len(templates),
+        "duplicates": duplicates,
+        "unterminated": unterminated,
+        "languages": dict(sorted(languages.items())),
+        "template_chars": sum(len(template) for template in templates.values()),
+        "removed_chars": len(content) - len(updated_content)
+    }
+    return updated_content, templates, stats
+
+def extract_templates(content: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Extract DEFAULT_*_TEMPLATE variables and their content from the documentation.
     
+    Args:
+        content: The content of the documentation
+    
+    Returns:
+        A tuple of (updated_content, templates_dict)
+    """
+    updated_content, templates, stats = extract_templates_with_stats(content)
+    logger.info(f"Extracted {stats['templates']} templates ({stats['template_chars']} chars)")
     return updated_content, templates
 
 def split_into_sections(content: str) -> Dict[str, str]:
@@ -82,7 +402,7 @@ def split_into_sections(content: str) -> Dict[str, str]:
     
     Args:
         content: The content of the documentation
-        
+    
     Returns:
         A dictionary mapping section titles to their content
     """
@@ -123,13 +443,13 @@ def save_templates(templates: Dict[str, str], output_dir: str) -> None:
         templates: Dictionary mapping template names to content
         output_dir: Directory to save the output
     """
-    os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "default_templates.json")
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(templates, f, indent=2)
-        logger.info(f"Saved {len(templates)} templates to {output_path}")
+        if write_json_if_changed(output_path, templates):
+            logger.info(f"Saved {len(templates)} templates to {output_path}")
+        else:
+            logger.info(f"Templates in {output_path} are unchanged")
     except Exception as e:
         logger.error(f"Error saving templates to {output_path}: {e}")
         raise
@@ -138,6 +458,9 @@ def save_sections(sections: Dict[str, str], output_dir: str) -> None:
     """
     Save each section as a separate Markdown file.
     
+    Section files that are unchanged are left untouched, and section files from
+    previous runs that are no longer produced are removed.
+    
     Args:
         sections: Dictionary mapping section titles to content
         output_dir: Directory to save the output
@@ -149,12 +472,13 @@ def save_sections(sections: Dict[str, str], output_dir: str) -> None:
         output_path = os.path.join(sections_dir, f"{title}.md")
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            logger.info(f"Saved section to {output_path}")
+            if write_text_if_changed(output_path, content):
+                logger.info(f"Saved section to {output_path}")
         except Exception as e:
             logger.error(f"Error saving section to {output_path}: {e}")
             raise
+    
+    remove_stale_files(sections_dir, [f"{title}.md" for title in sections], ".md")
 
 def save_full_content(content: str, output_dir: str) -> None:
     """
@@ -164,50 +488,162 @@ def save_full_content(content: str, output_dir: str) -> None:
         content: The content to save
         output_dir: Directory to save the output
     """
-    os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "env-configuration-processed.md")
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        logger.info(f"Saved processed content to {output_path}")
+        if write_text_if_changed(output_path, content):
+            logger.info(f"Saved processed content to {output_path}")
+        else:
+            logger.info(f"Processed content in {output_path} is unchanged")
     except Exception as e:
         logger.error(f"Error saving content to {output_path}: {e}")
         raise
 
+def prepare_documentation(content: str, output_dir: str) -> Dict:
+    """
+    Extract the templates, split the sections and save the outputs for one document.
+    
+    Args:
+        content: The documentation content
+        output_dir: Directory to save the prepared files
+    
+    Returns:
+        The template extraction statistics, plus the number of sections and
+        the paths of the saved files
+    """
+    # Extract templates
+    with stage("extract_templates"):
+        updated_content, templates, template_stats = extract_templates_with_stats(content)
+    logger.info(f"Extracted {len(templates)} templates")
+    
+    # Split into sections
+    with stage("split_sections"):
+        sections = split_into_sections(updated_content)
+    logger.info(f"Split documentation into {len(sections)} sections")
+    
+    # Save outputs
+    with stage("save_outputs"):
+        save_templates(templates, output_dir)
+        save_sections(sections, output_dir)
+        save_full_content(updated_content, output_dir)
+    
+    files = [os.path.join(output_dir, "default_templates.json"),
+             os.path.join(output_dir, "env-configuration-processed.md")]
+    files += [os.path.join(output_dir, "sections", f"{title}.md") for title in sections]
+    return dict(template_stats, sections=len(sections), files=files)
+
+def iter_documents(args) -> Iterator[Tuple[str, str]]:
+    """
+    Read the documents selected by a local source option.
+    
+    All refs are read through one repository handle, which is closed when
+    the iteration ends.
+    
+    Args:
+        args: The parsed command line arguments
+    
+    Yields:
+        Tuples of (label, content)
+    """
+    if args.file:
+        with stage("fetch"):
+            content = read_local(args.file)
+        yield ("stdin" if args.file == "-" else args.file), content
+    elif args.tarball:
+        with stage("fetch"):
+            content = read_tarball(args.tarball, args.doc_path)
+        yield args.tarball, content
+    else:
+        with GitRepository(args.git_repo) as repo:
+            for ref in args.ref or ["HEAD"]:
+                with stage("fetch"):
+                    content = repo.read_text(ref, args.doc_path)
+                yield ref, content
+
+def print_summary(label: str, output_dir: str, stats: Dict) -> None:
+    """
+    Print where the outputs of one document were saved.
+    
+    Args:
+        label: The document source
+        output_dir: Directory holding the prepared files
+        stats: Statistics from prepare_documentation
+    """
+    print(f"\nDocumentation processing complete for {label}!")
+    print(f"- Templates saved to {os.path.join(output_dir, 'default_templates.json')}")
+    print(f"  * {stats['templates']} templates, {stats['template_chars']} chars, "
+          f"{stats['removed_chars']} chars removed from the documentation")
+    if stats["duplicates"]:
+        print(f"  * Defined more than once (last definition kept): {', '.join(stats['duplicates'])}")
+    if stats["unterminated"]:
+        print(f"  * Left in place, code fence never closed: {', '.join(stats['unterminated'])}")
+    print(f"- {stats['sections']} sections saved to {os.path.join(output_dir, 'sections')}")
+    print(f"- Processed documentation saved to {os.path.join(output_dir, 'env-configuration-processed.md')}")
+
 def main():
     parser = argparse.ArgumentParser(description='Download and prepare OpenWebUI documentation')
     parser.add_argument('--output-dir', '-o', default='prepared_docs', 
                         help='Directory to save the prepared files (default: prepared_docs)')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--url', default=DOCS_URL,
+                        help='URL of the environment configuration documentation')
+    source.add_argument('--file', metavar='PATH',
+                        help="Read the documentation from a local file ('-' for stdin) instead of downloading it")
+    source.add_argument('--tarball', metavar='ARCHIVE',
+                        help='Read the documentation from a tar archive of the docs repository')
+    source.add_argument('--git-repo', metavar='REPO',
+                        help='Read the documentation from a local git repository at each --ref, without a checkout')
+    parser.add_argument('--ref', action='append',
+                        help='Git ref to read from --git-repo (repeatable, default: HEAD); with several refs, '
+                             'each is prepared in its own subdirectory of the output directory')
+    parser.add_argument('--doc-path', default=DEFAULT_DOC_PATH,
+                        help=f'Path of the document inside the repository or archive (default: {DEFAULT_DOC_PATH})')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory for the conditional fetch cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always download and process the documentation')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'HTTP timeout in seconds (default: {DEFAULT_TIMEOUT})')
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    if args.ref and not args.git_repo:
+        parser.error("--ref requires --git-repo")
     
+    results = []
     try:
-        # Download the documentation
-        content = download_documentation()
-        logger.info(f"Downloaded documentation ({len(content)} chars)")
+        with profiling("download_and_prepare_docs", args.profile, args.cprofile):
+            if args.file or args.tarball or args.git_repo:
+                # Read local sources; each of several refs gets its own directory
+                per_ref = args.git_repo and len(args.ref or []) > 1
+                for label, content in iter_documents(args):
+                    logger.info(f"Read documentation from {label} ({len(content)} chars)")
+                    output_dir = os.path.join(args.output_dir, safe_label(label)) if per_ref else args.output_dir
+                    results.append((label, output_dir, prepare_documentation(content, output_dir)))
+            else:
+                # Download the documentation
+                with stage("fetch"):
+                    if args.no_cache:
+                        content = download_documentation(args.url, args.timeout)
+                        fetch_meta = None
+                    else:
+                        content, fetch_meta = fetch_documentation(args.url, args.cache_dir, args.timeout)
+                if fetch_meta is not None and is_prepared(fetch_meta, args.output_dir):
+                    print(f"\nDocumentation unchanged since the last run, {args.output_dir} is up to date.")
+                    return
+                logger.info(f"Downloaded documentation ({len(content)} chars)")
+                
+                stats = prepare_documentation(content, args.output_dir)
+                results.append((args.url, args.output_dir, stats))
+                if fetch_meta is not None:
+                    mark_prepared(fetch_meta, args.output_dir, args.cache_dir, stats["files"])
         
-        # Extract templates
-        updated_content, templates = extract_templates(content)
-        logger.info(f"Extracted {len(templates)} templates")
-        
-        # Split into sections
-        sections = split_into_sections(updated_content)
-        logger.info(f"Split documentation into {len(sections)} sections")
-        
-        # Save outputs
-        save_templates(templates, args.output_dir)
-        save_sections(sections, args.output_dir)
-        save_full_content(updated_content, args.output_dir)
-        
-        print(f"\nDocumentation processing complete!")
-        print(f"- Templates saved to {os.path.join(args.output_dir, 'default_templates.json')}")
-        print(f"- Sections saved to {os.path.join(args.output_dir, 'sections')}")
-        print(f"- Processed documentation saved to {os.path.join(args.output_dir, 'env-configuration-processed.md')}")
+        for label, output_dir, stats in results:
+            print_summary(label, output_dir, stats)
         print(f"\nNext steps:")
-        print(f"1. Review the extracted sections in the '{os.path.join(args.output_dir, 'sections')}' directory")
+        print(f"1. Review the extracted sections in the '{os.path.join(results[0][1], 'sections')}' directory")
         print(f"2. Use the LLM system prompt to generate relationship mappings for each section")
         print(f"3. Combine the mappings into a single JSON file")
-        
+    
     except Exception as e:
         logger.error(f"Error preparing documentation: {e}")
         raise
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Generate Relationship Mappings with an LLM
+
+This script automates the LLM-based relationship mapping step:
+1. Reads every prepared section file and the relationship mapping system prompt
+2. Sends the sections concurrently to an OpenAI-compatible chat completions endpoint
+3. Retries failed requests and responses that are not valid mapping JSON
+4. Caches responses on disk, keyed by a hash of the prompt, model and section,
+   so unchanged sections never reach the model again
+5. Saves each result as a mapping JSON file for merge_relationship_mappings.py
+
+Usage:
+  python generate_relationship_mappings.py \
+    --sections-dir prepared_docs/sections \
+    --prompt relationship_mapping_system_prompt.md \
+    --endpoint http://localhost:8000/v1 \
+    --model my-model \
+    --output-dir mappings
+"""
+
+import os
+import re
+import ast
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import logging
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from output_writer import write_json_if_changed
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Default OpenAI-compatible API base URL
+DEFAULT_ENDPOINT = "http://localhost:8000/v1"
+
+# Directory holding cached model responses
+DEFAULT_CACHE_DIR = ".llm_cache"
+
+# Timeout in seconds for a single completion request
+DEFAULT_TIMEOUT = 300
+
+# Code fence around a JSON answer, if the model added one
+FENCED_JSON_RE = re.compile(r"```(?:json|python)?\s*\n([\s\S]*?)\n\s*```")
+
+class MappingResponseError(ValueError):
+    """
+    Raised when a model response does not contain a valid relationship mapping.
+    """
+
+def request_key(system_prompt: str, section: str, model: str) -> str:
+    """
+    Compute the cache key for a section request.
+    
+    Args:
+        system_prompt: The relationship mapping system prompt
+        section: The section content
+        model: The model name
+    
+    Returns:
+        A hex digest identifying the request
+    """
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, section):
+        encoded = part.encode('utf-8')
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+def load_cached_mapping(cache_dir: str, key: str) -> Optional[Dict]:
+    """
+    Load a cached mapping for a request key.
+    
+    Args:
+        cache_dir: Directory holding cached responses
+        key: The request key
+    
+    Returns:
+        The cached mapping, or None if there is none
+    """
+    path = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)["mapping"]
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+        return None
+
+def save_cached_mapping(cache_dir: str, key: str, section_name: str, model: str,
+                        response_text: str, mapping: Dict) -> None:
+    """
+    Save a model response and its parsed mapping to the cache.
+    
+    Args:
+        cache_dir: Directory holding cached responses
+        key: The request key
+        section_name: Name of the section, for reference
+        model: The model name
+        response_text: The raw model response
+        mapping: The parsed mapping
+    """
+    entry = {"section": section_name, "model": model, "response": response_text, "mapping": mapping}
+    write_json_if_changed(os.path.join(cache_dir, f"{key}.json"), entry)
+
+def parse_mapping_response(text: str) -> Dict:
+    """
+    Parse a model response into a relationship mapping.
+    
+    The prompt asks for strict JSON but also mentions Python dictionaries, so
+    Python literal syntax is accepted as a fallback. Code fences are stripped.
+    
+    Args:
+        text: The model response
+    
+    Returns:
+        A mapping with provider_mappings and boolean_selectors dictionaries
+    """
+    fenced = FENCED_JSON_RE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    start, end = candidate.find("{"), candidate.rfind("}")
+    if start == -1 or end <= start:
+        raise MappingResponseError("Response does not contain a JSON object")
+    candidate = candidate[start:end + 1]
+    
+    try:
+        mapping = json.loads(candidate)
+    except json.JSONDecodeError:
+        try:
+            mapping = ast.literal_eval(candidate)
+        except (ValueError, SyntaxError) as e:
+            raise MappingResponseError(f"Response is not valid JSON: {e}")
+    
+    if not isinstance(mapping, dict):
+        raise MappingResponseError("Response is not a JSON object")
+    for kind in ("provider_mappings", "boolean_selectors"):
+        mapping.setdefault(kind, {})
+        if not isinstance(mapping[kind], dict):
+            raise MappingResponseError(f"{kind} is not an object")
+    
+    return mapping
+
+class ChatCompletionClient:
+    """
+    Minimal client for an OpenAI-compatible chat completions endpoint.
+    """
+    
+    def __init__(self, endpoint: str, model: str, api_key: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT, temperature: float = 0.0):
+        """
+        Initialize the client.
+        
+        Args:
+            endpoint: API base URL, for example http://localhost:8000/v1
+            model: Model name to request
+            api_key: Optional bearer token
+            timeout: Timeout in seconds per request
+            temperature: Sampling temperature
+        """
+        self.url = endpoint.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.temperature = temperature
+    
+    def complete(self, system_prompt: str, user_content: str) -> str:
+        """
+        Request a completion.
+        
+        Args:
+            system_prompt: The system message
+            user_content: The user message
+        
+        Returns:
+            The content of the first choice
+        """
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ]
+        }
+        response = requests.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+async def map_section(client: ChatCompletionClient, semaphore: asyncio.Semaphore,
+                      system_prompt: str, section_name: str, section: str,
+                      cache_dir: str, retries: int, backoff: float) -> Tuple[Dict, bool]:
+    """
+    Get the relationship mapping for one section, from the cache or the model.
+    
+    Args:
+        client: The completion client
+        semaphore: Semaphore bounding the number of concurrent requests
+        system_prompt: The relationship mapping system prompt
+        section_name: Name of the section
+        section: The section content
+        cache_dir: Directory holding cached responses
+        retries: Number of retries after a failed attempt
+        backoff: Base delay in seconds between retries, doubled per attempt
+    
+    Returns:
+        A tuple of (mapping, from_cache)
+    """
+    key = request_key(system_prompt, section, client.model)
+    cached = load_cached_mapping(cache_dir, key)
+    if cached is not None:
+        logger.info(f"Using cached mapping for {section_name}")
+        return cached, True
+    
+    last_error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = backoff * 2 ** (attempt - 1) * (1 + random.random() / 2)
+            logger.warning(f"Retrying {section_name} in {delay:.1f}s (attempt {attempt + 1}): {last_error}")
+            await asyncio.sleep(delay)
+        try:
+            async with semaphore:
+                start = time.perf_counter()
+                text = await asyncio.to_thread(client.complete, system_prompt, section)
+            mapping = parse_mapping_response(text)
+            logger.info(f"Mapped {section_name} in {time.perf_counter() - start:.1f}s")
+            save_cached_mapping(cache_dir, key, section_name, client.model, text, mapping)
+            return mapping, False
+        except (requests.RequestException, MappingResponseError, KeyError, IndexError) as e:
+            last_error = e
+    
+    raise RuntimeError(f"Failed to map {section_name} after {retries + 1} attempts: {last_error}")
+
+async def map_sections(client: ChatCompletionClient, system_prompt: str,
+                       sections: Dict[str, str], cache_dir: str, concurrency: int,
+                       retries: int, backoff: float) -> Dict[str, Tuple[Optional[Dict], bool, Optional[str]]]:
+    """
+    Map all sections concurrently.
+    
+    Args:
+        client: The completion client
+        system_prompt: The relationship mapping system prompt
+        sections: Dictionary mapping section names to content
+        cache_dir: Directory holding cached responses
+        concurrency: Maximum number of requests in flight
+        retries: Number of retries per section
+        backoff: Base delay in seconds between retries
+    
+    Returns:
+        A dictionary mapping section names to (mapping, from_cache, error)
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    names = list(sections)
+    results = await asyncio.gather(
+        *(map_section(client, semaphore, system_prompt, name, sections[name],
+                      cache_dir, retries, backoff) for name in names),
+        return_exceptions=True
+    )
+    
+    outcome = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(str(result))
+            outcome[name] = (None, False, str(result))
+        else:
+            outcome[name] = (result[0], result[1], None)
+    return outcome
+
+def load_sections(sections_dir: str) -> Dict[str, str]:
+    """
+    Load the prepared section files.
+    
+    Args:
+        sections_dir: Directory containing the section Markdown files
+    
+    Returns:
+        A dictionary mapping section names (file stems) to content, sorted by name
+    """
+    sections = {}
+    for file_name in sorted(os.listdir(sections_dir)):
+        if file_name.endswith(".md"):
+            with open(os.path.join(sections_dir, file_name), 'r', encoding='utf-8') as f:
+                sections[os.path.splitext(file_name)[0]] = f.read()
+    return sections
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate relationship mappings for documentation sections with an LLM')
+    parser.add_argument('--sections-dir', '-s', default='prepared_docs/sections',
+                        help='Directory containing the prepared section files')
+    parser.add_argument('--prompt', '-p', default='relationship_mapping_system_prompt.md',
+                        help='Path to the relationship mapping system prompt')
+    parser.add_argument('--output-dir', '-o', default='mappings',
+                        help='Directory to save the mapping JSON files (default: mappings)')
+    parser.add_argument('--endpoint', '-e', default=os.environ.get("OPENAI_BASE_URL", DEFAULT_ENDPOINT),
+                        help='OpenAI-compatible API base URL (default: $OPENAI_BASE_URL or %(default)s)')
+    parser.add_argument('--model', '-m', required=True,
+                        help='Model name to request')
+    parser.add_argument('--api-key', default=os.environ.get("OPENAI_API_KEY"),
+                        help='API key sent as a bearer token (default: $OPENAI_API_KEY)')
+    parser.add_argument('--concurrency', '-j', type=int, default=4,
+                        help='Maximum number of concurrent requests (default: 4)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries per section after a failed attempt (default: 3)')
+    parser.add_argument('--backoff', type=float, default=2.0,
+                        help='Base delay in seconds between retries (default: 2)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Timeout in seconds per request (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--temperature', type=float, default=0.0,
+                        help='Sampling temperature (default: 0)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory for cached responses (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--section', action='append', default=[],
+                        help='Only map this section (file stem, repeatable)')
+    args = parser.parse_args()
+    
+    try:
+        with open(args.prompt, 'r', encoding='utf-8') as f:
+            system_prompt = f.read()
+        
+        sections = load_sections(args.sections_dir)
+        if args.section:
+            sections = {name: content for name, content in sections.items() if name in args.section}
+        if not sections:
+            logger.error(f"No sections to map in {args.sections_dir}")
+            return
+        
+        client = ChatCompletionClient(args.endpoint, args.model, args.api_key,
+                                      args.timeout, args.temperature)
+        logger.info(f"Mapping {len(sections)} sections with {args.model} at {args.endpoint}")
+        
+        start = time.perf_counter()
+        outcome = asyncio.run(map_sections(client, system_prompt, sections, args.cache_dir,
+                                           args.concurrency, args.retries, args.backoff))
+        elapsed = time.perf_counter() - start
+        
+        # Save the mappings
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, (mapping, _, _) in outcome.items():
+            if mapping is not None:
+                write_json_if_changed(os.path.join(args.output_dir, f"{name}.json"), mapping)
+        
+        cached = sum(1 for mapping, from_cache, _ in outcome.values() if mapping is not None and from_cache)
+        failed = [name for name, (mapping, _, _) in outcome.items() if mapping is None]
+        
+        print(f"\nRelationship mapping complete in {elapsed:.1f}s!")
+        print(f"- Mapped {len(outcome) - len(failed)} of {len(outcome)} sections ({cached} from cache)")
+        print(f"- Saved mappings to {args.output_dir}")
+        if failed:
+            print(f"\nFailed sections:")
+            for name in failed:
+                print(f"  - {name}: {outcome[name][2]}")
+            raise SystemExit(1)
+        
+        print(f"\nNext step:")
+        print(f"  python merge_relationship_mappings.py --input-dir {args.output_dir} --output relationship_mappings.json")
+    
+    except Exception as e:
+        logger.error(f"Error generating relationship mappings: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Pipeline Instrumentation
+
+Shared per-stage instrumentation for the pipeline scripts. When a profiler is
+active, each stage records:
+1. Wall time
+2. Peak traced memory (tracemalloc)
+3. Number of regular expression calls (compiled pattern method calls)
+4. Bytes read and written by the pipeline's file helpers
+
+The results are written as a JSON report, and the per-stage call profiles can
+be combined into a single cProfile dump. When no profiler is active, stage()
+and the byte counters do nothing.
+"""
+
+import sys
+import json
+import time
+import cProfile
+import logging
+import platform
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marker cProfile uses for methods of compiled regular expression objects
+REGEX_METHOD_MARKER = "of 're.Pattern' objects"
+
+class PipelineProfiler:
+    """
+    Collect per-stage timings, memory peaks, regex call counts and I/O byte counts.
+    """
+    
+    def __init__(self, script: str, trace_memory: bool = True):
+        """
+        Initialize the profiler.
+        
+        Args:
+            script: Name of the script being profiled, included in the report
+            trace_memory: Whether to trace memory allocations with tracemalloc
+        """
+        self.script = script
+        self.trace_memory = trace_memory
+        self.stages: List[Dict] = []
+        self.profiles: List[cProfile.Profile] = []
+        self.current: Optional[Dict] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+    
+    def start(self) -> None:
+        """
+        Start memory tracing and the overall clock.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.started = time.perf_counter()
+    
+    def stop(self) -> None:
+        """
+        Stop memory tracing and the overall clock.
+        """
+        self.finished = time.perf_counter()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        """
+        Measure one pipeline stage.
+        
+        Stages are not nested; a stage started inside another one is recorded
+        as part of the outer stage.
+        
+        Args:
+            name: Name of the stage
+        
+        Yields:
+            The stage record, which is filled in when the stage ends
+        """
+        if self.current is not None:
+            yield self.current
+            return
+        
+        record = {"name": name, "seconds": 0.0, "peak_bytes": None,
+                  "regex_calls": 0, "bytes_read": 0, "bytes_written": 0}
+        self.current = record
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield record
+        finally:
+            profile.disable()
+            record["seconds"] = time.perf_counter() - start
+            if self.trace_memory and tracemalloc.is_tracing():
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            record["regex_calls"] = count_regex_calls(profile)
+            self.profiles.append(profile)
+            self.stages.append(record)
+            self.current = None
+    
+    def add_bytes_read(self, count: int) -> None:
+        """
+        Add to the bytes read by the current stage.
+        
+        Args:
+            count: Number of bytes read
+        """
+        if self.current is not None:
+            self.current["bytes_read"] += count
+    
+    def add_bytes_written(self, count: int) -> None:
+        """
+        Add to the bytes written by the current stage.
+        
+        Args:
+            count: Number of bytes written
+        """
+        if self.current is not None:
+            self.current["bytes_written"] += count
+    
+    def report(self) -> Dict:
+        """
+        Build the machine-readable report.
+        
+        Returns:
+            A dictionary with the overall totals and the per-stage records
+        """
+        finished = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "script": self.script,
+            "python": platform.python_version(),
+            "total_seconds": finished - self.started,
+            "totals": {
+                "stage_seconds": sum(s["seconds"] for s in self.stages),
+                "regex_calls": sum(s["regex_calls"] for s in self.stages),
+                "bytes_read": sum(s["bytes_read"] for s in self.stages),
+                "bytes_written": sum(s["bytes_written"] for s in self.stages)
+            },
+            "stages": self.stages
+        }
+    
+    def save_report(self, output_path: str) -> None:
+        """
+        Save the report as JSON.
+        
+        Args:
+            output_path: Path to the report file
+        """
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=2)
+            logger.info(f"Saved profile report to {output_path}")
+        except Exception as e:
+            logger.error(f"Error saving profile report to {output_path}: {e}")
+            raise
+    
+    def dump_cprofile(self, output_path: str) -> None:
+        """
+        Combine the per-stage call profiles into one cProfile dump.
+        
+        Args:
+            output_path: Path to the dump, readable with pstats
+        """
+        if not self.profiles:
+            logger.warning("No stages were profiled, skipping cProfile dump")
+            return
+        # pstats pulls in dataclasses and enum, so it is only imported for dumps
+        import pstats
+        
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(output_path)
+        logger.info(f"Saved cProfile dump to {output_path}")
+
+def count_regex_calls(profile: cProfile.Profile) -> int:
+    """
+    Count calls to compiled regular expression methods in a call profile.
+    
+    Module-level functions such as re.search call these methods internally,
+    so they are counted as well.
+    
+    Args:
+        profile: A finished cProfile profile
+    
+    Returns:
+        The number of regex method calls
+    """
+    profile.create_stats()
+    return sum(
+        stats[1] for (_, _, func_name), stats in profile.stats.items()
+        if REGEX_METHOD_MARKER in func_name
+    )
+
+# The profiler of the running script, if profiling was requested
+_active_profiler: Optional[PipelineProfiler] = None
+
+def activate(profiler: Optional[PipelineProfiler]) -> None:
+    """
+    Make a profiler the active one, or deactivate profiling with None.
+    
+    Args:
+        profiler: The profiler to activate
+    """
+    global _active_profiler
+    _active_profiler = profiler
+
+def get_profiler() -> Optional[PipelineProfiler]:
+    """
+    Get the active profiler.
+    
+    Returns:
+        The active profiler, or None when profiling is off
+    """
+    return _active_profiler
+
+def stage(name: str):
+    """
+    Measure a stage with the active profiler, if there is one.
+    
+    Args:
+        name: Name of the stage
+    
+    Returns:
+        A context manager for the stage
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.stage(name)
+
+def record_bytes_read(count: int) -> None:
+    """
+    Count bytes read towards the current stage of the active profiler.
+    
+    Args:
+        count: Number of bytes read
+    """
+    if _active_profiler is not None:
+        _active_profiler.add_bytes_read(count)
+
+def record_bytes_written(count: int) -> None:
+    """
+    Count bytes written towards the current stage of the active profiler.
+    
+    Args:
+        count: Number of bytes written
+    """
+    if _active_profiler is not None:
+        _active_profiler.add_bytes_written(count)
+
+def add_profile_arguments(parser) -> None:
+    """
+    Add the --profile and --cprofile options to a script's argument parser.
+    
+    Args:
+        parser: The argparse parser
+    """
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='Write a JSON report with per-stage time, memory, regex calls and I/O bytes')
+    parser.add_argument('--cprofile', metavar='DUMP',
+                        help='Also write a combined cProfile dump of all stages (requires --profile)')
+
+@contextmanager
+def profiling(script: str, report_path: Optional[str], cprofile_path: Optional[str] = None) -> Iterator[Optional[PipelineProfiler]]:
+    """
+    Profile a script run when a report path is given.
+    
+    Args:
+        script: Name of the script being profiled
+        report_path: Path to the JSON report, or None to disable profiling
+        cprofile_path: Optional path to a combined cProfile dump
+    
+    Yields:
+        The active profiler, or None when profiling is disabled
+    """
+    if not report_path:
+        if cprofile_path:
+            logger.warning("--cprofile requires --profile, ignoring it")
+        yield None
+        return
+    
+    profiler = PipelineProfiler(script)
+    activate(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        activate(None)
+        profiler.save_report(report_path)
+        if cprofile_path:
+            profiler.dump_cprofile(cprofile_path)
+        print(f"\nProfile report saved to {report_path}", file=sys.stderr)
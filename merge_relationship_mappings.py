@@ -8,13 +8,21 @@ comprehensive mapping file.
 
 Usage:
   python merge_relationship_mappings.py --input-dir mappings --output relationship_mappings.json
+  python merge_relationship_mappings.py mappings/section1.json mappings/section2.json
+  python merge_relationship_mappings.py --input-dir mappings --workers 8
+  cat mappings.jsonl | python merge_relationship_mappings.py - --output relationship_mappings.json
 """
 
 import os
+import sys
 import json
+import math
 import argparse
 import logging
-from typing import Dict, List, Any
+from typing import Any, Dict, List, Optional, TextIO
+
+from output_writer import write_text_if_changed
+from instrumentation import stage, record_bytes_read, add_profile_arguments, profiling
 
 # Set up logging
 logging.basicConfig(
@@ -29,12 +37,13 @@ def load_json_file(file_path: str) -> Dict:
     
     Args:
         file_path: Path to the JSON file
-        
+    
     Returns:
         The loaded JSON content as a dictionary
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
+            record_bytes_read(os.fstat(f.fileno()).st_size)
             return json.load(f)
     except Exception as e:
         logger.error(f"Error loading file {file_path}: {e}")
@@ -44,160 +53,429 @@ def save_json_file(data: Dict, output_path: str) -> None:
     """
     Save data to a JSON file.
     
+    The file is only rewritten, atomically, when its content changes.
+    
     Args:
         data: The data to save
         output_path: Path to save the JSON file
     """
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        logger.info(f"Saved data to {output_path}")
+        with stage("serialize_json"):
+            text = json.dumps(data, indent=2)
+        with stage("write_json"):
+            written = write_text_if_changed(output_path, text)
+        if written:
+            logger.info(f"Saved data to {output_path}")
+        else:
+            logger.info(f"Data in {output_path} is unchanged")
     except Exception as e:
         logger.error(f"Error saving data to {output_path}: {e}")
         raise
 
+class MappingMerger:
+    """
+    Incrementally merge relationship mapping documents.
+    
+    Each document is folded into set-backed accumulators as soon as it is read,
+    so only one document is held in memory at a time besides the merged state.
+    Duplicate selectors are folded into sets, so each duplicate costs a set
+    update instead of a union and re-sort. Lists are sorted once, in
+    finalize(), so the merged lists do not depend on the order in which
+    documents are added.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty merge.
+        """
+        # selector -> {"details": first-seen entry, "enum_values": set,
+        #              "provider_fields": {provider: set}}; the sets stay None
+        #              until the selector is seen a second time
+        self.provider_mappings: Dict[str, Dict[str, Any]] = {}
+        # selector -> {"details": first-seen entry, "provider_fields": set}
+        self.boolean_selectors: Dict[str, Dict[str, Any]] = {}
+        self.sources: Dict[str, List[str]] = {}
+        self.document_count = 0
+    
+    def add(self, mapping: Dict, source: str) -> None:
+        """
+        Fold one mapping document into the merge.
+        
+        Args:
+            mapping: A relationship mapping document
+            source: Name of the document, recorded in the source metadata
+        """
+        self.document_count += 1
+        
+        # Process provider mappings
+        for selector, details in mapping.get("provider_mappings", {}).items():
+            entry = self.provider_mappings.get(selector)
+            if entry is None:
+                # Accumulators are created on the first duplicate
+                self.provider_mappings[selector] = {"details": details, "enum_values": None, "provider_fields": None}
+            else:
+                logger.warning(f"Duplicate provider mapping for {selector} in {source}")
+                first = entry["details"]
+                
+                # Merge enum values
+                if entry["enum_values"] is None:
+                    entry["enum_values"] = set(first.get("enum_values", []))
+                entry["enum_values"].update(details.get("enum_values", []))
+                
+                # Merge provider fields
+                if entry["provider_fields"] is None:
+                    entry["provider_fields"] = {
+                        provider: set(fields) for provider, fields in first.get("provider_fields", {}).items()
+                    }
+                for provider, fields in details.get("provider_fields", {}).items():
+                    entry["provider_fields"].setdefault(provider, set()).update(fields)
+            
+            self.sources.setdefault(selector, []).append(source)
+        
+        # Process boolean selectors
+        for selector, details in mapping.get("boolean_selectors", {}).items():
+            entry = self.boolean_selectors.get(selector)
+            if entry is None:
+                self.boolean_selectors[selector] = {"details": details, "provider_fields": None}
+            else:
+                logger.warning(f"Duplicate boolean selector for {selector} in {source}")
+                
+                # Merge provider fields (dependent variables)
+                if entry["provider_fields"] is None:
+                    entry["provider_fields"] = set(entry["details"].get("provider_fields", []))
+                entry["provider_fields"].update(details.get("provider_fields", []))
+            
+            self.sources.setdefault(selector, []).append(source)
+    
+    def add_file(self, file_path: str) -> bool:
+        """
+        Load a mapping file and fold it into the merge.
+        
+        Args:
+            file_path: Path to the mapping JSON file
+        
+        Returns:
+            True if the file was merged, False if it could not be processed
+        """
+        try:
+            mapping = load_json_file(file_path)
+            self.add(mapping, os.path.basename(file_path))
+            return True
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {e}")
+            return False
+    
+    def combine(self, other: "MappingMerger") -> None:
+        """
+        Fold the merge of a later run of documents into this one.
+        
+        Combining the merges of consecutive runs of documents, in order, gives
+        the same state as adding all the documents to one merger: first-seen
+        details come from the earlier run and source lists are concatenated.
+        The other merger's entries are taken over, so it should not be reused.
+        
+        Args:
+            other: Merger holding the documents that come after this one's
+        """
+        self.document_count += other.document_count
+        
+        for selector, later in other.provider_mappings.items():
+            entry = self.provider_mappings.get(selector)
+            if entry is None:
+                self.provider_mappings[selector] = later
+                continue
+            logger.warning(f"Duplicate provider mapping for {selector} across merged batches")
+            first = entry["details"]
+            
+            # Merge enum values
+            if entry["enum_values"] is None:
+                entry["enum_values"] = set(first.get("enum_values", []))
+            later_enums = later["enum_values"]
+            if later_enums is None:
+                later_enums = later["details"].get("enum_values", [])
+            entry["enum_values"].update(later_enums)
+            
+            # Merge provider fields
+            if entry["provider_fields"] is None:
+                entry["provider_fields"] = {
+                    provider: set(fields) for provider, fields in first.get("provider_fields", {}).items()
+                }
+            later_fields = later["provider_fields"]
+            if later_fields is None:
+                later_fields = later["details"].get("provider_fields", {})
+            for provider, fields in later_fields.items():
+                entry["provider_fields"].setdefault(provider, set()).update(fields)
+        
+        for selector, later in other.boolean_selectors.items():
+            entry = self.boolean_selectors.get(selector)
+            if entry is None:
+                self.boolean_selectors[selector] = later
+                continue
+            logger.warning(f"Duplicate boolean selector for {selector} across merged batches")
+            
+            # Merge provider fields (dependent variables)
+            if entry["provider_fields"] is None:
+                entry["provider_fields"] = set(entry["details"].get("provider_fields", []))
+            later_fields = later["provider_fields"]
+            if later_fields is None:
+                later_fields = later["details"].get("provider_fields", [])
+            entry["provider_fields"].update(later_fields)
+        
+        for selector, names in other.sources.items():
+            self.sources.setdefault(selector, []).extend(names)
+    
+    def finalize(self, file_count: Optional[int] = None) -> Dict:
+        """
+        Build the merged mapping, sorting every accumulated list once.
+        
+        Args:
+            file_count: Number of inputs to report in the metadata; defaults to
+                the number of documents added
+        
+        Returns:
+            A dictionary with the merged mappings
+        """
+        merged = {
+            "provider_mappings": {},
+            "boolean_selectors": {}
+        }
+        
+        for selector, entry in self.provider_mappings.items():
+            details = dict(entry["details"])
+            enum_values = entry["enum_values"]
+            if enum_values is None:
+                enum_values = details.get("enum_values")
+            if enum_values is not None:
+                details["enum_values"] = sorted(enum_values)
+            provider_fields = entry["provider_fields"]
+            if provider_fields is None:
+                provider_fields = details.get("provider_fields")
+            if provider_fields is not None:
+                details["provider_fields"] = {
+                    provider: sorted(fields) for provider, fields in provider_fields.items()
+                }
+            merged["provider_mappings"][selector] = details
+        
+        for selector, entry in self.boolean_selectors.items():
+            details = dict(entry["details"])
+            provider_fields = entry["provider_fields"]
+            if provider_fields is None:
+                provider_fields = details.get("provider_fields")
+            if provider_fields is not None:
+                details["provider_fields"] = sorted(provider_fields)
+            merged["boolean_selectors"][selector] = details
+        
+        if file_count is None:
+            file_count = self.document_count
+        
+        # Log merge results
+        logger.info(f"Merged {file_count} mapping files")
+        logger.info(f"Resulting in {len(merged['provider_mappings'])} provider mappings and {len(merged['boolean_selectors'])} boolean selectors")
+        
+        # Add source tracking metadata
+        merged["_metadata"] = {
+            "sources": {selector: list(names) for selector, names in self.sources.items()},
+            "file_count": file_count
+        }
+        
+        return merged
+
 def merge_mappings(mapping_files: List[str]) -> Dict:
     """
     Merge multiple relationship mapping files into a single mapping.
     
     Args:
         mapping_files: List of paths to mapping JSON files
-        
+    
     Returns:
         A dictionary with the merged mappings
     """
-    # Initialize merged structure
-    merged = {
-        "provider_mappings": {},
-        "boolean_selectors": {}
-    }
+    return merge_batch(mapping_files).finalize(file_count=len(mapping_files))
+
+def merge_batch(mapping_files: List[str]) -> MappingMerger:
+    """
+    Merge one batch of mapping files without finalizing.
+    
+    This is the map step of the parallel merge and runs in a worker process.
     
-    # Track sources of mappings for reporting
-    sources = {}
+    Args:
+        mapping_files: List of paths to mapping JSON files
     
-    # Process each mapping file
+    Returns:
+        The partial merge of the batch
+    """
+    merger = MappingMerger()
     for file_path in mapping_files:
-        try:
-            mapping = load_json_file(file_path)
-            file_name = os.path.basename(file_path)
-            
-            # Process provider mappings
-            for selector, details in mapping.get("provider_mappings", {}).items():
-                if selector in merged["provider_mappings"]:
-                    logger.warning(f"Duplicate provider mapping for {selector} in {file_name}")
-                    
-                    # Merge enum values
-                    existing_enums = set(merged["provider_mappings"][selector].get("enum_values", []))
-                    new_enums = set(details.get("enum_values", []))
-                    merged_enums = sorted(list(existing_enums.union(new_enums)))
-                    merged["provider_mappings"][selector]["enum_values"] = merged_enums
-                    
-                    # Merge provider fields
-                    for provider, fields in details.get("provider_fields", {}).items():
-                        if provider in merged["provider_mappings"][selector]["provider_fields"]:
-                            # Add any new fields
-                            existing_fields = set(merged["provider_mappings"][selector]["provider_fields"][provider])
-                            new_fields = set(fields)
-                            merged_fields = sorted(list(existing_fields.union(new_fields)))
-                            merged["provider_mappings"][selector]["provider_fields"][provider] = merged_fields
-                        else:
-                            # Add new provider
-                            merged["provider_mappings"][selector]["provider_fields"][provider] = fields
-                    
-                    # Update sources
-                    sources.setdefault(selector, []).append(file_name)
-                else:
-                    # Add new provider mapping
-                    merged["provider_mappings"][selector] = details
-                    sources[selector] = [file_name]
-            
-            # Process boolean selectors
-            for selector, details in mapping.get("boolean_selectors", {}).items():
-                if selector in merged["boolean_selectors"]:
-                    logger.warning(f"Duplicate boolean selector for {selector} in {file_name}")
-                    
-                    # Merge provider fields (dependent variables)
-                    existing_fields = set(merged["boolean_selectors"][selector].get("provider_fields", []))
-                    new_fields = set(details.get("provider_fields", []))
-                    merged_fields = sorted(list(existing_fields.union(new_fields)))
-                    merged["boolean_selectors"][selector]["provider_fields"] = merged_fields
-                    
-                    # Update sources
-                    sources.setdefault(selector, []).append(file_name)
-                else:
-                    # Add new boolean selector
-                    merged["boolean_selectors"][selector] = details
-                    sources[selector] = [file_name]
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file_path}: {e}")
+        merger.add_file(file_path)
+    return merger
+
+def reduce_mergers(partials: List[MappingMerger]) -> MappingMerger:
+    """
+    Combine partial merges with a pairwise tree reduce.
+    
+    Neighbouring partials are combined left into right order in each round,
+    so the result only depends on the order of the partials, not on which
+    worker finished first.
+    
+    Args:
+        partials: Partial merges of consecutive batches, in input order
+    
+    Returns:
+        The combined merge
+    """
+    if not partials:
+        return MappingMerger()
+    while len(partials) > 1:
+        combined = []
+        for index in range(0, len(partials) - 1, 2):
+            partials[index].combine(partials[index + 1])
+            combined.append(partials[index])
+        if len(partials) % 2:
+            combined.append(partials[-1])
+        partials = combined
+    return partials[0]
+
+def merge_mappings_parallel(mapping_files: List[str], workers: Optional[int] = None,
+                            batch_size: Optional[int] = None) -> Dict:
+    """
+    Merge mapping files with worker processes.
+    
+    The files are split into consecutive batches that workers parse and merge
+    into partial results, which are then combined with reduce_mergers. The
+    result, including _metadata.sources, is identical to merge_mappings.
+    
+    Args:
+        mapping_files: List of paths to mapping JSON files
+        workers: Number of worker processes (defaults to the CPU count)
+        batch_size: Files per batch (defaults to about four batches per worker)
     
-    # Sort all lists for consistency
-    for selector, details in merged["provider_mappings"].items():
-        if "enum_values" in details:
-            details["enum_values"] = sorted(details["enum_values"])
-        for provider, fields in details.get("provider_fields", {}).items():
-            details["provider_fields"][provider] = sorted(fields)
+    Returns:
+        A dictionary with the merged mappings
+    """
+    workers = workers or os.cpu_count() or 1
+    if not batch_size:
+        batch_size = max(1, math.ceil(len(mapping_files) / (workers * 4)))
+    batches = [mapping_files[i:i + batch_size] for i in range(0, len(mapping_files), batch_size)]
+    logger.info(f"Merging {len(mapping_files)} files in {len(batches)} batches with {workers} workers")
     
-    for selector, details in merged["boolean_selectors"].items():
-        if "provider_fields" in details:
-            details["provider_fields"] = sorted(details["provider_fields"])
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() returns the partials in batch order
+        partials = list(executor.map(merge_batch, batches))
+    
+    return reduce_mergers(partials).finalize(file_count=len(mapping_files))
+
+def merge_mapping_stream(stream: TextIO, name: str = "<stdin>") -> Dict:
+    """
+    Merge relationship mappings from a JSON Lines stream.
     
-    # Log merge results
-    logger.info(f"Merged {len(mapping_files)} mapping files")
-    logger.info(f"Resulting in {len(merged['provider_mappings'])} provider mappings and {len(merged['boolean_selectors'])} boolean selectors")
+    Each non-empty line holds one mapping document. A document may name itself
+    with a "source" key; otherwise it is recorded as <name>:<line number>.
+    Lines that cannot be parsed are logged and skipped, like unreadable files.
     
-    # Add source tracking metadata
-    merged["_metadata"] = {
-        "sources": sources,
-        "file_count": len(mapping_files)
-    }
+    Args:
+        stream: A text stream of JSON Lines
+        name: Name of the stream, used for unnamed documents
     
-    return merged
+    Returns:
+        A dictionary with the merged mappings
+    """
+    merger = MappingMerger()
+    line_count = 0
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        line_count += 1
+        record_bytes_read(len(line))
+        try:
+            mapping = json.loads(line)
+            if not isinstance(mapping, dict):
+                raise ValueError("expected a JSON object")
+            merger.add(mapping, str(mapping.get("source") or f"{name}:{line_number}"))
+        except Exception as e:
+            logger.error(f"Error processing line {line_number} of {name}: {e}")
+    return merger.finalize(file_count=line_count)
 
 def find_mapping_files(input_dir: str) -> List[str]:
     """
     Find all JSON files in the input directory.
     
+    The files are returned in sorted order rather than directory listing
+    order, which varies between file systems, so the first-seen details and
+    source lists of a merge are the same on every machine.
+    
     Args:
         input_dir: Path to the directory containing mapping files
-        
+    
     Returns:
-        A list of paths to JSON files
+        A sorted list of paths to JSON files
     """
     json_files = []
-    for root, _, files in os.walk(input_dir):
-        for file in files:
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for file in sorted(files):
             if file.endswith(".json"):
                 json_files.append(os.path.join(root, file))
     return json_files
 
 def main():
     parser = argparse.ArgumentParser(description='Merge relationship mappings from multiple JSON files')
-    parser.add_argument('--input-dir', '-i', required=True, 
+    parser.add_argument('files', nargs='*',
+                        help='Mapping JSON files to merge, in any order; "-" reads JSON Lines from stdin')
+    parser.add_argument('--input-dir', '-i',
                         help='Directory containing relationship mapping JSON files')
     parser.add_argument('--output', '-o', default='relationship_mappings.json', 
                         help='Path to the output merged mappings JSON file')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Merge files in parallel with this many worker processes (default: merge serially)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Files per worker batch with --workers (default: about four batches per worker)')
+    add_profile_arguments(parser)
     args = parser.parse_args()
     
+    if not args.input_dir and not args.files:
+        parser.error("give --input-dir, mapping files, or - to read JSON Lines from stdin")
+    if "-" in args.files and (args.input_dir or len(args.files) > 1):
+        parser.error("- (stdin) cannot be combined with other inputs")
+    
     try:
-        # Find all JSON files in the input directory
-        mapping_files = find_mapping_files(args.input_dir)
-        if not mapping_files:
-            logger.error(f"No JSON files found in {args.input_dir}")
-            return
-        
-        logger.info(f"Found {len(mapping_files)} JSON files to merge")
-        
-        # Merge the mappings
-        merged = merge_mappings(mapping_files)
-        
-        # Save the merged mappings
-        save_json_file(merged, args.output)
+        with profiling("merge_relationship_mappings", args.profile, args.cprofile):
+            if args.files == ["-"]:
+                # Merge a JSON Lines stream, one mapping document per line
+                with stage("merge_mappings"):
+                    merged = merge_mapping_stream(sys.stdin)
+                input_count = merged["_metadata"]["file_count"]
+                if not input_count:
+                    logger.error("No mapping documents read from stdin")
+                    return
+            else:
+                # Find all JSON files in the input directory
+                with stage("find_mapping_files"):
+                    mapping_files = list(args.files)
+                    if args.input_dir:
+                        mapping_files += find_mapping_files(args.input_dir)
+                if not mapping_files:
+                    logger.error(f"No JSON files found in {args.input_dir}")
+                    return
+                
+                logger.info(f"Found {len(mapping_files)} JSON files to merge")
+                
+                # Merge the mappings
+                with stage("merge_mappings"):
+                    if args.workers and args.workers > 1:
+                        merged = merge_mappings_parallel(mapping_files, args.workers, args.batch_size)
+                    else:
+                        merged = merge_mappings(mapping_files)
+                input_count = len(mapping_files)
+            
+            # Save the merged mappings
+            save_json_file(merged, args.output)
         
         # Print summary
         print(f"\nMerge complete!")
-        print(f"- Merged {len(mapping_files)} mapping files")
+        print(f"- Merged {input_count} mapping files")
         print(f"- Saved result to {args.output}")
         print(f"- Resulting in:")
         print(f"  * {len(merged['provider_mappings'])} provider mappings")
@@ -216,7 +494,7 @@ def main():
         for selector in sorted(merged["boolean_selectors"].keys()):
             field_count = len(merged["boolean_selectors"][selector].get("provider_fields", []))
             print(f"  - {selector}: {field_count} dependent fields")
-        
+    
     except Exception as e:
         logger.error(f"Error merging mappings: {e}")
         raise
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+OpenWebUI Schema Tools
+
+An importable API over the pipeline scripts, and a single command line with one subcommand
+per script:
+1. parse, extract_templates, split_sections, merge and generate wrap the script functions
+   behind a small, stable set of signatures
+2. The script modules are only imported when a function or subcommand needs them, so
+   importing this module or running a short subcommand does not pay for the rest
+   (for example, requests is only imported by the subcommands that download)
+3. Subcommands hand their arguments to the script's own main(), so every script option
+   is available unchanged
+
+Usage:
+  python openwebui_schema.py prepare --output-dir prepared_docs
+  python openwebui_schema.py merge --input-dir mappings --output relationship_mappings.json
+  python openwebui_schema.py generate --output openwebui-config-schema.json
+  python openwebui_schema.py validate --help
+
+  import openwebui_schema
+  content, templates = openwebui_schema.extract_templates(text)
+"""
+
+import os
+import sys
+import argparse
+import importlib
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+__all__ = ["parse", "extract_templates", "split_sections", "merge", "generate", "main"]
+
+# Subcommand -> (script module, summary)
+COMMANDS = {
+    "prepare": ("download_and_prepare_docs", "Download the documentation and extract templates and sections"),
+    "mappings": ("generate_relationship_mappings", "Generate relationship mappings with an LLM endpoint"),
+    "merge": ("merge_relationship_mappings", "Merge relationship mapping files"),
+    "generate": ("unified_schema_generator", "Generate the OpenAPI schema"),
+    "pipeline": ("run_pipeline", "Run the whole pipeline in one process, optionally watching inputs"),
+    "batch": ("batch_process_versions", "Generate schemas for many documentation versions"),
+    "validate": ("config_validator", "Validate configurations against the schema"),
+    "diff": ("schema_diff", "Compare the schemas of two documentation versions"),
+    "render": ("config_renderer", "Render per-tenant env, compose and Kubernetes files"),
+}
+
+def parse(path: Optional[str] = None, content: Union[str, bytes, None] = None) -> Dict[str, Dict]:
+    """
+    Parse the documentation into variable records.
+    
+    Args:
+        path: Path to the Markdown documentation (memory-mapped)
+        content: The documentation itself, instead of a path
+    
+    Returns:
+        {variable: record}, as produced by the schema generator
+    """
+    import unified_schema_generator as generator
+    
+    if (path is None) == (content is None):
+        raise ValueError("Pass exactly one of path or content")
+    if path is not None:
+        return generator.parse_markdown(path)
+    return generator.tokenize_markdown(content)[0]
+
+def extract_templates(content: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Remove the DEFAULT_*_TEMPLATE definitions from the documentation.
+    
+    Args:
+        content: The documentation
+    
+    Returns:
+        A tuple of (content without templates, {template variable: template})
+    """
+    import download_and_prepare_docs as prepare
+    
+    return prepare.extract_templates(content)
+
+def split_sections(content: str) -> Dict[str, str]:
+    """
+    Split the documentation into sections at its ## headers.
+    
+    Args:
+        content: The documentation
+    
+    Returns:
+        {section file name: section content}
+    """
+    import download_and_prepare_docs as prepare
+    
+    return prepare.split_into_sections(content)
+
+def merge(mappings: Union[str, Iterable[str]], workers: Optional[int] = None) -> Dict:
+    """
+    Merge relationship mapping files.
+    
+    Args:
+        mappings: A directory of mapping files, or the mapping file paths
+        workers: Merge in this many worker processes (serial when None)
+    
+    Returns:
+        The merged relationship mappings
+    """
+    import merge_relationship_mappings as merger
+    
+    if isinstance(mappings, str):
+        mapping_files = merger.find_mapping_files(mappings) if os.path.isdir(mappings) else [mappings]
+    else:
+        mapping_files = list(mappings)
+    if workers:
+        return merger.merge_mappings_parallel(mapping_files, workers)
+    return merger.merge_mappings(mapping_files)
+
+def generate(markdown_path: str, templates_path: str, relationships_path: str,
+             classifications_path: str, output_path: str, **options) -> Dict:
+    """
+    Generate the schema from files on disk.
+    
+    Args:
+        markdown_path: Path to the processed documentation
+        templates_path: Path to the default templates JSON file
+        relationships_path: Path to the relationship mappings JSON file
+        classifications_path: Path to the manual classifications JSON file
+        output_path: Path to the output schema JSON file
+        **options: Further keyword arguments of unified_schema_generator.generate_schema
+            (cache_path, compact_path, shards_dir, properties_only, ...)
+    
+    Returns:
+        The schema that was saved
+    """
+    import unified_schema_generator as generator
+    
+    return generator.generate_schema(markdown_path, templates_path, relationships_path,
+                                     classifications_path, output_path, **options)
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(
+        description='OpenWebUI schema tools',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<10} {summary}" for name, (_, summary) in COMMANDS.items())
+               + "\n\nRun '%(prog)s COMMAND --help' for the options of a command.")
+    parser.add_argument('command', choices=COMMANDS, metavar='COMMAND',
+                        help='The command to run')
+    parser.add_argument('args', nargs=argparse.REMAINDER,
+                        help='Options passed to the command')
+    args = parser.parse_args(argv)
+    
+    module = importlib.import_module(COMMANDS[args.command][0])
+    sys.argv = [f"{parser.prog} {args.command}"] + args.args
+    return module.main()
+
+if __name__ == "__main__":
+    main()
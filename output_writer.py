@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Output Writer
+
+Shared helpers used by the pipeline scripts to write generated artifacts:
+1. Files are only rewritten when their content hash changes, so unchanged files keep their mtime
+2. Changed files are written to a temporary file and renamed into place atomically
+3. Stale generated files that are no longer produced can be removed
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Iterable, List
+
+from instrumentation import record_bytes_read, record_bytes_written
+
+logger = logging.getLogger(__name__)
+
+def file_hash(path: str) -> str:
+    """
+    Hash the content of an existing file.
+    
+    Args:
+        path: Path to the file
+    
+    Returns:
+        A hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _default_mode() -> int:
+    """
+    Get the permission bits a newly created file would get under the current umask.
+    
+    Returns:
+        The file mode
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def write_bytes_if_changed(path: str, data: bytes) -> bool:
+    """
+    Atomically write bytes to a file unless it already holds the same content.
+    
+    Args:
+        path: Path to the output file
+        data: The content to write
+    
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    if os.path.isfile(path) and os.path.getsize(path) == len(data):
+        record_bytes_read(len(data))
+        if file_hash(path) == hashlib.sha256(data).hexdigest():
+            return False
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else _default_mode()
+    
+    # Write next to the target so the rename stays on the same filesystem
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    record_bytes_written(len(data))
+    return True
+
+def write_text_if_changed(path: str, content: str) -> bool:
+    """
+    Atomically write text to a file unless it already holds the same content.
+    
+    Args:
+        path: Path to the output file
+        content: The text to write
+    
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    return write_bytes_if_changed(path, content.encode('utf-8'))
+
+def write_json_if_changed(path: str, data: Any, indent: int = 2) -> bool:
+    """
+    Atomically write data as JSON unless the file already holds the same content.
+    
+    Args:
+        path: Path to the output file
+        data: The data to serialize
+        indent: JSON indentation (None for compact output)
+    
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    return write_text_if_changed(path, json.dumps(data, indent=indent))
+
+def remove_stale_files(directory: str, keep: Iterable[str], suffix: str) -> List[str]:
+    """
+    Remove generated files that are no longer produced.
+    
+    Args:
+        directory: Directory holding the generated files
+        keep: File names that were produced by the current run
+        suffix: Only files with this suffix are considered generated
+    
+    Returns:
+        The paths of the removed files
+    """
+    if not os.path.isdir(directory):
+        return []
+    
+    keep = set(keep)
+    removed = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(suffix) and name not in keep and os.path.isfile(path):
+            os.unlink(path)
+            removed.append(path)
+            logger.info(f"Removed stale file {path}")
+    
+    return removed
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Rename Detection
+
+Matches variables that are new to the classifications against classified variables that
+disappeared from the documentation, so a rename such as RAG_EMBEDDING_MODEL ->
+RETRIEVAL_EMBEDDING_MODEL keeps its manual classification instead of getting a default stub:
+1. Every retired variable is indexed by its name (underscore tokens and character
+   trigrams), its description from a previous schema and its default value
+2. Features are weighted by inverse document frequency and stored in an inverted index,
+   so a lookup only visits the candidates that share a feature with the new variable;
+   features shared by most candidates (such as "ENABLE" or a "True" default) are skipped
+3. Each field is scored with cosine similarity, and the fields both sides have are
+   combined with fixed weights; a candidate must share at least one name feature
+4. Every new variable gets a ranked list of candidate predecessors, and predecessors are
+   assigned greedily by score so each one is claimed by at most one new variable
+
+Matches are proposals for review: the classifications file written for new variables
+carries the predecessor's classification forward and records where it came from.
+"""
+
+import re
+import math
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Weight of each field in the combined score
+FIELD_WEIGHTS = {"name": 0.6, "description": 0.3, "default": 0.1}
+
+# Relative weight of whole name tokens and character trigrams within the name field
+NAME_TOKEN_WEIGHT = 2.0
+NAME_TRIGRAM_WEIGHT = 1.0
+
+# Minimum combined score for a proposed rename
+DEFAULT_MIN_SCORE = 0.5
+
+# Number of ranked candidates kept for each new variable
+DEFAULT_CANDIDATES = 3
+
+# Features held by more than this share of the candidates are not looked up
+MAX_FEATURE_SHARE = 0.5
+
+# Posting lists up to this length are always kept, so small indexes skip no features
+MIN_POSTING_LIMIT = 16
+
+# Words ignored in descriptions
+STOP_WORDS = {
+    "the", "and", "for", "this", "that", "with", "from", "when", "will", "are", "not",
+    "used", "use", "can", "set", "sets", "which", "into", "its", "your", "you", "default",
+    "variable", "value", "enable", "enables", "specifies", "whether", "should", "only"
+}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+def name_features(var_name: str) -> Dict[str, float]:
+    """
+    Get the weighted name features of a variable.
+    
+    Args:
+        var_name: The variable name
+    
+    Returns:
+        {feature: weight} with "n:" token and "g:" trigram features
+    """
+    features: Dict[str, float] = {}
+    for token in var_name.upper().split("_"):
+        if token:
+            features[f"n:{token}"] = NAME_TOKEN_WEIGHT
+    padded = f"_{var_name.upper()}_"
+    for i in range(len(padded) - 2):
+        features[f"g:{padded[i:i + 3]}"] = NAME_TRIGRAM_WEIGHT
+    return features
+
+def text_features(text: Optional[str], prefix: str) -> Dict[str, float]:
+    """
+    Get the word features of a description or default value.
+    
+    Args:
+        text: The text, or None
+        prefix: Feature prefix naming the field
+    
+    Returns:
+        {feature: weight} with one feature per distinct word
+    """
+    if not text:
+        return {}
+    return {f"{prefix}{word}": 1.0 for word in WORD_RE.findall(str(text).lower())
+            if len(word) > 2 and word not in STOP_WORDS}
+
+def variable_features(var_name: str, description: Optional[str] = None,
+                      default: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Get the features of a variable, grouped by field.
+    
+    Args:
+        var_name: The variable name
+        description: The variable description, if known
+        default: The default value, if known
+    
+    Returns:
+        {field: {feature: weight}}, without empty fields
+    """
+    fields = {
+        "name": name_features(var_name),
+        "description": text_features(description, "d:"),
+        "default": text_features(default, "v:")
+    }
+    return {field: features for field, features in fields.items() if features}
+
+class RenameIndex:
+    """
+    Inverted index over the variables that may have been renamed.
+    
+    Candidates are added with add(), and the index is finalized on the first
+    lookup; adding a candidate afterwards finalizes it again.
+    """
+    
+    def __init__(self, max_feature_share: float = MAX_FEATURE_SHARE):
+        """
+        Initialize an empty index.
+        
+        Args:
+            max_feature_share: Features held by more than this share of the
+                candidates are not looked up
+        """
+        self.max_feature_share = max_feature_share
+        self.names: List[str] = []
+        # candidate id -> {field: {feature: raw weight}}
+        self._features: List[Dict[str, Dict[str, float]]] = []
+        # feature -> [(candidate id, weighted value)]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        # feature -> inverse document frequency
+        self._idf: Dict[str, float] = {}
+        # candidate id -> {field: vector norm}
+        self._norms: List[Dict[str, float]] = []
+        self._ready = False
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def add(self, var_name: str, description: Optional[str] = None, default: Optional[str] = None) -> None:
+        """
+        Add a candidate predecessor.
+        
+        Args:
+            var_name: The variable name
+            description: The variable description, if known
+            default: The default value, if known
+        """
+        self.names.append(var_name)
+        self._features.append(variable_features(var_name, description, default))
+        self._ready = False
+    
+    def _finalize(self) -> None:
+        """
+        Compute the inverse document frequencies, postings and vector norms.
+        """
+        counts: Dict[str, int] = {}
+        for fields in self._features:
+            for features in fields.values():
+                for feature in features:
+                    counts[feature] = counts.get(feature, 0) + 1
+        
+        total = len(self.names)
+        limit = max(MIN_POSTING_LIMIT, int(total * self.max_feature_share))
+        self._idf = {feature: math.log((total + 1) / (count + 1)) + 1.0 for feature, count in counts.items()}
+        self._postings = {}
+        self._norms = []
+        for candidate, fields in enumerate(self._features):
+            norms = {}
+            for field, features in fields.items():
+                squares = 0.0
+                for feature, weight in features.items():
+                    value = weight * self._idf[feature]
+                    squares += value * value
+                    if counts[feature] <= limit:
+                        self._postings.setdefault(feature, []).append((candidate, value))
+                norms[field] = math.sqrt(squares)
+            self._norms.append(norms)
+        self._ready = True
+    
+    def _query_vector(self, var_name: str, description: Optional[str],
+                      default: Optional[str]) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+        """
+        Weight the features of a new variable with the index's frequencies.
+        
+        Args:
+            var_name: The variable name
+            description: The variable description, if known
+            default: The default value, if known
+        
+        Returns:
+            A tuple of ({field: {feature: weighted value}}, {field: vector norm})
+        """
+        unseen = math.log(len(self.names) + 1) + 1.0
+        vectors = {}
+        norms = {}
+        for field, features in variable_features(var_name, description, default).items():
+            vector = {feature: weight * self._idf.get(feature, unseen) for feature, weight in features.items()}
+            vectors[field] = vector
+            norms[field] = math.sqrt(sum(value * value for value in vector.values()))
+        return vectors, norms
+    
+    def candidates(self, var_name: str, description: Optional[str] = None, default: Optional[str] = None,
+                   limit: int = DEFAULT_CANDIDATES, min_score: float = DEFAULT_MIN_SCORE) -> List[Tuple[str, float]]:
+        """
+        Rank the candidate predecessors of a new variable.
+        
+        Args:
+            var_name: The new variable name
+            description: The new variable's description, if known
+            default: The new variable's default value, if known
+            limit: Maximum number of candidates returned
+            min_score: Minimum combined score
+        
+        Returns:
+            [(candidate name, score)], best first
+        """
+        if not self.names:
+            return []
+        if not self._ready:
+            self._finalize()
+        
+        vectors, query_norms = self._query_vector(var_name, description, default)
+        # candidate id -> {field: dot product}
+        dots: Dict[int, Dict[str, float]] = {}
+        for field, vector in vectors.items():
+            for feature, value in vector.items():
+                for candidate, candidate_value in self._postings.get(feature, ()):
+                    field_dots = dots.setdefault(candidate, {})
+                    field_dots[field] = field_dots.get(field, 0.0) + value * candidate_value
+        
+        scored = []
+        for candidate, field_dots in dots.items():
+            if "name" not in field_dots or self.names[candidate] == var_name:
+                continue
+            norms = self._norms[candidate]
+            weighted = 0.0
+            weights = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                if field in query_norms and field in norms:
+                    weights += weight
+                    if field in field_dots:
+                        weighted += weight * field_dots[field] / (query_norms[field] * norms[field])
+            score = round(weighted / weights, 4)
+            if score >= min_score:
+                scored.append((self.names[candidate], score))
+        
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+def _describe(prop: Optional[Dict]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Get the description and default value of a schema property.
+    
+    Args:
+        prop: The schema property, or None
+    
+    Returns:
+        A tuple of (description, default)
+    """
+    if not prop:
+        return None, None
+    default = prop.get("default")
+    return prop.get("description"), None if default is None else str(default)
+
+def build_rename_index(retired: Iterable[str], classifications: Dict,
+                       previous_properties: Optional[Dict[str, Dict]] = None) -> RenameIndex:
+    """
+    Index the retired variables as candidate predecessors.
+    
+    Args:
+        retired: Classified variables that are no longer documented
+        classifications: The manual classifications
+        previous_properties: Properties of a previous schema, used for the
+            descriptions and defaults of the retired variables
+    
+    Returns:
+        The rename index
+    """
+    var_classifications = classifications.get("variable_classifications", {})
+    previous_properties = previous_properties or {}
+    index = RenameIndex()
+    for var_name in retired:
+        description, default = _describe(previous_properties.get(var_name))
+        if default is None:
+            default = var_classifications.get(var_name, {}).get("default_value")
+        index.add(var_name, description, default)
+    return index
+
+def detect_renames(new_vars: List[str], schema_props: Dict[str, Dict], classifications: Dict,
+                   previous_properties: Optional[Dict[str, Dict]] = None,
+                   min_score: float = DEFAULT_MIN_SCORE,
+                   limit: int = DEFAULT_CANDIDATES) -> Dict[str, Dict]:
+    """
+    Propose predecessors for new variables.
+    
+    Args:
+        new_vars: Variables missing from the classifications
+        schema_props: The schema properties
+        classifications: The manual classifications
+        previous_properties: Properties of a previous schema, if available
+        min_score: Minimum combined score for a candidate
+        limit: Number of ranked candidates kept per new variable
+    
+    Returns:
+        {new variable: {"predecessor": name, "score": score, "candidates": [[name, score], ...]}}
+        for every new variable with an assigned predecessor
+    """
+    retired = [var_name for var_name in classifications.get("variable_classifications", {})
+               if var_name not in schema_props]
+    if not new_vars or not retired:
+        return {}
+    
+    index = build_rename_index(retired, classifications, previous_properties)
+    ranked = {}
+    for var_name in new_vars:
+        description, default = _describe(schema_props.get(var_name))
+        candidates = index.candidates(var_name, description, default, limit=limit, min_score=min_score)
+        if candidates:
+            ranked[var_name] = candidates
+    
+    # Assign each predecessor to the new variable it matches best
+    pairs = sorted(((score, new_name, old_name) for new_name, candidates in ranked.items()
+                    for old_name, score in candidates), key=lambda item: (-item[0], item[1], item[2]))
+    renames = {}
+    claimed = set()
+    for score, new_name, old_name in pairs:
+        if new_name in renames or old_name in claimed:
+            continue
+        claimed.add(old_name)
+        renames[new_name] = {
+            "predecessor": old_name,
+            "score": score,
+            "candidates": [[name, candidate_score] for name, candidate_score in ranked[new_name]]
+        }
+    
+    logger.info(f"Matched {len(renames)} of {len(new_vars)} new variables to "
+                f"{len(retired)} retired variables")
+    return {var_name: renames[var_name] for var_name in new_vars if var_name in renames}
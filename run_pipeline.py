@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+Run the OpenWebUI Schema Pipeline
+
+This script runs the whole documentation to schema pipeline in one process:
+1. Fetches the documentation through the conditional fetch cache, or reads a local copy
+2. Extracts the DEFAULT_*_TEMPLATE variables, or loads --templates, and tokenizes the
+   processed documentation
+3. Merges the relationship mapping files, or loads already merged relationship mappings
+4. Generates the schema, and optionally dumps the prepared documentation artifacts
+
+Stages hand their results to each other in memory instead of through prepared_docs and
+JSON files. Every stage has a key computed from the keys of its inputs, its options and
+the source of the module that implements it:
+- A stage result is memoized under its key and reused while the key is unchanged
+- An output stage is skipped when its key matches the one recorded in the state file
+  and the files it wrote are unmodified
+
+With --watch, the script keeps running and polls the documentation, template, mapping
+and classification files. A burst of changes is debounced into one rebuild, and only
+the stages and schema properties affected by the change are rebuilt.
+
+Usage:
+  python run_pipeline.py --mappings-dir mappings --output openwebui-config-schema.json
+  python run_pipeline.py --doc prepared_docs/env-configuration-processed.md \\
+    --templates prepared_docs/default_templates.json --mappings-dir mappings --watch
+  python run_pipeline.py --doc env-configuration.md --relationships relationship_mappings.json \\
+    --dump-dir prepared_docs
+"""
+
+import os
+import time
+import json
+import hashlib
+import argparse
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import download_and_prepare_docs as prepare
+import merge_relationship_mappings as merge
+import unified_schema_generator as generator
+import dependency_graph
+import rename_detection
+import compact_schema
+import schema_shards
+import doc_reader
+import output_writer
+from compact_schema import compact_path_for
+from schema_shards import shards_dir_for, shard_files, SHARD_GROUPS
+from output_writer import file_hash, write_json_if_changed
+from instrumentation import stage, add_profile_arguments, profiling
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Version of the state file layout
+STATE_VERSION = 1
+
+# File recording the keys and files of the outputs of the last run
+DEFAULT_STATE_PATH = ".pipeline_state.json"
+
+# Seconds between checks of the watched inputs
+DEFAULT_POLL_INTERVAL = 0.2
+
+# Seconds the watched inputs must stay unchanged before a rebuild starts
+DEFAULT_DEBOUNCE = 0.3
+
+def stage_key(*parts: Any) -> str:
+    """
+    Hash JSON-serializable key parts.
+    
+    Args:
+        parts: The parts of the key
+    
+    Returns:
+        A hex digest of the parts
+    """
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def module_fingerprint(module) -> str:
+    """
+    Hash the source of a module, so stage keys change when its code does.
+    
+    Args:
+        module: The imported module
+    
+    Returns:
+        A hex digest of the module source
+    """
+    return file_hash(os.path.abspath(module.__file__))
+
+class Pipeline:
+    """
+    Lazily evaluated pipeline stages with memoized results.
+    
+    Sources hold the pipeline inputs with keys computed by the caller. Stages
+    compute a value from the values of their dependencies and are evaluated
+    only when an output needs them. Outputs write files and return their
+    paths; they are the only stages whose keys are kept between runs.
+    """
+    
+    def __init__(self, state_path: Optional[str] = None, force: bool = False):
+        """
+        Initialize an empty pipeline.
+        
+        Args:
+            state_path: Path to the state file, or None to keep no state between runs
+            force: Whether to run outputs even when they are up to date
+        """
+        self.state_path = state_path
+        self.force = force
+        self.stages: Dict[str, Dict] = {}
+        # stage name -> (key, value) of the last evaluation
+        self.memo: Dict[str, Tuple[str, Any]] = {}
+        # stage name -> "ran", "memoized" or "skipped" for the current run
+        self.statuses: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+        self.state = self._load_state()
+    
+    def _load_state(self) -> Dict:
+        """
+        Load the output keys and file hashes recorded by the previous run.
+        
+        Returns:
+            The state, or an empty state if there is none or it is unreadable
+        """
+        empty = {"version": STATE_VERSION, "outputs": {}}
+        if not self.state_path or not os.path.exists(self.state_path):
+            return empty
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception:
+            logger.warning(f"Ignoring unreadable pipeline state {self.state_path}")
+            return empty
+        return state if state.get("version") == STATE_VERSION else empty
+    
+    def _define(self, name: str, definition: Dict) -> None:
+        """
+        Add or replace a stage and invalidate the computed keys.
+        
+        Args:
+            name: The stage name
+            definition: The stage definition
+        """
+        self.stages[name] = definition
+        self._keys = {}
+    
+    def add_source(self, name: str, key: str, load: Callable[[], Any]) -> None:
+        """
+        Add a pipeline input.
+        
+        Args:
+            name: The source name
+            key: A key that changes whenever the input does, such as its content hash
+            load: Function returning the input value, called only when it is needed
+        """
+        self._define(name, {"key": key, "function": load, "dependencies": [], "output": False})
+    
+    def add_stage(self, name: str, function: Callable, dependencies: Sequence[str] = (),
+                  version: str = "", options: Any = None, output: bool = False) -> None:
+        """
+        Add a stage that computes a value from its dependencies.
+        
+        Args:
+            name: The stage name
+            function: Function called with the values of the dependencies
+            dependencies: Names of the stages whose values the function takes
+            version: Fingerprint of the code the stage runs
+            options: JSON-serializable options that affect the result
+            output: Whether the stage writes files and returns their paths
+        """
+        self._define(name, {"key": None, "function": function, "dependencies": list(dependencies),
+                            "version": version, "options": options, "output": output})
+    
+    def key(self, name: str) -> str:
+        """
+        Compute the key of a stage from its definition and its dependencies' keys.
+        
+        Args:
+            name: The stage name
+        
+        Returns:
+            The stage key
+        """
+        if name not in self._keys:
+            definition = self.stages[name]
+            if definition["key"] is not None:
+                self._keys[name] = definition["key"]
+            else:
+                self._keys[name] = stage_key(
+                    name, definition["version"], definition["options"],
+                    [self.key(dependency) for dependency in definition["dependencies"]])
+        return self._keys[name]
+    
+    def value(self, name: str) -> Any:
+        """
+        Get the value of a stage, evaluating it only if its key changed.
+        
+        Args:
+            name: The stage name
+        
+        Returns:
+            The stage value
+        """
+        key = self.key(name)
+        memoized = self.memo.get(name)
+        if memoized is not None and memoized[0] == key:
+            self.statuses.setdefault(name, "memoized")
+            return memoized[1]
+        
+        definition = self.stages[name]
+        arguments = [self.value(dependency) for dependency in definition["dependencies"]]
+        with stage(name):
+            result = definition["function"](*arguments)
+        self.memo[name] = (key, result)
+        self.statuses[name] = "ran"
+        return result
+    
+    def _outputs_intact(self, files: Dict[str, str]) -> bool:
+        """
+        Check that the files an output wrote are unmodified.
+        
+        Args:
+            files: Mapping of paths to the content hashes recorded for them
+        
+        Returns:
+            True if every file exists with its recorded content
+        """
+        return all(os.path.isfile(path) and file_hash(path) == digest for path, digest in files.items())
+    
+    def run_output(self, name: str) -> bool:
+        """
+        Run an output stage unless it is up to date.
+        
+        Outputs are never memoized in memory, so files that were changed or
+        removed since they were written are always restored.
+        
+        Args:
+            name: The output stage name
+        
+        Returns:
+            True if the output ran, False if it was skipped
+        """
+        key = self.key(name)
+        recorded = self.state["outputs"].get(name)
+        if not self.force and recorded and recorded["key"] == key and self._outputs_intact(recorded["files"]):
+            logger.info(f"Output {name} is up to date")
+            self.statuses[name] = "skipped"
+            return False
+        
+        definition = self.stages[name]
+        arguments = [self.value(dependency) for dependency in definition["dependencies"]]
+        paths = definition["function"](*arguments)
+        self.statuses[name] = "ran"
+        self.state["outputs"][name] = {
+            "key": key,
+            "files": {path: file_hash(path) for path in paths if os.path.isfile(path)}
+        }
+        return True
+    
+    def run(self) -> Dict[str, str]:
+        """
+        Run every output stage and save the state.
+        
+        Returns:
+            The status of every stage that was needed, in evaluation order
+        """
+        self.statuses = {}
+        for name, definition in self.stages.items():
+            if definition["output"]:
+                self.run_output(name)
+        if self.state_path:
+            write_json_if_changed(self.state_path, self.state)
+        return self.statuses
+
+def read_documentation(args) -> str:
+    """
+    Read the documentation from a local file or through the fetch cache.
+    
+    Args:
+        args: The parsed command line arguments
+    
+    Returns:
+        The raw documentation content
+    """
+    if args.doc:
+        with open(args.doc, 'r', encoding='utf-8') as f:
+            return f.read()
+    if args.no_cache:
+        return prepare.download_documentation(args.url, args.timeout)
+    content, _ = prepare.fetch_documentation(args.url, args.cache_dir, args.timeout)
+    return content
+
+def configure_pipeline(pipeline: Pipeline, args, content: Optional[str] = None,
+                       build_cache: Optional[Dict[str, Dict]] = None) -> None:
+    """
+    Declare the sources, stages and outputs of the pipeline.
+    
+    The documentation is read here unless it is given, since its content is
+    the key of every stage that depends on it; the other inputs are only
+    hashed. Calling this again on the same pipeline redeclares the sources,
+    so only stages whose inputs changed are evaluated on the next run.
+    
+    Args:
+        pipeline: The pipeline to configure
+        args: The parsed command line arguments
+        content: The raw documentation, if it was already read
+        build_cache: Optional in-memory per-variable build cache for the schema
+    """
+    prepare_version = module_fingerprint(prepare)
+    generator_version = module_fingerprint(generator)
+    # The schema also depends on the modules the generator delegates to
+    schema_version = stage_key(generator_version, *(module_fingerprint(module) for module in (
+        dependency_graph, rename_detection, compact_schema, schema_shards, doc_reader, output_writer)))
+    
+    # Sources
+    if content is None:
+        with stage("read_documentation"):
+            content = read_documentation(args)
+    pipeline.add_source("documentation", stage_key(content), lambda: content)
+    pipeline.add_source("classifications", file_hash(args.classifications),
+                        lambda: generator.load_json_file(args.classifications))
+    if args.mappings_dir:
+        mapping_files = merge.find_mapping_files(args.mappings_dir)
+        pipeline.add_source("mapping_files", stage_key([[path, file_hash(path)] for path in mapping_files]),
+                            lambda: mapping_files)
+        if args.workers and args.workers > 1:
+            merge_files = lambda files: merge.merge_mappings_parallel(files, args.workers)
+        else:
+            merge_files = merge.merge_mappings
+        pipeline.add_stage("relationships", merge_files, ["mapping_files"], module_fingerprint(merge))
+    else:
+        pipeline.add_source("relationships", file_hash(args.relationships),
+                            lambda: generator.load_json_file(args.relationships))
+    
+    # Stages
+    pipeline.add_stage("extract_templates", prepare.extract_templates_with_stats,
+                       ["documentation"], prepare_version)
+    if args.templates:
+        # Templates from the file override those extracted from the documentation
+        pipeline.add_source("template_file", file_hash(args.templates),
+                            lambda: generator.load_json_file(args.templates))
+        pipeline.add_stage("templates", lambda extracted, loaded: {**extracted[1], **loaded},
+                           ["extract_templates", "template_file"])
+    else:
+        pipeline.add_stage("templates", lambda extracted: extracted[1], ["extract_templates"])
+    pipeline.add_stage("tokenize", lambda extracted: generator.tokenize_markdown(extracted[0])[0],
+                       ["extract_templates"], generator_version)
+    pipeline.add_stage("split_sections", lambda extracted: prepare.split_into_sections(extracted[0]),
+                       ["extract_templates"], prepare_version)
+    
+    # Outputs
+    new_classifications_path = f"{os.path.splitext(args.classifications)[0]}_with_new_vars.json"
+    compact_path = compact_path_for(args.output) if args.compact == '' else args.compact
+    shards_dir = shards_dir_for(args.output) if args.shards == '' else args.shards
+    schema_options = {
+        "output": args.output,
+        "classifications": args.classifications,
+        "append_new_vars": not args.no_append,
+        "properties_only": args.properties_only,
+        "inline_templates": args.inline_templates,
+        "compact": compact_path,
+        "shards": shards_dir,
+        "shard_by": args.shard_by,
+        "renames": not args.no_renames,
+        "previous_schema": args.previous_schema,
+        "cache": args.cache
+    }
+    
+    def write_schema(variable_info: Dict, templates: Dict, relationships: Dict,
+                     classifications: Dict) -> List[str]:
+        generator.generate_schema_from_data(
+            variable_info, templates, relationships, classifications,
+            output_path=args.output,
+            new_classifications_path=new_classifications_path,
+            append_new_vars=not args.no_append,
+            properties_only=args.properties_only,
+            cache_path=args.cache,
+            compact_path=compact_path,
+            inline_templates=args.inline_templates,
+            build_cache=build_cache,
+            shards_dir=shards_dir,
+            shard_by=args.shard_by,
+            detect_renames=not args.no_renames,
+            previous_schema_path=args.previous_schema
+        )
+        # Files that were not written (such as new classifications when there are
+        # no new variables) are not recorded, so they do not force a rebuild
+        paths = [path for path in (args.output, compact_path, new_classifications_path) if path]
+        return paths + (shard_files(shards_dir) if shards_dir else [])
+    
+    pipeline.add_stage("schema", write_schema,
+                       ["tokenize", "templates", "relationships", "classifications"],
+                       schema_version, schema_options, output=True)
+    
+    if args.dump_dir:
+        def dump_artifacts(extracted: Tuple, sections: Dict, relationships: Dict) -> List[str]:
+            updated_content, templates, _ = extracted
+            with stage("dump_artifacts"):
+                prepare.save_templates(templates, args.dump_dir)
+                prepare.save_sections(sections, args.dump_dir)
+                prepare.save_full_content(updated_content, args.dump_dir)
+                relationships_path = os.path.join(args.dump_dir, "relationship_mappings.json")
+                merge.save_json_file(relationships, relationships_path)
+            paths = [os.path.join(args.dump_dir, name) for name in
+                     ("default_templates.json", "env-configuration-processed.md", "relationship_mappings.json")]
+            return paths + [os.path.join(args.dump_dir, "sections", f"{title}.md") for title in sections]
+        
+        pipeline.add_stage("dump_artifacts", dump_artifacts,
+                           ["extract_templates", "split_sections", "relationships"],
+                           stage_key(prepare_version, module_fingerprint(merge)), {"dump_dir": args.dump_dir},
+                           output=True)
+
+def add_pipeline_arguments(parser) -> None:
+    """
+    Add the input, output and state options of the pipeline to an argument parser.
+    
+    Args:
+        parser: The argparse parser
+    """
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--doc',
+                        help='Local copy of env-configuration.md to use instead of downloading it')
+    source.add_argument('--url', default=prepare.DOCS_URL,
+                        help='URL of the environment configuration documentation')
+    parser.add_argument('--cache-dir', default=prepare.DEFAULT_CACHE_DIR,
+                        help=f'Directory for the conditional fetch cache (default: {prepare.DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always download the documentation')
+    parser.add_argument('--timeout', type=float, default=prepare.DEFAULT_TIMEOUT,
+                        help=f'HTTP timeout in seconds (default: {prepare.DEFAULT_TIMEOUT})')
+    parser.add_argument('--templates', '-t',
+                        help='Default templates JSON file, overriding templates found in the documentation')
+    mappings = parser.add_mutually_exclusive_group()
+    mappings.add_argument('--mappings-dir', '-m',
+                          help='Directory of relationship mapping files to merge')
+    mappings.add_argument('--relationships', '-r', default='relationship_mappings.json',
+                          help='Already merged relationship mappings (default: relationship_mappings.json)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Merge mapping files with this many worker processes (default: merge serially)')
+    parser.add_argument('--classifications', '-c', default='final_leger_openwebui_var_classifications.json',
+                        help='Path to the manual classifications JSON file')
+    parser.add_argument('--output', '-o', default='openwebui-config-schema.json',
+                        help='Path to the output schema JSON file')
+    parser.add_argument('--no-append', action='store_true',
+                        help='Do not write the classifications with new variables')
+    parser.add_argument('--properties-only', '-p', action='store_true',
+                        help='Output only the properties section of the schema')
+    parser.add_argument('--inline-templates', action='store_true',
+                        help='Inline template bodies in each property instead of the hash-keyed template store')
+    parser.add_argument('--compact', nargs='?', const='', default=None, metavar='PATH',
+                        help='Also write the compact indexed schema artifact (default path: <output>.idx)')
+    parser.add_argument('--shards', nargs='?', const='', default=None, metavar='DIR',
+                        help='Also write the schema as per-category shards with an index (default dir: <output>-shards)')
+    parser.add_argument('--shard-by', choices=SHARD_GROUPS, default='category',
+                        help='Shard per x-category or per top-level documentation section (default: category)')
+    parser.add_argument('--no-renames', action='store_true',
+                        help='Do not match new variables against renamed classified variables')
+    parser.add_argument('--previous-schema',
+                        help='Schema with the descriptions of retired variables (default: the existing output)')
+    parser.add_argument('--cache',
+                        help='Path to a per-variable build cache; unchanged variables are reused from it')
+    parser.add_argument('--dump-dir',
+                        help='Also write the prepared documentation and merged mappings to this directory')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH,
+                        help=f'File recording the outputs of the last run (default: {DEFAULT_STATE_PATH})')
+    parser.add_argument('--force', action='store_true',
+                        help='Run every output even when its inputs are unchanged')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and rebuild whenever an input file changes')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'Seconds between checks of the watched inputs (default: {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f'Seconds the inputs must stay unchanged before a rebuild (default: {DEFAULT_DEBOUNCE})')
+
+def print_run_summary(statuses: Dict[str, str]) -> None:
+    """
+    Print the status of every stage of a run.
+    
+    Args:
+        statuses: The statuses returned by Pipeline.run
+    """
+    print(f"\nPipeline complete!")
+    for name, status in statuses.items():
+        print(f"- {name}: {status}")
+
+def watched_paths(args) -> List[str]:
+    """
+    List the input files watched for changes.
+    
+    The mappings directory is listed again on every check, so added and
+    removed mapping files are noticed too.
+    
+    Args:
+        args: The parsed command line arguments
+    
+    Returns:
+        Paths of the watched files
+    """
+    paths = [args.classifications]
+    if args.doc:
+        paths.append(args.doc)
+    if args.templates:
+        paths.append(args.templates)
+    if args.mappings_dir:
+        paths += merge.find_mapping_files(args.mappings_dir)
+    else:
+        paths.append(args.relationships)
+    return paths
+
+def snapshot(paths: List[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    """
+    Record the modification time and size of files.
+    
+    Args:
+        paths: The files to check
+    
+    Returns:
+        A dictionary mapping each path to (mtime_ns, size), or None if it is missing
+    """
+    state = {}
+    for path in paths:
+        try:
+            info = os.stat(path)
+            state[path] = (info.st_mtime_ns, info.st_size)
+        except OSError:
+            state[path] = None
+    return state
+
+def wait_for_changes(args, current: Dict, interval: float, debounce: float) -> Tuple[Dict, List[str]]:
+    """
+    Wait until the inputs change and then stay unchanged for the debounce period.
+    
+    A burst of saves (an editor writing a file several times, or a batch of
+    mapping files being copied) therefore leads to a single rebuild.
+    
+    Args:
+        args: The parsed command line arguments
+        current: The snapshot the last build was made from
+        interval: Seconds between checks
+        debounce: Seconds without changes before returning
+    
+    Returns:
+        A tuple of (new snapshot, changed paths)
+    """
+    while True:
+        time.sleep(interval)
+        latest = snapshot(watched_paths(args))
+        if latest == current:
+            continue
+        
+        settled_at = time.monotonic()
+        while time.monotonic() - settled_at < debounce:
+            time.sleep(interval)
+            newer = snapshot(watched_paths(args))
+            if newer != latest:
+                latest, settled_at = newer, time.monotonic()
+        
+        changed = sorted(path for path in set(current) | set(latest) if current.get(path) != latest.get(path))
+        return latest, changed
+
+def watch(args) -> None:
+    """
+    Build once, then rebuild every time the inputs change until interrupted.
+    
+    The pipeline and the per-variable build cache stay in memory between
+    builds, so a rebuild only re-evaluates the stages whose inputs changed and
+    only rebuilds the properties whose section, template, relationships or
+    classification changed. Downloaded documentation is fetched once.
+    
+    Args:
+        args: The parsed command line arguments
+    """
+    pipeline = Pipeline(args.state, force=args.force)
+    build_cache = generator.load_schema_cache(args.cache) if args.cache else {}
+    content = None if args.doc else read_documentation(args)
+    
+    def rebuild() -> None:
+        start = time.perf_counter()
+        configure_pipeline(pipeline, args, content, build_cache)
+        statuses = pipeline.run()
+        pipeline.force = False
+        ran = [name for name, status in statuses.items() if status == "ran"]
+        print(f"\nBuild finished in {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"(ran: {', '.join(ran) or 'nothing'})")
+    
+    current = snapshot(watched_paths(args))
+    rebuild()
+    print(f"Watching {len(current)} input files for changes (Ctrl+C to stop)")
+    
+    try:
+        while True:
+            current, changed = wait_for_changes(args, current, args.poll_interval, args.debounce)
+            logger.info(f"Changed: {', '.join(changed)}")
+            try:
+                rebuild()
+            except Exception as e:
+                # Keep watching; the next save usually fixes a half-edited file
+                logger.error(f"Rebuild failed, waiting for the next change: {e}")
+    except KeyboardInterrupt:
+        print(f"\nStopped watching.")
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the OpenWebUI schema pipeline in one process')
+    add_pipeline_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.watch:
+        watch(args)
+        return
+    
+    try:
+        with profiling("run_pipeline", args.profile, args.cprofile):
+            pipeline = Pipeline(args.state, force=args.force)
+            configure_pipeline(pipeline, args)
+            statuses = pipeline.run()
+        print_run_summary(statuses)
+    except Exception as e:
+        logger.error(f"Error running pipeline: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
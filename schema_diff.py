@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Schema Diff
+
+This script compares two versions of the OpenWebUI configuration schema:
+1. Loads two schema files, or builds schema properties from two documentation files or
+   two git revisions of a docs checkout
+2. Hashes every property, so unchanged variables are skipped with one comparison
+3. Classifies the changes: added, removed, renamed, type, default, enum, dependency and
+   other changes
+4. Writes a JSON report and a Markdown report
+
+Display order is ignored, since inserting one variable shifts the order of every
+variable after it. Templates are compared by content, whether the schema stores them
+inline or in the template store.
+
+Usage:
+  python schema_diff.py old-schema.json openwebui-config-schema.json --json diff.json --markdown diff.md
+  python schema_diff.py --docs old/env-configuration.md new/env-configuration.md
+  python schema_diff.py --git-repo ../open-webui-docs v0.6.0 v0.6.5 --relationships relationship_mappings.json
+"""
+
+import json
+import hashlib
+import argparse
+import logging
+from typing import Any, Dict, List, Optional
+
+import unified_schema_generator as generator
+import download_and_prepare_docs as prepare
+from batch_process_versions import read_source, DEFAULT_DOC_PATH
+from output_writer import write_json_if_changed, write_text_if_changed
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Keys left out of property hashes
+IGNORED_KEYS = {"x-display-order"}
+
+# Keys that name the variable, left out of rename signatures
+NAME_KEYS = {"x-env-var"}
+
+# Change classes for variables present in both versions, with the keys they cover
+FIELD_CHANGES = [
+    ("type_changed", ("type",)),
+    ("default_changed", ("default", "x-references-var", "x-default-template")),
+    ("enum_changed", ("enum",)),
+    ("dependency_changed", ("x-depends-on", "x-provider-fields"))
+]
+
+# Report sections in order, with their Markdown titles
+CHANGE_TITLES = {
+    "added": "Added variables",
+    "removed": "Removed variables",
+    "renamed": "Renamed variables",
+    "type_changed": "Type changes",
+    "default_changed": "Default changes",
+    "enum_changed": "Enum changes",
+    "dependency_changed": "Dependency changes",
+    "other_changed": "Other changes"
+}
+
+def _hash(value: Any) -> str:
+    """
+    Hash a JSON value canonically.
+    
+    Args:
+        value: The value to hash
+    
+    Returns:
+        A hex digest of the value
+    """
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+def property_hash(prop: Dict, ignored: set = IGNORED_KEYS) -> str:
+    """
+    Hash a schema property without its ignored keys.
+    
+    Args:
+        prop: The schema property
+        ignored: Keys to leave out
+    
+    Returns:
+        A hex digest of the property
+    """
+    return _hash({key: value for key, value in prop.items() if key not in ignored})
+
+def schema_properties(schema: Dict) -> Dict[str, Dict]:
+    """
+    Get the properties of a full or properties-only schema, with inline templates.
+    
+    Args:
+        schema: The schema
+    
+    Returns:
+        The schema properties
+    """
+    if "components" not in schema:
+        return schema
+    schema = generator.expand_templates(schema)
+    return schema["components"]["schemas"]["OpenWebUIConfig"]["properties"]
+
+def properties_from_doc(content: str, relationships: Optional[Dict] = None) -> Dict[str, Dict]:
+    """
+    Build schema properties from raw documentation.
+    
+    Templates are extracted and applied like the pipeline does; relationships
+    are applied when given. Classifications are not, since they are curated
+    per variable rather than versioned with the documentation.
+    
+    Args:
+        content: The raw env-configuration.md content
+        relationships: Optional relationship mappings
+    
+    Returns:
+        The schema properties
+    """
+    processed, templates = prepare.extract_templates(content)
+    variable_info, _ = generator.tokenize_markdown(processed)
+    properties = {}
+    for var_name, record in variable_info.items():
+        if generator.is_template_variable(var_name):
+            continue
+        details = generator.extract_variable_details(record, var_name)
+        details["category"] = record["category"]
+        details["order"] = record["order"]
+        properties[var_name] = generator.create_schema_property(details)
+    properties = generator.apply_templates(properties, templates)
+    if relationships:
+        properties = generator.apply_relationships(properties, relationships)
+    return properties
+
+def diff_properties(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict[str, List]:
+    """
+    Classify the changes between two sets of schema properties.
+    
+    Variables whose property hashes match are skipped. A removed and an added
+    variable are paired as a rename when their properties are identical apart
+    from the name. A changed variable can appear in several change classes;
+    changes to keys not covered by the other classes are reported as
+    other_changed.
+    
+    Args:
+        old: The old schema properties
+        new: The new schema properties
+    
+    Returns:
+        A dictionary mapping change classes to their entries
+    """
+    changes: Dict[str, List] = {name: [] for name in CHANGE_TITLES}
+    old_hashes = {var_name: property_hash(prop) for var_name, prop in old.items()}
+    new_hashes = {var_name: property_hash(prop) for var_name, prop in new.items()}
+    
+    # Pair removed and added variables with the same nameless signature
+    removed = [var_name for var_name in old if var_name not in new]
+    added = [var_name for var_name in new if var_name not in old]
+    nameless = IGNORED_KEYS | NAME_KEYS
+    added_by_signature: Dict[str, List[str]] = {}
+    for var_name in added:
+        added_by_signature.setdefault(property_hash(new[var_name], nameless), []).append(var_name)
+    renamed_to = set()
+    for var_name in removed:
+        candidates = added_by_signature.get(property_hash(old[var_name], nameless))
+        if candidates:
+            target = candidates.pop(0)
+            renamed_to.add(target)
+            changes["renamed"].append({"from": var_name, "to": target})
+        else:
+            changes["removed"].append({"variable": var_name, "type": old[var_name].get("type")})
+    for var_name in added:
+        if var_name not in renamed_to:
+            changes["added"].append({"variable": var_name, "type": new[var_name].get("type"),
+                                     "category": new[var_name].get("x-category")})
+    
+    covered = {key for _, keys in FIELD_CHANGES for key in keys} | IGNORED_KEYS
+    for var_name, old_hash in old_hashes.items():
+        new_hash = new_hashes.get(var_name)
+        if new_hash is None or new_hash == old_hash:
+            continue
+        old_prop, new_prop = old[var_name], new[var_name]
+        for change, keys in FIELD_CHANGES:
+            changed_keys = [key for key in keys if old_prop.get(key) != new_prop.get(key)]
+            if changed_keys:
+                changes[change].append({
+                    "variable": var_name,
+                    "old": {key: old_prop.get(key) for key in changed_keys},
+                    "new": {key: new_prop.get(key) for key in changed_keys}
+                })
+        other_keys = sorted(key for key in set(old_prop) | set(new_prop)
+                            if key not in covered and old_prop.get(key) != new_prop.get(key))
+        if other_keys:
+            changes["other_changed"].append({"variable": var_name, "keys": other_keys})
+    
+    return changes
+
+def build_report(old_label: str, new_label: str, old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict:
+    """
+    Diff two sets of properties and build the JSON report.
+    
+    Args:
+        old_label: Name of the old version
+        new_label: Name of the new version
+        old: The old schema properties
+        new: The new schema properties
+    
+    Returns:
+        The report
+    """
+    changes = diff_properties(old, new)
+    changed = {entry["variable"] for change, entries in changes.items()
+               if change.endswith("_changed") for entry in entries}
+    return {
+        "old": old_label,
+        "new": new_label,
+        "summary": {
+            "old_variables": len(old),
+            "new_variables": len(new),
+            "changed_variables": len(changed),
+            **{change: len(entries) for change, entries in changes.items()}
+        },
+        "changes": changes
+    }
+
+def _short(value: Any, limit: int = 60) -> str:
+    """
+    Format a value for a Markdown table cell.
+    
+    Args:
+        value: The value
+        limit: Maximum length before the value is shortened
+    
+    Returns:
+        The formatted value
+    """
+    text = json.dumps(value, ensure_ascii=False) if not isinstance(value, str) else value
+    text = text.replace("|", "\\|").replace("\n", " ")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def render_markdown(report: Dict) -> str:
+    """
+    Render a diff report as Markdown.
+    
+    Args:
+        report: The report from build_report
+    
+    Returns:
+        The Markdown text
+    """
+    summary = report["summary"]
+    lines = [f"# Schema changes: {report['old']} -> {report['new']}", "",
+             f"{summary['old_variables']} -> {summary['new_variables']} variables, "
+             f"{summary['changed_variables']} changed.", ""]
+    lines += ["| Change | Count |", "| --- | --- |"]
+    lines += [f"| {title} | {summary[change]} |" for change, title in CHANGE_TITLES.items()]
+    
+    for change, title in CHANGE_TITLES.items():
+        entries = report["changes"][change]
+        if not entries:
+            continue
+        lines += ["", f"## {title}", ""]
+        if change == "renamed":
+            lines += ["| From | To |", "| --- | --- |"]
+            lines += [f"| `{entry['from']}` | `{entry['to']}` |" for entry in entries]
+        elif change in ("added", "removed"):
+            lines += [f"- `{entry['variable']}` ({entry['type']})" for entry in entries]
+        elif change == "other_changed":
+            lines += [f"- `{entry['variable']}`: {', '.join(entry['keys'])}" for entry in entries]
+        else:
+            lines += ["| Variable | Old | New |", "| --- | --- | --- |"]
+            for entry in entries:
+                old_value = entry["old"] if len(entry["old"]) > 1 else next(iter(entry["old"].values()))
+                new_value = entry["new"] if len(entry["new"]) > 1 else next(iter(entry["new"].values()))
+                lines.append(f"| `{entry['variable']}` | {_short(old_value)} | {_short(new_value)} |")
+    return "\n".join(lines) + "\n"
+
+def load_version(source: str, mode: str, git_repo: Optional[str], doc_path: str,
+                 relationships: Optional[Dict]) -> Dict[str, Dict]:
+    """
+    Load the schema properties of one version.
+    
+    Args:
+        source: A schema path, a documentation path or a git revision
+        mode: "schema", "docs" or "git"
+        git_repo: The docs checkout for git revisions
+        doc_path: Path of the documentation inside the repository
+        relationships: Optional relationship mappings for documentation versions
+    
+    Returns:
+        The schema properties
+    """
+    if mode == "schema":
+        return schema_properties(generator.load_json_file(source))
+    if mode == "docs":
+        content = read_source({"kind": "file", "path": source})
+    else:
+        content = read_source({"kind": "git", "repo": git_repo, "rev": source, "doc_path": doc_path})
+    return properties_from_doc(content, relationships)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two versions of the OpenWebUI configuration schema')
+    parser.add_argument('old', help='Old schema file, documentation file or git revision')
+    parser.add_argument('new', help='New schema file, documentation file or git revision')
+    parser.add_argument('--docs', action='store_true',
+                        help='Compare two documentation files instead of schema files')
+    parser.add_argument('--git-repo',
+                        help='Compare two git revisions of the documentation in this checkout')
+    parser.add_argument('--doc-path', default=DEFAULT_DOC_PATH,
+                        help=f'Path of the documentation inside the repository (default: {DEFAULT_DOC_PATH})')
+    parser.add_argument('--relationships', '-r',
+                        help='Relationship mappings to apply when comparing documentation versions')
+    parser.add_argument('--json', default='schema-diff.json',
+                        help='Path to the JSON report')
+    parser.add_argument('--markdown', default='schema-diff.md',
+                        help='Path to the Markdown report')
+    args = parser.parse_args()
+    
+    mode = "git" if args.git_repo else "docs" if args.docs else "schema"
+    try:
+        relationships = generator.load_json_file(args.relationships) if args.relationships else None
+        old = load_version(args.old, mode, args.git_repo, args.doc_path, relationships)
+        new = load_version(args.new, mode, args.git_repo, args.doc_path, relationships)
+        
+        report = build_report(args.old, args.new, old, new)
+        write_json_if_changed(args.json, report)
+        write_text_if_changed(args.markdown, render_markdown(report))
+    except Exception as e:
+        logger.error(f"Error comparing schemas: {e}")
+        raise
+    
+    # Print summary
+    summary = report["summary"]
+    print(f"\nSchema diff complete!")
+    print(f"- {summary['old_variables']} -> {summary['new_variables']} variables, {summary['changed_variables']} changed")
+    for change, title in CHANGE_TITLES.items():
+        if summary[change]:
+            print(f"  * {title}: {summary[change]}")
+    print(f"- Saved reports to {args.json} and {args.markdown}")
+
+if __name__ == "__main__":
+    main()
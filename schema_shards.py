@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Sharded Schema Output
+
+Splits the generated schema into one small schema per settings panel, for clients that
+only load the panel the user opens:
+1. One shard per x-category (for example "App/Backend - General"), or per top-level
+   documentation section ("App/Backend"), each a standalone OpenAPI document holding only
+   its properties, the templates they use and their slice of x-dependency-index
+2. A composite schema that links the shards with $ref, with one composite per section
+   and OpenWebUIConfig combining all of them
+3. A small index mapping every variable to its shard and to the byte offset and length
+   of its property in the shard file, so a single property can be read with one seek
+
+Shards are written as compact JSON and only rewritten when their content changes, so an
+unchanged panel keeps its file (and its HTTP cache validators) across schema builds.
+
+Layout of the shard directory:
+  index.json               - variable -> [shard, offset, length], plus shard metadata
+  openwebui-config.json    - the $ref-linked composite schemas
+  <shard>.json             - one file per category or section
+"""
+
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from output_writer import write_bytes_if_changed
+
+logger = logging.getLogger(__name__)
+
+# Version of the shard layout
+SHARD_FORMAT_VERSION = 1
+
+# Index and composite file names in the shard directory
+INDEX_FILE = "index.json"
+COMPOSITE_FILE = "openwebui-config.json"
+
+# Ways to group properties into shards
+SHARD_GROUPS = ("category", "section")
+
+# Shard key for properties without a category
+UNCATEGORIZED = "Uncategorized"
+
+# Keys copied from the schema info into every shard
+INFO_KEYS = ("title", "description", "version")
+
+def _compact_json(value: Any) -> str:
+    """
+    Serialize a value as compact JSON.
+    
+    Args:
+        value: The value to serialize
+    
+    Returns:
+        The JSON text
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def shard_key(prop: Dict, group_by: str = "category") -> str:
+    """
+    Get the shard a property belongs to.
+    
+    Args:
+        prop: The schema property
+        group_by: "category" for one shard per x-category, or "section" for
+            one shard per top-level section (the part before " - ")
+    
+    Returns:
+        The category or section name
+    """
+    category = prop.get("x-category") or UNCATEGORIZED
+    if group_by == "section":
+        return category.split(" - ", 1)[0]
+    return category
+
+def shard_slug(key: str) -> str:
+    """
+    Turn a category or section name into a file name stem.
+    
+    Args:
+        key: The category or section name
+    
+    Returns:
+        A lowercase slug such as "app-backend-general"
+    """
+    return re.sub(r"[^a-z0-9]+", "-", key.lower()).strip("-") or "shard"
+
+def schema_name(key: str) -> str:
+    """
+    Turn a category or section name into a component schema name.
+    
+    Args:
+        key: The category or section name
+    
+    Returns:
+        A PascalCase name such as "AppBackendGeneral"
+    """
+    return "".join(word[:1].upper() + word[1:] for word in re.findall(r"[A-Za-z0-9]+", key)) or "Shard"
+
+def _unique(name: str, taken: Dict[str, Any]) -> str:
+    """
+    Make a name unique by appending a number.
+    
+    Args:
+        name: The preferred name
+        taken: Names already in use
+    
+    Returns:
+        A name not in taken
+    """
+    candidate = name
+    counter = 2
+    while candidate in taken:
+        candidate = f"{name}{counter}"
+        counter += 1
+    return candidate
+
+def _split_full_schema(schema: Dict) -> Tuple[Dict, Dict, Dict, Dict]:
+    """
+    Get the parts of a full or properties-only schema used by the shards.
+    
+    Args:
+        schema: A full schema or a properties-only schema
+    
+    Returns:
+        A tuple of (info, properties, dependency index, template store)
+    """
+    config = schema.get("components", {}).get("schemas", {}).get("OpenWebUIConfig")
+    if config is None:
+        return {}, schema, {}, {}
+    info = {key: value for key, value in schema.get("info", {}).items() if key in INFO_KEYS}
+    return (info, config["properties"], config.get("x-dependency-index", {}),
+            schema["components"].get("x-templates", {}))
+
+def encode_shard(key: str, name: str, properties: Dict[str, Dict], info: Dict,
+                 dependency_index: Dict, template_store: Dict) -> Tuple[bytes, Dict[str, List[int]]]:
+    """
+    Encode one shard and record where each property is stored in it.
+    
+    The shard is assembled from separately serialized properties, so the
+    byte offset and length of every property are known exactly.
+    
+    Args:
+        key: The category or section name
+        name: The component schema name
+        properties: The properties of the shard
+        info: Info copied from the full schema
+        dependency_index: The full x-dependency-index
+        template_store: The full template store
+    
+    Returns:
+        A tuple of (shard bytes, {variable: [offset, length]})
+    """
+    conditions = dependency_index.get("conditions", {})
+    shard_conditions = {var_name: conditions[var_name] for var_name in properties if var_name in conditions}
+    templates = {}
+    for prop in properties.values():
+        digest = prop.get("x-default-template-hash")
+        if digest in template_store:
+            templates[digest] = template_store[digest]
+    
+    shard_info = dict(info, title=f"{info.get('title', 'OpenWebUI Configuration')} - {key}")
+    head = (f'{{"openapi":"3.0.0","info":{_compact_json(shard_info)},"paths":{{}},'
+            f'"components":{{"schemas":{{{_compact_json(name)}:'
+            f'{{"type":"object","x-category":{_compact_json(key)},"properties":{{').encode("utf-8")
+    chunks = [head]
+    offset = len(head)
+    offsets = {}
+    for i, (var_name, prop) in enumerate(properties.items()):
+        prefix = f'{"," if i else ""}{_compact_json(var_name)}:'.encode("utf-8")
+        body = _compact_json(prop).encode("utf-8")
+        offsets[var_name] = [offset + len(prefix), len(body)]
+        chunks += [prefix, body]
+        offset += len(prefix) + len(body)
+    
+    tail = "}"
+    if shard_conditions:
+        tail += f',"x-dependency-index":{{"conditions":{_compact_json(shard_conditions)}}}'
+    tail += "}}"
+    if templates:
+        tail += f',"x-templates":{_compact_json(templates)}'
+    tail += "}}"
+    chunks.append(tail.encode("utf-8"))
+    return b"".join(chunks), offsets
+
+def build_composite(info: Dict, shards: Dict[str, Dict], group_by: str, dependency_index: Dict) -> Dict:
+    """
+    Build the composite schema that links the shards with $ref.
+    
+    With category shards, every section gets a composite of its categories,
+    and OpenWebUIConfig combines the sections; with section shards,
+    OpenWebUIConfig combines the shards directly.
+    
+    Args:
+        info: Info copied from the full schema
+        shards: Shard metadata keyed by shard slug
+        group_by: "category" or "section"
+        dependency_index: The full x-dependency-index
+    
+    Returns:
+        The composite OpenAPI document
+    """
+    schemas: Dict[str, Dict] = {}
+    top_level: List[Dict] = []
+    sections: Dict[str, List[Dict]] = {}
+    for slug, shard in shards.items():
+        ref = {"$ref": f"{shard['file']}#/components/schemas/{shard['schema']}"}
+        if group_by == "category":
+            sections.setdefault(shard["key"].split(" - ", 1)[0], []).append(ref)
+        else:
+            top_level.append(ref)
+    
+    for section, refs in sections.items():
+        name = _unique(schema_name(section), schemas)
+        schemas[name] = {"allOf": refs, "x-section": section}
+        top_level.append({"$ref": f"#/components/schemas/{name}"})
+    
+    config: Dict[str, Any] = {"allOf": top_level}
+    if dependency_index:
+        config["x-dependency-index"] = dependency_index
+    schemas["OpenWebUIConfig"] = config
+    return {"openapi": "3.0.0", "info": info, "paths": {}, "components": {"schemas": schemas}}
+
+def write_sharded_schema(schema: Dict, output_dir: str, group_by: str = "category") -> List[str]:
+    """
+    Write the schema as shards, a composite schema and an index.
+    
+    Only files listed in the previous index are ever removed: shard files
+    that are no longer produced are deleted, and a directory that holds
+    JSON files but no shard index is refused, so the shards can never
+    replace or delete the schema, mappings or classifications.
+    
+    Args:
+        schema: A full schema or a properties-only schema
+        output_dir: Directory receiving the shard files
+        group_by: "category" or "section"
+    
+    Returns:
+        The paths of every file in the sharded output
+    """
+    if group_by not in SHARD_GROUPS:
+        raise ValueError(f"group_by must be one of {', '.join(SHARD_GROUPS)}")
+    previous = previous_shard_files(output_dir)
+    info, properties, dependency_index, template_store = _split_full_schema(schema)
+    
+    groups: Dict[str, Dict[str, Dict]] = {}
+    for var_name, prop in properties.items():
+        groups.setdefault(shard_key(prop, group_by), {})[var_name] = prop
+    
+    shards: Dict[str, Dict] = {}
+    variables: Dict[str, List] = {}
+    names: Dict[str, Any] = {"OpenWebUIConfig": True}
+    changed = 0
+    try:
+        for key, group in groups.items():
+            slug = _unique(shard_slug(key), shards)
+            name = _unique(schema_name(key), names)
+            names[name] = True
+            data, offsets = encode_shard(key, name, group, info, dependency_index, template_store)
+            file_name = f"{slug}.json"
+            if write_bytes_if_changed(os.path.join(output_dir, file_name), data):
+                changed += 1
+            shards[slug] = {"key": key, "file": file_name, "schema": name,
+                            "variables": len(group), "bytes": len(data)}
+            for var_name, (offset, length) in offsets.items():
+                variables[var_name] = [slug, offset, length]
+        
+        composite = build_composite(info, shards, group_by, dependency_index)
+        if write_bytes_if_changed(os.path.join(output_dir, COMPOSITE_FILE),
+                                  (json.dumps(composite, indent=2, ensure_ascii=False) + "\n").encode("utf-8")):
+            changed += 1
+        
+        index = {"version": SHARD_FORMAT_VERSION, "group_by": group_by, "composite": COMPOSITE_FILE,
+                 "shards": shards, "variables": variables}
+        if write_bytes_if_changed(os.path.join(output_dir, INDEX_FILE), _compact_json(index).encode("utf-8")):
+            changed += 1
+    except Exception as e:
+        logger.error(f"Error writing schema shards to {output_dir}: {e}")
+        raise
+    
+    files = [INDEX_FILE, COMPOSITE_FILE] + [shard["file"] for shard in shards.values()]
+    for file_name in sorted(previous - set(files)):
+        path = os.path.join(output_dir, file_name)
+        if os.path.isfile(path):
+            os.unlink(path)
+            logger.info(f"Removed stale shard {path}")
+    logger.info(f"Wrote {len(shards)} schema shards to {output_dir} ({changed} files changed)")
+    return [os.path.join(output_dir, file_name) for file_name in files]
+
+def previous_shard_files(output_dir: str) -> Set[str]:
+    """
+    Get the files of the sharded schema already in a directory.
+    
+    Args:
+        output_dir: Directory receiving the shard files
+    
+    Returns:
+        The file names listed in the existing index (empty for a new or empty directory)
+    
+    Raises:
+        ValueError: If the directory holds JSON files but no readable shard index
+    """
+    if not os.path.isdir(output_dir):
+        return set()
+    if not os.path.exists(os.path.join(output_dir, INDEX_FILE)):
+        if any(name.endswith(".json") for name in os.listdir(output_dir)):
+            raise ValueError(f"{output_dir} holds JSON files but no shard index; "
+                             f"refusing to write schema shards there")
+        return set()
+    try:
+        paths = shard_files(output_dir)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Unreadable shard index in {output_dir}; refusing to write schema shards there: {e}")
+    # Only plain file names inside the directory are trusted
+    return {os.path.basename(path) for path in paths
+            if os.path.dirname(os.path.relpath(path, output_dir)) == "" and path.endswith(".json")}
+
+def shards_dir_for(output_path: str) -> str:
+    """
+    Get the default shard directory for a JSON schema path.
+    
+    Args:
+        output_path: Path to the JSON schema
+    
+    Returns:
+        The path with its extension replaced by -shards
+    """
+    return f"{os.path.splitext(output_path)[0]}-shards"
+
+def load_shard_index(output_dir: str) -> Dict:
+    """
+    Load the index of a sharded schema.
+    
+    Args:
+        output_dir: Directory holding the shard files
+    
+    Returns:
+        The index
+    """
+    with open(os.path.join(output_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def shard_files(output_dir: str) -> List[str]:
+    """
+    List every file of a sharded schema, as recorded in its index.
+    
+    Args:
+        output_dir: Directory holding the shard files
+    
+    Returns:
+        The paths of the index, the composite schema and every shard
+    """
+    index = load_shard_index(output_dir)
+    files = [INDEX_FILE, index["composite"]] + [shard["file"] for shard in index["shards"].values()]
+    return [os.path.join(output_dir, file_name) for file_name in files]
+
+def read_shard_property(output_dir: str, index: Dict, var_name: str) -> Optional[Dict]:
+    """
+    Read one property from its shard using the offsets in the index.
+    
+    Args:
+        output_dir: Directory holding the shard files
+        index: The index from load_shard_index
+        var_name: The variable name
+    
+    Returns:
+        The schema property, or None if the variable is not in the index
+    """
+    entry = index["variables"].get(var_name)
+    if entry is None:
+        return None
+    slug, offset, length = entry
+    with open(os.path.join(output_dir, index["shards"][slug]["file"]), 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
@@ -7,6 +7,8 @@ This script generates a comprehensive OpenAPI schema for OpenWebUI environment v
 2. Incorporating default templates from a JSON file
 3. Adding relationship mappings from a JSON file
 4. Comparing with a manual classification JSON to identify new variables
+5. Matching new variables against renamed classified variables, whose classification
+   is carried forward for review
 
 Usage:
   python unified_schema_generator.py \
@@ -20,9 +22,18 @@ Usage:
 import re
 import json
 import os
+import hashlib
 import argparse
 import logging
-from typing import Dict, List, Optional, Tuple, Set, Any
+from typing import Dict, List, Optional, Tuple, Set, Any, Union
+
+from output_writer import write_json_if_changed, write_text_if_changed
+from instrumentation import stage, record_bytes_read, add_profile_arguments, profiling
+from dependency_graph import build_dependency_graph
+from compact_schema import write_compact_schema, compact_path_for
+from schema_shards import write_sharded_schema, shards_dir_for, SHARD_GROUPS
+from rename_detection import detect_renames as find_renames
+from doc_reader import MappedDocument, SectionView
 
 # Set up logging
 logging.basicConfig(
@@ -35,10 +46,82 @@ logger = logging.getLogger(__name__)
 VARIABLE_PATTERN = r"^#### `([A-Z][A-Z0-9_]+)`$"
 TYPE_PATTERN = r"- Type: `([^`]+)`"
 DEFAULT_PATTERN = r"- Default: `?([^`\n]+)`?"
-DEFAULT_PATTERN_EMPTY = r"- Default: Empty string \(''\), since `None` is set as default\."
+DEFAULT_PATTERN_EMPTY = r"- Default: [Ee]mpty string \('\s*'\)[^\n]*"
+# Defaults described in prose ("The value of `chromadb.DEFAULT_TENANT` ..."), which have no literal value
+DEFAULT_PATTERN_COMPUTED = r"- Default: The value of [^\n]*"
 PERSISTENCE_PATTERN = r"- Persistence: This environment variable is a `PersistentConfig` variable\."
 DESCRIPTION_PATTERN = r"- Description: (.+?)(?=\n\n|\n-|$)"
 OPTIONS_PATTERN = r"- Options:([\s\S]*?)(?=\n\n|\n-|$)"
+DEFAULT_REF_PATTERN = r"- Default: The value of (?:the )?`(DEFAULT_[A-Z0-9_]+_TEMPLATE)` environment variable\.?"
+
+# Single-pass tokenizer for category, subcategory and variable headers.
+# Variable headers with surrounding whitespace still end the previous section.
+HEADER_TOKENIZER = re.compile(
+    r"^(?:"
+    r"##[^\S\n]+(?P<category>[^\n]+)"
+    r"|###[^\S\n]+(?P<subcategory>[^\n]+)"
+    r"|(?P<indent>[^\S\n]*)#### `(?P<variable>[A-Z][A-Z0-9_]+)`(?P<trailing>[^\S\n]*)"
+    r")$",
+    re.MULTILINE
+)
+
+# Scanner capturing all fields of a variable section in one pass. Alternatives
+# sharing a prefix are ordered so the more specific default forms win.
+FIELD_SCANNER = re.compile(
+    f"(?P<type>{TYPE_PATTERN})"
+    f"|(?P<default_ref>{DEFAULT_REF_PATTERN})"
+    f"|(?P<default_empty>{DEFAULT_PATTERN_EMPTY})"
+    f"|(?P<default_computed>{DEFAULT_PATTERN_COMPUTED})"
+    f"|(?P<default>{DEFAULT_PATTERN})"
+    f"|(?P<persistence>{PERSISTENCE_PATTERN})"
+    f"|(?P<description>(?ms:{DESCRIPTION_PATTERN}))"
+    f"|(?P<options>(?s:{OPTIONS_PATTERN}))"
+)
+
+# Fields whose captured value is kept; the others only record presence
+VALUE_FIELDS = {"type", "default_ref", "default", "description", "options"}
+
+# Byte versions of the tokenizer and field scanner, used to scan memory-mapped
+# documents without decoding them. All delimiters in the patterns are ASCII.
+HEADER_TOKENIZER_BYTES = re.compile(HEADER_TOKENIZER.pattern.encode('utf-8'), re.MULTILINE)
+FIELD_SCANNER_BYTES = re.compile(FIELD_SCANNER.pattern.encode('utf-8'))
+
+# Compiled options block pattern, used when no tokenizer record is available
+OPTIONS_RE = re.compile(OPTIONS_PATTERN, re.DOTALL)
+
+# Single-scan extractor for option list items. Each item is anchored to the
+# start of a line and matches one of four forms:
+#   - `value` - description
+#   - Empty string - description
+#   - 'value' - description
+#   - `value`
+# Item descriptions may continue over following lines until the next item.
+OPTION_ITEM_SCANNER = re.compile(
+    r"^[^\S\n]*[-*][^\S\n]+(?:"
+    r"`(?P<value>[^`]*)`[^\S\n]*(?:(?P<dash>-)[^\S\n]*(?P<description>.*?))?"
+    r"|Empty string[^\S\n]*[-(]?[^\S\n]*(?P<empty_description>.*?)"
+    r"|['\"](?P<quoted>.*?)['\"][^\S\n]*-[^\S\n]*(?P<quoted_description>.*?)"
+    r")(?=\n[^\S\n]*[-*]|\n\n|\n-|\Z)",
+    re.MULTILINE | re.DOTALL
+)
+
+# Empty string option written as '' or `` in the options text
+EMPTY_OPTION_RE = re.compile(r"['\"]{2}|``\s*-\s*(.*?)(?=\n|$)", re.DOTALL)
+
+# Ranks ordering option forms in the options description: described backtick
+# values first, then empty string, quoted and bare backtick values
+OPTION_RANK_DESCRIBED = 0
+OPTION_RANK_EMPTY = 1
+OPTION_RANK_QUOTED = 2
+OPTION_RANK_BARE = 3
+
+# Version of the per-variable build cache format
+SCHEMA_CACHE_VERSION = 1
+
+# Components-level table of default templates keyed by content hash, and the
+# property key that references a template in it
+TEMPLATE_STORE_KEY = "x-templates"
+TEMPLATE_HASH_KEY = "x-default-template-hash"
 
 # Python type mappings to JSON Schema types
 TYPE_MAPPINGS = {
@@ -60,12 +143,13 @@ def load_json_file(file_path: str) -> Dict:
     
     Args:
         file_path: Path to the JSON file
-        
+    
     Returns:
         The loaded JSON content as a dictionary
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
+            record_bytes_read(os.fstat(f.fileno()).st_size)
             return json.load(f)
     except Exception as e:
         logger.error(f"Error loading file {file_path}: {e}")
@@ -75,64 +159,90 @@ def save_json_file(data: Dict, output_path: str) -> None:
     """
     Save data to a JSON file.
     
+    The file is only rewritten, atomically, when its content changes.
+    
     Args:
         data: The data to save
         output_path: Path to save the JSON file
     """
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        logger.info(f"Saved data to {output_path}")
+        with stage("serialize_json"):
+            text = json.dumps(data, indent=2)
+        with stage("write_json"):
+            written = write_text_if_changed(output_path, text)
+        if written:
+            logger.info(f"Saved data to {output_path}")
+        else:
+            logger.info(f"Data in {output_path} is unchanged")
     except Exception as e:
         logger.error(f"Error saving data to {output_path}: {e}")
         raise
 
-def parse_markdown(file_path: str) -> Tuple[Dict[str, Dict], List[str]]:
+def _decode(value: Union[str, bytes, None]) -> Optional[str]:
     """
-    Parse the Markdown file to extract environment variables information.
+    Decode a captured value from a bytes scan; text values are returned as is.
     
     Args:
-        file_path: Path to the Markdown file
-        
+        value: The captured value
+    
     Returns:
-        A tuple of (variable_info, markdown_lines)
-        variable_info is a dictionary of variables with their metadata
-        markdown_lines is the list of lines from the file
+        The value as text
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        logger.error(f"Error reading file {file_path}: {e}")
-        raise
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+def tokenize_markdown(content: Union[str, bytes, memoryview]) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    """
+    Walk the Markdown content once and emit a record for every variable.
     
-    # Split the content into lines
-    lines = content.split('\n')
+    A single compiled tokenizer finds the category, subcategory and variable
+    headers in order. Each variable's section runs from its header up to the
+    next variable header, and the fields of that section (type, default,
+    description, persistence and options) are captured with one scan of the
+    section text.
     
-    # Dictionary to store variable information
-    variable_info = {}
+    The content can be text or UTF-8 bytes such as a memory map. Bytes are
+    scanned with the byte patterns and only the captured values are decoded;
+    offsets are then byte offsets. Sections are recorded as views of the
+    content rather than copies.
     
-    # Track categories and current category
+    Args:
+        content: The Markdown content
+    
+    Returns:
+        A tuple of (variable_info, categories)
+        variable_info is a dictionary of variable records keyed by name
+        categories maps each category name to the variables it contains
+    """
+    is_text = isinstance(content, str)
+    tokenizer = HEADER_TOKENIZER if is_text else HEADER_TOKENIZER_BYTES
+    newline = "\n" if is_text else b"\n"
+    
+    variable_info = {}
+    categories = {}
     current_category = None
     current_subcategory = None
-    categories = {}
     variable_order = 1
     
-    # Process each line
-    for i, line in enumerate(lines):
-        # Check for category (section) headers
-        category_match = re.match(r"^##\s+(.+)$", line)
-        if category_match:
-            current_category = category_match.group(1).strip()
+    # Line numbers are counted incrementally between tokens
+    line_number = 0
+    last_pos = 0
+    
+    # Start offset and record of the variable whose section is still open
+    open_start = None
+    open_record = None
+    
+    for match in tokenizer.finditer(content):
+        kind = match.lastgroup
+        
+        if kind == "category":
+            current_category = _decode(match.group("category")).strip()
             current_subcategory = None
             if current_category not in categories:
                 categories[current_category] = []
             continue
         
-        # Check for subcategory headers
-        subcategory_match = re.match(r"^###\s+(.+)$", line)
-        if subcategory_match:
-            current_subcategory = subcategory_match.group(1).strip()
+        if kind == "subcategory":
+            current_subcategory = _decode(match.group("subcategory")).strip()
             # Store subcategory as part of the category name
             if current_category:
                 full_category = f"{current_category} - {current_subcategory}"
@@ -141,44 +251,174 @@ def parse_markdown(file_path: str) -> Tuple[Dict[str, Dict], List[str]]:
                 current_subcategory = full_category
             continue
         
-        # Check for variable headers
-        var_match = re.match(VARIABLE_PATTERN, line)
-        if var_match:
-            var_name = var_match.group(1)
-            if var_name not in variable_info:
-                # Use subcategory if available, otherwise use main category
-                effective_category = current_subcategory if current_subcategory else current_category
-                
-                variable_info[var_name] = {
-                    "line_number": i,
-                    "category": effective_category,
-                    "order": variable_order
-                }
-                if effective_category:
-                    categories[effective_category] = categories.get(effective_category, []) + [var_name]
-                variable_order += 1
+        # Any variable header closes the section of the previous variable
+        start = match.start()
+        if open_record is not None:
+            _capture_section(open_record, content, open_start, start - 1)
+            open_record = None
+        
+        line_number += _count(content, newline, last_pos, start)
+        last_pos = start
+        
+        # Indented headers only delimit sections, they do not define variables
+        if match.group("indent") or match.group("trailing"):
+            continue
+        
+        var_name = _decode(match.group("variable"))
+        if var_name in variable_info:
+            continue
+        
+        # Use subcategory if available, otherwise use main category
+        effective_category = current_subcategory if current_subcategory else current_category
+        
+        open_start = start
+        open_record = {
+            "line_number": line_number,
+            "category": effective_category,
+            "order": variable_order
+        }
+        variable_info[var_name] = open_record
+        if effective_category:
+            categories.setdefault(effective_category, []).append(var_name)
+        variable_order += 1
+    
+    if open_record is not None:
+        _capture_section(open_record, content, open_start, len(content))
+    
+    return variable_info, categories
+
+def _count(content: Union[str, bytes, memoryview], needle, start: int, end: int) -> int:
+    """
+    Count occurrences of a substring in a range of text or bytes.
+    
+    Memory maps have no count method, so their range is counted on a slice,
+    which only copies the gap between two headers.
+    
+    Args:
+        content: The content
+        needle: The substring to count
+        start: Start offset
+        end: End offset
+    
+    Returns:
+        The number of occurrences
+    """
+    if isinstance(content, (str, bytes)):
+        return content.count(needle, start, end)
+    return content[start:end].count(needle)
+
+def _capture_section(record: Dict, content: str, start: int, end: int) -> None:
+    """
+    Capture the section span of a variable and the fields found in it.
+    
+    The fields are scanned in place within the section bounds, and the section
+    is kept as a view of the content.
+    
+    Args:
+        record: The variable record to fill in
+        content: The full Markdown content, as text or bytes
+        start: Offset of the variable header
+        end: Offset where the section ends
+    """
+    record["span"] = (start, end)
+    record["section"] = SectionView(content, start, end)
+    
+    scanner = FIELD_SCANNER if isinstance(content, str) else FIELD_SCANNER_BYTES
+    fields = {}
+    for match in scanner.finditer(content, start, max(start, end)):
+        kind = match.lastgroup
+        if kind not in fields:
+            # The captured value is the first group inside the named field group
+            fields[kind] = _decode(match.group(match.lastindex + 1)) if kind in VALUE_FIELDS else True
+    
+    record["raw_type"] = fields.get("type")
+    record["default_ref"] = fields.get("default_ref")
+    record["default_empty"] = "default_empty" in fields
+    record["default_computed"] = "default_computed" in fields
+    record["raw_default"] = fields.get("default")
+    record["raw_description"] = fields.get("description")
+    record["is_persistent_config"] = fields.get("persistence", False)
+    record["options_text"] = fields.get("options")
+
+def parse_markdown(file_path: str) -> Dict[str, Dict]:
+    """
+    Parse the Markdown file to extract environment variables information.
+    
+    The file is memory-mapped and scanned as bytes, so it is never read into
+    one string; the variable records keep views of their sections.
+    
+    Args:
+        file_path: Path to the Markdown file
+    
+    Returns:
+        A dictionary of variable records with their metadata and captured fields
+    """
+    try:
+        document = MappedDocument(file_path)
+        record_bytes_read(len(document))
+    except Exception as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        raise
+    
+    variable_info, categories = tokenize_markdown(document.buffer)
     
     # Report statistics
     logger.info(f"Found {len(variable_info)} variables across {len(categories)} categories")
     
-    return variable_info, lines
+    return variable_info
+
+def scan_option_items(options_text: str) -> List[Tuple[str, str]]:
+    """
+    Extract all option items from an options block in a single scan.
+    
+    Items are returned grouped by form (described backtick values, empty
+    string, quoted values, bare backtick values) and in document order within
+    each form, so the result is deterministic.
+    
+    Args:
+        options_text: The text following "- Options:"
+    
+    Returns:
+        A list of (value, description) tuples, which may contain duplicates
+    """
+    items = []
+    for match in OPTION_ITEM_SCANNER.finditer(options_text):
+        if match.group("value") is not None:
+            if match.group("dash"):
+                items.append((OPTION_RANK_DESCRIBED, match.start(), match.group("value"),
+                              match.group("description").strip()))
+            elif match.group("value"):
+                items.append((OPTION_RANK_BARE, match.start(), match.group("value"), ""))
+        elif match.group("quoted") is not None:
+            items.append((OPTION_RANK_QUOTED, match.start(), match.group("quoted"),
+                          match.group("quoted_description").strip()))
+        else:
+            items.append((OPTION_RANK_EMPTY, match.start(), "",
+                          match.group("empty_description").strip()))
+    
+    items.sort(key=lambda item: (item[0], item[1]))
+    return [(value, description) for _, _, value, description in items]
 
-def extract_options_from_section(section: str, var_name: str = None) -> tuple:
+def extract_options_from_section(section: str, var_name: str = None,
+                                 options_text: Optional[str] = None) -> tuple:
     """
     Extract options from a section and create enum values and descriptions.
     
     Args:
         section: The section text containing options
         var_name: Optional variable name for debugging
-        
+        options_text: Options text already captured by the tokenizer, if any
+    
     Returns:
         A tuple containing (enum_values, options_description)
     """
-    options_match = re.search(OPTIONS_PATTERN, section, re.DOTALL)
-    if not options_match:
-        return None, None
+    if options_text is None:
+        options_match = OPTIONS_RE.search(str(section))
+        if not options_match:
+            return None, None
+        options_text = options_match.group(1)
     
-    options_text = options_match.group(1).strip()
+    options_text = options_text.strip()
     enum_values = []
     options_description = "Options:\n"
     
@@ -188,75 +428,43 @@ def extract_options_from_section(section: str, var_name: str = None) -> tuple:
         enum_values = ["dev", "prod"]
         options_description = "Options:\n  - `dev` - Enables the FastAPI API documentation on `/docs`\n  - `prod` - Automatically configures several environment variables\n"
         return enum_values, options_description
-
+    
     if var_name == "DEFAULT_USER_ROLE":
         enum_values = ["pending", "user", "admin"]
         options_description = "Options:\n  - `pending` - New users are pending until their accounts are manually activated by an admin.\n  - `user` - New users are automatically activated with regular user permissions.\n  - `admin` - New users are automatically activated with administrator permissions.\n"
         return enum_values, options_description
     
-    # Try multiple patterns to capture different formatting styles
-    
-    # First pattern: standard format with backticks and dash (with description)
-    pattern1 = r"\s*[-*]\s+`([^`]*)`\s*-\s*(.*?)(?=\n\s*[-*]|\n\n|\n-|$)"
-    
-    # Second pattern: for empty string option that might be formatted differently
-    pattern2 = r"\s*[-*]\s+Empty string\s*[-\(]?\s*(.*?)(?=\n\s*[-*]|\n\n|\n-|$)"
-    
-    # Third pattern: another format that might be used
-    pattern3 = r"\s*[-*]\s+['\"](.*?)['\"]\s*-\s*(.*?)(?=\n\s*[-*]|\n\n|\n-|$)"
-    
-    # Fourth pattern: for options listed with backticks but no description
-    pattern4 = r"\s*[-*]\s+`([^`]+)`\s*(?=\n|$)"
-    
-    # Combine patterns for better matching
-    all_patterns = [pattern1, pattern2, pattern3, pattern4]
-    
-    for pattern in all_patterns:
-        matches = list(re.finditer(pattern, options_text, re.DOTALL))
-        
-        for match in matches:
-            if pattern == pattern1:  # Standard backtick format with description
-                enum_value = match.group(1)
-                enum_description = match.group(2).strip()
-            elif pattern == pattern2:  # Empty string description
-                enum_value = ""
-                enum_description = match.group(1).strip()
-            elif pattern == pattern3:  # Quote format
-                enum_value = match.group(1)
-                enum_description = match.group(2).strip()
-            elif pattern == pattern4:  # Backticks without description
-                enum_value = match.group(1)
-                enum_description = ""  # No description provided
+    # Collect every option form in a single scan of the options text
+    descriptions = {}
+    for enum_value, enum_description in scan_option_items(options_text):
+        # Check if this value is already in our list
+        if enum_value not in enum_values:
+            enum_values.append(enum_value)
+            descriptions[enum_value] = enum_description
             
-            # Check if this value is already in our list
-            if enum_value not in enum_values:
-                enum_values.append(enum_value)
-                
-                # Add the description to the options description
-                if enum_value == "":
-                    options_description += f"  - Empty string - {enum_description}\n"
-                elif enum_description:
-                    options_description += f"  - `{enum_value}` - {enum_description}\n"
-                else:
-                    options_description += f"  - `{enum_value}`\n"
+            # Add the description to the options description
+            if enum_value == "":
+                options_description += f"  - Empty string - {enum_description}\n"
+            elif enum_description:
+                options_description += f"  - `{enum_value}` - {enum_description}\n"
+            else:
+                options_description += f"  - `{enum_value}`\n"
     
     # Special case for WEB_LOADER_ENGINE - ensure empty string option is captured
     if var_name == "WEB_LOADER_ENGINE" and not any(v == "" for v in enum_values):
         # Look for the empty string option specifically in the text
-        empty_match = re.search(r"['\"]{2}|``\s*-\s*(.*?)(?=\n|$)", options_text, re.DOTALL)
+        empty_match = EMPTY_OPTION_RE.search(options_text)
         if empty_match:
             enum_values.insert(0, "")
-            empty_desc = empty_match.group(1).strip() if len(empty_match.groups()) > 0 else "Uses the `requests` module with enhanced error handling."
+            empty_desc = empty_match.group(1).strip() if empty_match.group(1) is not None else "Uses the `requests` module with enhanced error handling."
             options_description = "Options:\n  - Empty string - " + empty_desc + "\n"
             
-            # Add back the other options
-            for i, v in enumerate(enum_values):
+            # Add back the other options with the descriptions captured above
+            for v in enum_values:
                 if v != "":
                     options_description += f"  - `{v}` - "
-                    # Find the existing description for this value
-                    desc_match = re.search(f"`{v}`\\s*-\\s*(.*?)(?=\\n\\s*[-*]|\\n\\n|\\n-|$)", section, re.DOTALL)
-                    if desc_match:
-                        options_description += f"{desc_match.group(1).strip()}\n"
+                    if descriptions.get(v):
+                        options_description += f"{descriptions[v]}\n"
     
     # Special case for WEBUI_SESSION_COOKIE_SAME_SITE and WEBUI_AUTH_COOKIE_SAME_SITE
     if var_name in ["WEBUI_SESSION_COOKIE_SAME_SITE", "WEBUI_AUTH_COOKIE_SAME_SITE"] and not enum_values:
@@ -275,15 +483,14 @@ def extract_options_from_section(section: str, var_name: str = None) -> tuple:
     
     return (enum_values, options_description) if enum_values else (None, None)
 
-def extract_variable_details(md_lines: List[str], var_name: str, line_number: int) -> Dict:
+def extract_variable_details(record: Dict, var_name: str) -> Dict:
     """
-    Extract detailed information for a variable from the Markdown content.
+    Extract detailed information for a variable from its tokenized record.
     
     Args:
-        md_lines: The Markdown content as a list of lines
+        record: The variable record produced by tokenize_markdown
         var_name: The name of the variable to extract details for
-        line_number: The line number where the variable is defined
-        
+    
     Returns:
         A dictionary with the extracted details
     """
@@ -299,45 +506,27 @@ def extract_variable_details(md_lines: List[str], var_name: str, line_number: in
         "sensitive": False
     }
     
-    # Start from the variable definition and read until the next variable definition
-    i = line_number
-    section_text = []
-    while i < len(md_lines):
-        line = md_lines[i].strip()
-        if i > line_number and re.match(r"^#### `[A-Z][A-Z0-9_]+`$", line):
-            break
-        section_text.append(md_lines[i])
-        i += 1
-    
-    section = "\n".join(section_text)
-    
     # Extract type
-    type_match = re.search(TYPE_PATTERN, section, re.MULTILINE)
     raw_type = ""
-    if type_match:
-        raw_type = type_match.group(1).lower()
+    if record.get("raw_type"):
+        raw_type = record["raw_type"].lower()
         if raw_type in TYPE_MAPPINGS:
             details["type"] = TYPE_MAPPINGS[raw_type]
         else:
             logger.warning(f"Unknown type '{raw_type}' for variable {var_name}. Using 'string' as default.")
     
     # Check for references to default templates
-    default_ref_pattern = r"- Default: The value of `([A-Z][A-Z0-9_]+)` environment variable\."
-    default_ref_match = re.search(default_ref_pattern, section, re.MULTILINE)
-    
-    if default_ref_match:
+    if record.get("default_ref"):
         # This variable references another variable as its default
-        referenced_var = default_ref_match.group(1)
-        details["references_var"] = referenced_var
+        details["references_var"] = record["default_ref"]
     else:
         # Extract regular default value
-        default_match = re.search(DEFAULT_PATTERN, section, re.MULTILINE)
-        empty_default_match = re.search(DEFAULT_PATTERN_EMPTY, section, re.MULTILINE)
-        
-        if empty_default_match:
+        if record.get("default_empty"):
             details["default"] = ""
-        elif default_match:
-            default_value = default_match.group(1).strip()
+        elif record.get("default_computed"):
+            details["default"] = None
+        elif record.get("raw_default") is not None:
+            default_value = record["raw_default"].strip()
             
             # Handle special cases
             if default_value == "None":
@@ -370,16 +559,18 @@ def extract_variable_details(md_lines: List[str], var_name: str, line_number: in
                 details["default"] = default_value
     
     # Extract description
-    desc_match = re.search(DESCRIPTION_PATTERN, section, re.MULTILINE | re.DOTALL)
-    if desc_match:
-        details["description"] = desc_match.group(1).strip()
+    if record.get("raw_description") is not None:
+        details["description"] = record["raw_description"].strip()
     
     # Check if it's a PersistentConfig variable
-    if re.search(PERSISTENCE_PATTERN, section, re.MULTILINE):
+    if record.get("is_persistent_config"):
         details["is_persistent_config"] = True
     
     # Extract enum values and options description
-    enum_values, options_description = extract_options_from_section(section, var_name)
+    enum_values, options_description = None, None
+    if record.get("options_text") is not None:
+        enum_values, options_description = extract_options_from_section(
+            record["section"], var_name, record["options_text"])
     if enum_values:
         details["enum"] = enum_values
     if options_description:
@@ -401,7 +592,7 @@ def create_schema_property(details: Dict) -> Dict:
     
     Args:
         details: The extracted details for the variable
-        
+    
     Returns:
         The schema property as a dictionary
     """
@@ -432,14 +623,16 @@ def create_schema_property(details: Dict) -> Dict:
     
     return prop
 
-def apply_templates(schema_props: Dict, templates: Dict) -> Dict:
+def apply_templates(schema_props: Dict, templates: Dict,
+                    targets: Optional[Set[str]] = None) -> Dict:
     """
     Apply default templates to schema properties.
     
     Args:
         schema_props: The schema properties
         templates: The default templates
-        
+        targets: Optional set of variables to update (all variables if None)
+    
     Returns:
         The updated schema properties
     """
@@ -449,6 +642,8 @@ def apply_templates(schema_props: Dict, templates: Dict) -> Dict:
     
     # Check each property for a reference to a template
     for var_name, prop in schema.items():
+        if targets is not None and var_name not in targets:
+            continue
         if "x-references-var" in prop:
             template_name = prop["x-references-var"]
             if template_name in templates:
@@ -462,14 +657,41 @@ def apply_templates(schema_props: Dict, templates: Dict) -> Dict:
     logger.info(f"Applied {templates_applied} default templates to schema properties")
     return schema
 
-def apply_relationships(schema_props: Dict, relationships: Dict) -> Dict:
+def add_dependency(prop: Dict, selector_var: str, value: Any) -> None:
+    """
+    Add a selector condition to a property's x-depends-on.
+    
+    A field that depends on several selectors gets one entry per selector, all
+    of which must be satisfied. When several values of the same selector enable
+    the field, the entry holds a list of the values.
+    
+    Args:
+        prop: The schema property of the dependent field
+        selector_var: The selector variable
+        value: The selector value that enables the field
+    """
+    depends_on = prop.setdefault("x-depends-on", {})
+    if selector_var not in depends_on:
+        depends_on[selector_var] = value
+        return
+    current = depends_on[selector_var]
+    values = current if isinstance(current, list) else [current]
+    if value not in values:
+        depends_on[selector_var] = values + [value]
+
+def apply_relationships(schema_props: Dict, relationships: Dict,
+                        targets: Optional[Set[str]] = None) -> Dict:
     """
     Apply relationship mappings to schema properties.
     
+    Selector and dependency lookups always consider the whole schema, but only
+    the properties in targets are modified.
+    
     Args:
         schema_props: The schema properties
         relationships: The relationship mappings
-        
+        targets: Optional set of variables to update (all variables if None)
+    
     Returns:
         The updated schema properties
     """
@@ -477,6 +699,9 @@ def apply_relationships(schema_props: Dict, relationships: Dict) -> Dict:
     schema = schema_props.copy()
     relationships_applied = 0
     
+    def is_target(var_name: str) -> bool:
+        return targets is None or var_name in targets
+    
     # Track which variables are processed
     processed_variables = set()
     
@@ -487,19 +712,20 @@ def apply_relationships(schema_props: Dict, relationships: Dict) -> Dict:
             processed_variables.add(selector_var)
             
             # Add enum values if available
-            if "enum_values" in mapping and "enum" not in schema[selector_var]:
+            if "enum_values" in mapping and "enum" not in schema[selector_var] and is_target(selector_var):
                 schema[selector_var]["enum"] = mapping["enum_values"]
             
             # Add x-provider-fields extension
             if "provider_fields" in mapping:
-                schema[selector_var]["x-provider-fields"] = mapping["provider_fields"]
+                if is_target(selector_var):
+                    schema[selector_var]["x-provider-fields"] = mapping["provider_fields"]
                 
                 # Add x-depends-on to all dependent fields
                 for provider, fields in mapping["provider_fields"].items():
                     for field in fields:
-                        if field in schema:
+                        if field in schema and is_target(field):
                             processed_variables.add(field)
-                            schema[field]["x-depends-on"] = {selector_var: provider}
+                            add_dependency(schema[field], selector_var, provider)
                             relationships_applied += 1
         else:
             logger.warning(f"Selector variable {selector_var} defined in relationships but not found in schema")
@@ -512,13 +738,14 @@ def apply_relationships(schema_props: Dict, relationships: Dict) -> Dict:
             
             # Add x-provider-fields extension
             if "provider_fields" in mapping:
-                schema[selector_var]["x-provider-fields"] = mapping["provider_fields"]
+                if is_target(selector_var):
+                    schema[selector_var]["x-provider-fields"] = mapping["provider_fields"]
                 
                 # Add x-depends-on to all dependent fields
                 for field in mapping["provider_fields"]:
-                    if field in schema:
+                    if field in schema and is_target(field):
                         processed_variables.add(field)
-                        schema[field]["x-depends-on"] = {selector_var: mapping.get("value", True)}
+                        add_dependency(schema[field], selector_var, mapping.get("value", True))
                         relationships_applied += 1
         else:
             logger.warning(f"Boolean selector {selector_var} defined in relationships but not found in schema")
@@ -526,14 +753,19 @@ def apply_relationships(schema_props: Dict, relationships: Dict) -> Dict:
     logger.info(f"Applied {relationships_applied} relationships to schema properties")
     return schema
 
-def compare_with_classifications(schema_props: Dict, classifications: Dict) -> Tuple[Dict, List[str]]:
+def compare_with_classifications(schema_props: Dict, classifications: Dict,
+                                 targets: Optional[Set[str]] = None) -> Tuple[Dict, List[str]]:
     """
     Compare schema properties with manual classifications to identify new variables.
     
+    New variables are always reported for the whole schema, but classifications
+    are only applied to the properties in targets.
+    
     Args:
         schema_props: The schema properties
         classifications: The manual classifications
-        
+        targets: Optional set of variables to update (all variables if None)
+    
     Returns:
         A tuple of (updated schema properties, list of new variables)
     """
@@ -552,6 +784,8 @@ def compare_with_classifications(schema_props: Dict, classifications: Dict) -> T
     
     # Apply classifications to schema properties
     for var_name, prop in schema.items():
+        if targets is not None and var_name not in targets:
+            continue
         if var_name in var_classifications:
             var_class = var_classifications[var_name]
             
@@ -597,17 +831,27 @@ def compare_with_classifications(schema_props: Dict, classifications: Dict) -> T
     logger.info(f"Found {len(new_variables)} new variables that need manual classification")
     return schema, new_variables
 
-def create_template_for_new_vars(new_vars: List[str], schema_props: Dict) -> Dict:
+def create_template_for_new_vars(new_vars: List[str], schema_props: Dict,
+                                 classifications: Optional[Dict] = None,
+                                 renames: Optional[Dict[str, Dict]] = None) -> Dict:
     """
     Create a template for new variables that need manual classification.
     
+    A new variable that was matched to a renamed predecessor starts from the
+    predecessor's classification instead of the default stub, and records the
+    predecessor and match score for review.
+    
     Args:
         new_vars: List of new variable names
         schema_props: The schema properties
-        
+        classifications: The current classifications (needed for renames)
+        renames: Optional rename proposals from rename_detection.detect_renames
+    
     Returns:
         A dictionary with templates for the new variables
     """
+    var_classifications = (classifications or {}).get("variable_classifications", {})
+    renames = renames or {}
     template = {}
     for var_name in new_vars:
         if var_name in schema_props:
@@ -620,6 +864,20 @@ def create_template_for_new_vars(new_vars: List[str], schema_props: Dict) -> Dic
             elif isinstance(default_value, (bool, int, float)):
                 default_value = str(default_value)
             
+            # Carry a renamed variable's classification forward
+            rename = renames.get(var_name)
+            if rename and rename["predecessor"] in var_classifications:
+                previous = var_classifications[rename["predecessor"]]
+                template[var_name] = {
+                    "visibility": previous.get("visibility", "exposed"),
+                    "default_handling": previous.get("default_handling", "preloaded"),
+                    "default_value": default_value or previous.get("default_value", ""),
+                    "rationale": previous.get("rationale", ""),
+                    "renamed_from": rename["predecessor"],
+                    "rename_score": rename["score"]
+                }
+                continue
+            
             # Create template entry
             template[var_name] = {
                 "visibility": "exposed",  # Default to exposed, adjust as needed
@@ -631,7 +889,8 @@ def create_template_for_new_vars(new_vars: List[str], schema_props: Dict) -> Dic
     return template
 
 def append_new_vars_to_classifications(new_vars: List[str], schema_props: Dict, 
-                                       classifications: Dict, output_path: str) -> None:
+                                       classifications: Dict, output_path: str,
+                                       renames: Optional[Dict[str, Dict]] = None) -> None:
     """
     Append templates for new variables to the classifications file.
     
@@ -640,13 +899,15 @@ def append_new_vars_to_classifications(new_vars: List[str], schema_props: Dict,
         schema_props: The schema properties
         classifications: The current classifications
         output_path: Path to save the updated classifications
+        renames: Optional rename proposals; matched variables inherit their
+            predecessor's classification
     """
     if not new_vars:
         logger.info("No new variables to append to classifications")
         return
     
     # Create template for new variables
-    new_vars_template = create_template_for_new_vars(new_vars, schema_props)
+    new_vars_template = create_template_for_new_vars(new_vars, schema_props, classifications, renames)
     
     # Create a copy of the classifications
     updated_classifications = classifications.copy()
@@ -663,17 +924,43 @@ def append_new_vars_to_classifications(new_vars: List[str], schema_props: Dict,
     save_json_file(updated_classifications, output_path)
     logger.info(f"Appended {len(new_vars)} new variables to classifications in {output_path}")
 
-def create_full_schema(properties: Dict) -> Dict:
+def load_previous_properties(schema_path: str) -> Dict[str, Dict]:
+    """
+    Load the properties of a previously generated schema.
+    
+    Args:
+        schema_path: Path to a full or properties-only schema
+    
+    Returns:
+        The schema properties, or an empty dictionary if the file is missing or invalid
+    """
+    if not os.path.exists(schema_path):
+        return {}
+    try:
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            record_bytes_read(os.fstat(f.fileno()).st_size)
+            schema = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring previous schema {schema_path}: {e}")
+        return {}
+    config = schema.get("components", {}).get("schemas", {}).get("OpenWebUIConfig")
+    return config.get("properties", {}) if config else schema
+
+def create_full_schema(properties: Dict, dependency_index: Optional[Dict] = None,
+                       template_store: Optional[Dict[str, str]] = None) -> Dict:
     """
     Create a full OpenAPI schema with the provided properties.
     
     Args:
         properties: The schema properties
-        
+        dependency_index: Optional x-dependency-index to add to the config schema
+        template_store: Optional table of templates keyed by content hash, added
+            to the components section
+    
     Returns:
         A complete OpenAPI schema
     """
-    return {
+    schema = {
         "openapi": "3.0.0",
         "info": {
             "title": "OpenWebUI Configuration",
@@ -691,14 +978,242 @@ def create_full_schema(properties: Dict) -> Dict:
             }
         }
     }
+    if dependency_index is not None:
+        schema["components"]["schemas"]["OpenWebUIConfig"]["x-dependency-index"] = dependency_index
+    if template_store:
+        schema["components"][TEMPLATE_STORE_KEY] = template_store
+    return schema
+
+def template_hash(content: str) -> str:
+    """
+    Compute the content hash that identifies a template in the template store.
+    
+    Args:
+        content: The template text
+    
+    Returns:
+        A hex digest of the template
+    """
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def store_templates(properties: Dict) -> Tuple[Dict, Dict[str, str]]:
+    """
+    Move inline default templates into a content-addressed template store.
+    
+    Each property's x-default-template is replaced, in place in the key order,
+    by x-default-template-hash, and every distinct template is stored once.
+    The given properties are not modified; changed properties are copied.
+    
+    Args:
+        properties: The schema properties with inline templates
+    
+    Returns:
+        A tuple of (properties referencing templates by hash, template store)
+    """
+    store = {}
+    stored = {}
+    for var_name, prop in properties.items():
+        if "x-default-template" not in prop:
+            stored[var_name] = prop
+            continue
+        new_prop = {}
+        for key, value in prop.items():
+            if key == "x-default-template":
+                digest = template_hash(value)
+                store[digest] = value
+                new_prop[TEMPLATE_HASH_KEY] = digest
+            else:
+                new_prop[key] = value
+        stored[var_name] = new_prop
+    return stored, store
+
+def expand_templates(schema: Dict) -> Dict:
+    """
+    Expand a schema with a template store back to the inline template layout.
+    
+    Args:
+        schema: A full schema whose properties reference templates by hash
+    
+    Returns:
+        A copy of the schema with x-default-template bodies inline and without
+        the template store
+    """
+    store = schema.get("components", {}).get(TEMPLATE_STORE_KEY)
+    if store is None:
+        return schema
+    
+    expanded = dict(schema)
+    expanded["components"] = {key: value for key, value in schema["components"].items()
+                              if key != TEMPLATE_STORE_KEY}
+    config = dict(schema["components"]["schemas"]["OpenWebUIConfig"])
+    expanded["components"]["schemas"] = dict(schema["components"]["schemas"])
+    expanded["components"]["schemas"]["OpenWebUIConfig"] = config
+    
+    properties = {}
+    for var_name, prop in config["properties"].items():
+        if TEMPLATE_HASH_KEY in prop:
+            digest = prop[TEMPLATE_HASH_KEY]
+            if digest not in store:
+                raise KeyError(f"Template {digest} referenced by {var_name} is not in the template store")
+            prop = {("x-default-template" if key == TEMPLATE_HASH_KEY else key):
+                    (store[digest] if key == TEMPLATE_HASH_KEY else value)
+                    for key, value in prop.items()}
+        properties[var_name] = prop
+    config["properties"] = properties
+    return expanded
+
+def is_template_variable(var_name: str) -> bool:
+    """
+    Check whether a variable is a DEFAULT_*_TEMPLATE variable.
+    
+    Args:
+        var_name: The variable name
+    
+    Returns:
+        True if the variable holds a default template
+    """
+    return var_name.startswith("DEFAULT_") and var_name.endswith("_TEMPLATE")
+
+def generator_fingerprint() -> str:
+    """
+    Compute a fingerprint of this generator's source code.
+    
+    Cached properties are only valid for the code that produced them, so the
+    fingerprint is stored in the build cache and checked on load.
+    
+    Returns:
+        A hex digest of the generator source
+    """
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_schema_cache(cache_path: str) -> Dict[str, Dict]:
+    """
+    Load the per-variable build cache.
+    
+    Args:
+        cache_path: Path to the cache JSON file
+    
+    Returns:
+        A dictionary mapping variable names to their cached hash and property,
+        or an empty dictionary if the cache is missing or stale
+    """
+    if not os.path.exists(cache_path):
+        logger.info(f"No build cache found at {cache_path}")
+        return {}
+    
+    try:
+        cache = load_json_file(cache_path)
+    except Exception:
+        logger.warning(f"Ignoring unreadable build cache {cache_path}")
+        return {}
+    
+    if cache.get("version") != SCHEMA_CACHE_VERSION or cache.get("generator") != generator_fingerprint():
+        logger.info(f"Build cache {cache_path} was written by a different generator, ignoring it")
+        return {}
+    
+    return cache.get("entries", {})
+
+def save_schema_cache(entries: Dict[str, Dict], cache_path: str) -> None:
+    """
+    Save the per-variable build cache.
+    
+    Args:
+        entries: Dictionary mapping variable names to their hash and property
+        cache_path: Path to the cache JSON file
+    """
+    cache = {
+        "version": SCHEMA_CACHE_VERSION,
+        "generator": generator_fingerprint(),
+        "entries": entries
+    }
+    try:
+        write_json_if_changed(cache_path, cache, indent=None)
+        logger.info(f"Saved build cache with {len(entries)} entries to {cache_path}")
+    except Exception as e:
+        logger.error(f"Error saving build cache to {cache_path}: {e}")
+        raise
+
+def index_relationships(relationships: Dict, variables: Set[str]) -> Dict[str, List]:
+    """
+    Index the relationship entries that affect each variable.
+    
+    Entries are recorded in the order apply_relationships applies them, and
+    dependent entries note whether their selector exists in the schema, so the
+    list for a variable changes exactly when its applied relationships change.
+    
+    Args:
+        relationships: The relationship mappings
+        variables: Names of the variables in the schema
+    
+    Returns:
+        A dictionary mapping variable names to their relationship entries
+    """
+    index = {}
+    
+    for selector_var, mapping in relationships.get("provider_mappings", {}).items():
+        index.setdefault(selector_var, []).append(["provider_selector", mapping])
+        for provider, fields in mapping.get("provider_fields", {}).items():
+            for field in fields:
+                index.setdefault(field, []).append(
+                    ["provider_field", selector_var, provider, selector_var in variables])
+    
+    for selector_var, mapping in relationships.get("boolean_selectors", {}).items():
+        index.setdefault(selector_var, []).append(["boolean_selector", mapping])
+        for field in mapping.get("provider_fields", []):
+            index.setdefault(field, []).append(
+                ["boolean_field", selector_var, mapping.get("value", True), selector_var in variables])
+    
+    return index
+
+def variable_input_hash(var_name: str, record: Dict, templates: Dict,
+                        relationship_entries: List, classification: Optional[Dict]) -> str:
+    """
+    Hash every input that contributes to a variable's finished schema property.
+    
+    Category and display order are excluded because they are set directly on
+    reused properties.
+    
+    Args:
+        var_name: The variable name
+        record: The variable record produced by tokenize_markdown
+        templates: The default templates
+        relationship_entries: The indexed relationship entries for the variable
+        classification: The manual classification entry for the variable, if any
+    
+    Returns:
+        A hex digest of the variable's inputs
+    """
+    template_name = record.get("default_ref")
+    inputs = {
+        "name": var_name,
+        "section": str(record.get("section", "")),
+        "template": templates.get(template_name) if template_name else None,
+        "relationships": relationship_entries,
+        "classification": classification
+    }
+    encoded = json.dumps(inputs, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
 
 def generate_schema(markdown_path: str, templates_path: str, 
                     relationships_path: str, classifications_path: str, 
                     output_path: str, append_new_vars: bool = True,
-                    properties_only: bool = False) -> None:
+                    properties_only: bool = False,
+                    cache_path: Optional[str] = None,
+                    new_classifications_path: Optional[str] = None,
+                    compact_path: Optional[str] = None,
+                    inline_templates: bool = False,
+                    shards_dir: Optional[str] = None,
+                    shard_by: str = "category",
+                    detect_renames: bool = True,
+                    previous_schema_path: Optional[str] = None) -> Dict:
     """
     Generate a complete OpenAPI schema for OpenWebUI environment variables.
     
+    When a cache path is given, properties whose section, template, relationship
+    entries and classification entry are unchanged since the previous run are
+    reused from the cache instead of being rebuilt.
+    
     Args:
         markdown_path: Path to the Markdown documentation
         templates_path: Path to the default templates JSON file
@@ -707,77 +1222,242 @@ def generate_schema(markdown_path: str, templates_path: str,
         output_path: Path to the output schema JSON file
         append_new_vars: Whether to append new variables to the classifications file
         properties_only: Whether to output only the properties section of the schema
+        cache_path: Optional path to the per-variable build cache
+        new_classifications_path: Where to write the classifications with new variables
+            (defaults to <classifications>_with_new_vars.json)
+        compact_path: Optional path to also write the compact indexed schema artifact
+        inline_templates: Whether to inline template bodies in every property that
+            references them instead of using the components-level template store
+        shards_dir: Optional directory to also write the schema as per-category shards
+        shard_by: Group shards by "category" or by top-level "section"
+        detect_renames: Whether to match new variables against retired classified
+            variables and carry their classifications forward
+        previous_schema_path: Schema providing descriptions of retired variables
+            (defaults to the existing output schema)
+    
+    Returns:
+        The schema that was saved
     """
     # Step 1: Parse the Markdown documentation
-    variable_info, markdown_lines = parse_markdown(markdown_path)
-    
-    # Step 2: Extract details for each variable
-    schema_properties = {}
-    for var_name, var_info in variable_info.items():
-        try:
-            # Skip DEFAULT_*_TEMPLATE variables (they're handled separately)
-            if var_name.startswith("DEFAULT_") and var_name.endswith("_TEMPLATE"):
-                continue
-            
-            # Extract details
-            details = extract_variable_details(markdown_lines, var_name, var_info["line_number"])
-            
-            # Add category and order
-            details["category"] = var_info["category"]
-            details["order"] = var_info["order"]
-            
-            # Create schema property
-            schema_prop = create_schema_property(details)
-            
-            # Add to schema properties
-            schema_properties[var_name] = schema_prop
+    with stage("parse_markdown"):
+        variable_info = parse_markdown(markdown_path)
+    
+    # Step 2: Load external data
+    with stage("load_inputs"):
+        templates = load_json_file(templates_path)
+        relationships = load_json_file(relationships_path)
+        classifications = load_json_file(classifications_path)
+    
+    if not new_classifications_path:
+        new_classifications_path = f"{os.path.splitext(classifications_path)[0]}_with_new_vars.json"
+    
+    return generate_schema_from_data(
+        variable_info, templates, relationships, classifications,
+        output_path=output_path,
+        append_new_vars=append_new_vars,
+        properties_only=properties_only,
+        cache_path=cache_path,
+        new_classifications_path=new_classifications_path,
+        compact_path=compact_path,
+        inline_templates=inline_templates,
+        shards_dir=shards_dir,
+        shard_by=shard_by,
+        detect_renames=detect_renames,
+        previous_schema_path=previous_schema_path
+    )
+
+def generate_schema_from_data(variable_info: Dict[str, Dict], templates: Dict,
+                              relationships: Dict, classifications: Dict,
+                              output_path: str, new_classifications_path: str,
+                              append_new_vars: bool = True,
+                              properties_only: bool = False,
+                              cache_path: Optional[str] = None,
+                              compact_path: Optional[str] = None,
+                              inline_templates: bool = False,
+                              build_cache: Optional[Dict[str, Dict]] = None,
+                              shards_dir: Optional[str] = None,
+                              shard_by: str = "category",
+                              detect_renames: bool = True,
+                              previous_schema_path: Optional[str] = None) -> Dict:
+    """
+    Generate the schema from already parsed and loaded inputs.
+    
+    This runs every step after parsing and loading, so callers that already
+    hold the documentation records and the JSON inputs in memory (such as the
+    pipeline runner) do not have to round-trip them through files.
+    
+    A long-running caller can keep the per-variable build cache in memory by
+    passing the same build_cache dictionary to every call; it is used instead
+    of the cache file and updated in place with the finished properties.
+    
+    Args:
+        variable_info: Variable records from tokenize_markdown or parse_markdown
+        templates: The default templates
+        relationships: The relationship mappings
+        classifications: The manual classifications
+        output_path: Path to the output schema JSON file
+        new_classifications_path: Where to write the classifications with new variables
+        append_new_vars: Whether to write the classifications with new variables
+        properties_only: Whether to output only the properties section of the schema
+        cache_path: Optional path to the per-variable build cache
+        compact_path: Optional path to also write the compact indexed schema artifact
+        inline_templates: Whether to inline template bodies in every property that
+            references them instead of using the components-level template store
+        build_cache: Optional in-memory build cache, updated in place
+        shards_dir: Optional directory to also write the schema as per-category shards
+        shard_by: Group shards by "category" or by top-level "section"
+        detect_renames: Whether to match new variables against retired classified
+            variables and carry their classifications forward
+        previous_schema_path: Schema providing descriptions of retired variables
+            (defaults to the existing output schema)
+    
+    Returns:
+        The schema that was saved
+    """
+    use_cache = bool(cache_path) or build_cache is not None
+    
+    # Step 3: Extract details for each variable, reusing cached properties
+    with stage("extract_variables"):
+        if build_cache is not None:
+            cache_entries = build_cache
+        else:
+            cache_entries = load_schema_cache(cache_path) if cache_path else {}
+        var_classifications = classifications.get("variable_classifications", {})
+        variables = {var_name for var_name in variable_info if not is_template_variable(var_name)}
+        relationship_index = index_relationships(relationships, variables) if use_cache else {}
+        
+        schema_properties = {}
+        input_hashes = {}
+        rebuilt = set()
+        for var_name, var_info in variable_info.items():
+            try:
+                # Skip DEFAULT_*_TEMPLATE variables (they're handled separately)
+                if is_template_variable(var_name):
+                    continue
+                
+                if use_cache:
+                    input_hash = variable_input_hash(
+                        var_name, var_info, templates,
+                        relationship_index.get(var_name, []),
+                        var_classifications.get(var_name))
+                    input_hashes[var_name] = input_hash
+                    
+                    cached = cache_entries.get(var_name)
+                    if cached and cached.get("hash") == input_hash:
+                        schema_prop = cached["property"]
+                        schema_prop["x-category"] = var_info["category"]
+                        schema_prop["x-display-order"] = var_info["order"]
+                        schema_properties[var_name] = schema_prop
+                        continue
+                
+                # Extract details
+                details = extract_variable_details(var_info, var_name)
+                
+                # Add category and order
+                details["category"] = var_info["category"]
+                details["order"] = var_info["order"]
+                
+                # Create schema property
+                schema_prop = create_schema_property(details)
+                
+                # Add to schema properties
+                schema_properties[var_name] = schema_prop
+                rebuilt.add(var_name)
             
-        except Exception as e:
-            logger.error(f"Error processing variable {var_name}: {e}")
+            except Exception as e:
+                logger.error(f"Error processing variable {var_name}: {e}")
     
-    # Step 3: Load external data
-    templates = load_json_file(templates_path)
-    relationships = load_json_file(relationships_path)
-    classifications = load_json_file(classifications_path)
+    if use_cache:
+        logger.info(f"Reused {len(schema_properties) - len(rebuilt)} cached properties, rebuilding {len(rebuilt)}")
     
     # Step 4: Apply templates to schema properties
-    schema = apply_templates(schema_properties, templates)
+    with stage("apply_templates"):
+        schema = apply_templates(schema_properties, templates, rebuilt)
     
     # Step 5: Apply relationships to schema properties
-    schema = apply_relationships(schema, relationships)
-    
-    # Step 6: Compare with classifications and identify new variables
-    schema, new_variables = compare_with_classifications(schema, classifications)
-    
-    # Step 7: Append new variables to classifications if requested
+    with stage("apply_relationships"):
+        schema = apply_relationships(schema, relationships, rebuilt)
+    
+    # Step 6: Index the dependency graph (cycles, topological order, transitive closure)
+    with stage("dependency_index"):
+        dependency_graph = build_dependency_graph(relationships, set(schema))
+        dependency_index = dependency_graph.to_index()
+    
+    # Step 7: Compare with classifications and identify new variables
+    with stage("compare_with_classifications"):
+        schema, new_variables = compare_with_classifications(schema, classifications, rebuilt)
+    
+    # Step 8: Match new variables against renamed predecessors
+    renames = {}
+    if detect_renames and new_variables:
+        with stage("detect_renames"):
+            previous_properties = load_previous_properties(previous_schema_path or output_path)
+            renames = find_renames(new_variables, schema, classifications, previous_properties)
+    
+    # Step 9: Append new variables to classifications if requested
     if append_new_vars and new_variables:
-        new_classifications_path = f"{os.path.splitext(classifications_path)[0]}_with_new_vars.json"
-        append_new_vars_to_classifications(new_variables, schema_properties, 
-                                          classifications, new_classifications_path)
+        with stage("append_new_vars"):
+            append_new_vars_to_classifications(new_variables, schema_properties, 
+                                              classifications, new_classifications_path, renames)
     
-    # Step 8: Save the final schema
+    # Step 10: Save the final schema (save_json_file measures serialization and writing)
     if properties_only:
-        save_json_file(schema, output_path)
+        output_schema = schema
+        save_json_file(output_schema, output_path)
         logger.info(f"Saved schema properties to {output_path}")
     else:
-        full_schema = create_full_schema(schema)
-        save_json_file(full_schema, output_path)
+        if inline_templates:
+            output_schema = create_full_schema(schema, dependency_index)
+        else:
+            stored_properties, template_store = store_templates(schema)
+            output_schema = create_full_schema(stored_properties, dependency_index, template_store)
+        save_json_file(output_schema, output_path)
         logger.info(f"Saved full schema to {output_path}")
     
+    if compact_path:
+        with stage("write_compact"):
+            write_compact_schema(output_schema, compact_path)
+    
+    if shards_dir:
+        with stage("write_shards"):
+            write_sharded_schema(output_schema, shards_dir, shard_by)
+    
+    # Step 11: Update the build cache with the finished properties
+    if use_cache:
+        with stage("save_cache"):
+            entries = {
+                var_name: {"hash": input_hashes[var_name], "property": prop}
+                for var_name, prop in schema.items()
+                if var_name in input_hashes
+            }
+            if build_cache is not None:
+                build_cache.clear()
+                build_cache.update(entries)
+            if cache_path:
+                save_schema_cache(entries, cache_path)
+    
     # Report statistics
     print(f"\nSchema generation complete!")
     print(f"- Processed {len(schema)} variables")
     print(f"- Applied {sum(1 for p in schema.values() if 'x-default-template' in p)} default templates")
     print(f"- Applied {sum(1 for p in schema.values() if 'x-depends-on' in p)} dependency relationships")
+    print(f"- Indexed {len(dependency_index['conditions'])} dependent fields"
+          f" ({len(dependency_index.get('cycles', []))} dependency cycles)")
     print(f"- Applied {sum(1 for p in schema.values() if 'x-visibility' in p)} manual classifications")
     
     if new_variables:
         print(f"\nFound {len(new_variables)} new variables that need manual classification:")
         for var_name in sorted(new_variables):
-            print(f"  - {var_name}")
+            rename = renames.get(var_name)
+            if rename:
+                print(f"  - {var_name} (renamed from {rename['predecessor']}? score {rename['score']:.2f})")
+            else:
+                print(f"  - {var_name}")
         if append_new_vars:
             print(f"\nTemplate for new variables saved to {new_classifications_path}")
             print(f"Please review and update the classification for these variables.")
+    
+    return output_schema
 
 def main():
     parser = argparse.ArgumentParser(description='Generate an OpenAPI schema for OpenWebUI environment variables')
@@ -795,18 +1475,41 @@ def main():
                         help='Do not append new variables to the classifications file')
     parser.add_argument('--properties-only', '-p', action='store_true',
                         help='Output only the properties section of the schema')
+    parser.add_argument('--cache',
+                        help='Path to a per-variable build cache; unchanged variables are reused from it')
+    parser.add_argument('--inline-templates', action='store_true',
+                        help='Inline template bodies in each property instead of the hash-keyed template store')
+    parser.add_argument('--compact', nargs='?', const='', default=None, metavar='PATH',
+                        help='Also write the compact indexed schema artifact (default path: <output>.idx)')
+    parser.add_argument('--shards', nargs='?', const='', default=None, metavar='DIR',
+                        help='Also write the schema as per-category shards with an index (default dir: <output>-shards)')
+    parser.add_argument('--shard-by', choices=SHARD_GROUPS, default='category',
+                        help='Shard per x-category or per top-level documentation section (default: category)')
+    parser.add_argument('--no-renames', action='store_true',
+                        help='Do not match new variables against renamed classified variables')
+    parser.add_argument('--previous-schema',
+                        help='Schema with the descriptions of retired variables (default: the existing output)')
+    add_profile_arguments(parser)
     args = parser.parse_args()
     
     try:
-        generate_schema(
-            markdown_path=args.input,
-            templates_path=args.templates,
-            relationships_path=args.relationships,
-            classifications_path=args.classifications,
-            output_path=args.output,
-            append_new_vars=not args.no_append,
-            properties_only=args.properties_only
-        )
+        with profiling("unified_schema_generator", args.profile, args.cprofile):
+            generate_schema(
+                markdown_path=args.input,
+                templates_path=args.templates,
+                relationships_path=args.relationships,
+                classifications_path=args.classifications,
+                output_path=args.output,
+                append_new_vars=not args.no_append,
+                properties_only=args.properties_only,
+                cache_path=args.cache,
+                compact_path=compact_path_for(args.output) if args.compact == '' else args.compact,
+                inline_templates=args.inline_templates,
+                shards_dir=shards_dir_for(args.output) if args.shards == '' else args.shards,
+                shard_by=args.shard_by,
+                detect_renames=not args.no_renames,
+                previous_schema_path=args.previous_schema
+            )
     except Exception as e:
         logger.error(f"Error generating schema: {e}")
         raise